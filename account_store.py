@@ -0,0 +1,459 @@
+import csv
+import functools
+import mmap
+import os
+import struct
+import sys
+import threading
+import weakref
+import zlib
+from collections import OrderedDict, namedtuple
+
+
+AccountRecord = namedtuple('AccountRecord', 'account_number account_name account_type balance personal_info pin_hash active')
+
+
+def _text(field):
+    # Fixed-width fields are NUL padded and may end in a truncated UTF-8 sequence
+    return field.rstrip(b'\0').decode(errors='ignore')
+
+
+def _locked(method):
+    # The mmaps are replaced when the files grow, so every access holds the store lock
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class AccountStore:
+    """Fixed-width binary account records in a memory-mapped file.
+
+    ``accounts.dat`` holds a small header followed by one fixed-size record
+    per account. ``accounts.idx`` is an open-addressing hash table mapping
+    an account number to its record slot, so a lookup touches one bucket
+    and one record rather than loading every account. Every record has
+    exactly one bucket, so an index whose used count differs from the
+    record count was cut short by a crash and is rebuilt on open.
+    """
+
+    MAGIC = b'CBAS'
+    VERSION = 1
+    HEADER = struct.Struct('<4sHHQ')   # magic, version, record size, record count
+    HEADER_SIZE = 64
+    RECORD = struct.Struct('<20s40s12sd24s128sB')
+    TYPE_OFFSET = 20 + 40
+    BALANCE_OFFSET = TYPE_OFFSET + 12
+    PIN_HASH_OFFSET = BALANCE_OFFSET + 8 + 24
+    INDEX_HEADER = struct.Struct('<QQ')  # bucket count, used buckets
+    BUCKET = struct.Struct('<20sI')      # account number, slot + 1 (0 = empty)
+    MAX_LOAD = 0.7
+
+    def __init__(self, path='accounts.dat', initial_capacity=1024):
+        self.path = path
+        self.index_path = os.path.splitext(path)[0] + '.idx'
+        self._lock = threading.RLock()
+        if not os.path.exists(path):
+            self._create_data(initial_capacity)
+        self._data_file = open(path, 'r+b')
+        self._data = mmap.mmap(self._data_file.fileno(), 0)
+        magic, version, record_size, self.count = self.HEADER.unpack_from(self._data, 0)
+        if magic != self.MAGIC or record_size != self.RECORD.size:
+            raise ValueError(f"{path} is not a version {self.VERSION} account store")
+        self.capacity = (len(self._data) - self.HEADER_SIZE) // self.RECORD.size
+
+        self._index = None
+        if os.path.exists(self.index_path) and os.path.getsize(self.index_path) >= self.INDEX_HEADER.size:
+            self._open_index()
+        if self._index is None or self.used != self.count or len(self._index) != self._bucket_offset(self.buckets):
+            buckets = max(initial_capacity * 2, 16)
+            while self.count > buckets * self.MAX_LOAD:
+                buckets *= 2
+            self._rebuild_index(buckets)
+
+    def _create_data(self, capacity):
+        with open(self.path, 'wb') as file:
+            header = self.HEADER.pack(self.MAGIC, self.VERSION, self.RECORD.size, 0)
+            file.write(header.ljust(self.HEADER_SIZE, b'\0'))
+            file.truncate(self.HEADER_SIZE + capacity * self.RECORD.size)
+
+    @staticmethod
+    def _key(account_number):
+        return str(account_number).encode()
+
+    def _bucket_offset(self, bucket):
+        return self.INDEX_HEADER.size + bucket * self.BUCKET.size
+
+    def _probe(self, key):
+        """Return (bucket, slot) for ``key``; slot is None if the key is absent."""
+        bucket = zlib.crc32(key) % self.buckets
+        padded = key.ljust(20, b'\0')
+        while True:
+            stored, slot = self.BUCKET.unpack_from(self._index, self._bucket_offset(bucket))
+            if slot == 0:
+                return bucket, None
+            if stored == padded:
+                return bucket, slot - 1
+            bucket = (bucket + 1) % self.buckets
+
+    def _open_index(self):
+        self._index_file = open(self.index_path, 'r+b')
+        self._index = mmap.mmap(self._index_file.fileno(), 0)
+        self.buckets, self.used = self.INDEX_HEADER.unpack_from(self._index, 0)
+
+    def _close_index(self):
+        self._index.close()
+        self._index_file.close()
+        self._index = None
+
+    def _rebuild_index(self, buckets):
+        """Write a fresh index with ``buckets`` buckets from the data file.
+
+        The index is built in a temporary file and renamed over the old
+        one, so a crash mid-rebuild leaves the previous index intact.
+        """
+        if self._index is not None:
+            self._close_index()
+        temporary = self.index_path + '.tmp'
+        with open(temporary, 'wb') as file:
+            file.write(self.INDEX_HEADER.pack(buckets, 0))
+            file.truncate(self._bucket_offset(buckets))
+        self._index_file = open(temporary, 'r+b')
+        self._index = mmap.mmap(self._index_file.fileno(), 0)
+        self.buckets, self.used = buckets, 0
+        for slot in range(self.count):
+            offset = self.HEADER_SIZE + slot * self.RECORD.size
+            self._insert(self._data[offset:offset + 20].rstrip(b'\0'), slot)
+        self._index.flush()
+        self._close_index()
+        os.replace(temporary, self.index_path)
+        self._open_index()
+
+    def _insert(self, key, slot):
+        bucket, existing = self._probe(key)
+        if existing is not None:
+            raise KeyError(f"Account {key.decode()} already exists")
+        self.BUCKET.pack_into(self._index, self._bucket_offset(bucket), key, slot + 1)
+        self.used += 1
+        self.INDEX_HEADER.pack_into(self._index, 0, self.buckets, self.used)
+
+    def _grow(self):
+        self._data.flush()
+        self._data.close()
+        self.capacity *= 2
+        self._data_file.truncate(self.HEADER_SIZE + self.capacity * self.RECORD.size)
+        self._data = mmap.mmap(self._data_file.fileno(), 0)
+
+    @_locked
+    def lookup(self, account_number):
+        """Return the record slot for ``account_number`` or None."""
+        key = self._key(account_number)
+        if len(key) > 20:
+            return None
+        return self._probe(key)[1]
+
+    @_locked
+    def read(self, slot):
+        fields = self.RECORD.unpack_from(self._data, self.HEADER_SIZE + slot * self.RECORD.size)
+        number, name, account_type, balance, personal_info, pin_hash, active = fields
+        return AccountRecord(_text(number), _text(name), _text(account_type), balance,
+                             _text(personal_info), _text(pin_hash), bool(active))
+
+    def get(self, account_number):
+        """Return the active record for ``account_number`` or None."""
+        slot = self.lookup(account_number)
+        if slot is None:
+            return None
+        record = self.read(slot)
+        return record if record.active else None
+
+    @_locked
+    def append(self, account_number, account_name, account_type, balance, personal_info, pin_hash):
+        """Add a new account record and return its slot."""
+        key = self._key(account_number)
+        if len(key) > 20:
+            raise ValueError(f"Account number {account_number} is too long")
+        if self.count == self.capacity:
+            self._grow()
+        if (self.used + 1) > self.buckets * self.MAX_LOAD:
+            self._rebuild_index(self.buckets * 2)
+        slot = self.count
+        self._insert(key, slot)
+        self.RECORD.pack_into(self._data, self.HEADER_SIZE + slot * self.RECORD.size,
+                              key, account_name.encode()[:40], account_type.encode()[:12], float(balance),
+                              personal_info.encode()[:24], pin_hash.encode(), 1)
+        self.count += 1
+        self.HEADER.pack_into(self._data, 0, self.MAGIC, self.VERSION, self.RECORD.size, self.count)
+        return slot
+
+    @_locked
+    def append_many(self, records):
+        """Add a batch of (account_number, account_name, account_type, balance,
+        personal_info, pin_hash) tuples, growing the files at most once."""
+        needed = self.count + len(records)
+        if needed > self.capacity:
+            self._data.flush()
+            self._data.close()
+            while self.capacity < needed:
+                self.capacity *= 2
+            self._data_file.truncate(self.HEADER_SIZE + self.capacity * self.RECORD.size)
+            self._data = mmap.mmap(self._data_file.fileno(), 0)
+        if self.used + len(records) > self.buckets * self.MAX_LOAD:
+            buckets = self.buckets
+            while self.used + len(records) > buckets * self.MAX_LOAD:
+                buckets *= 2
+            self._rebuild_index(buckets)
+        for record in records:
+            self.append(*record)
+
+    @_locked
+    def update(self, account_number, balance=None, account_type=None, pin_hash=None):
+        """Overwrite an account's balance, type and/or PIN hash in place."""
+        slot = self.lookup(account_number)
+        if slot is None:
+            return False
+        offset = self.HEADER_SIZE + slot * self.RECORD.size
+        if balance is not None:
+            struct.pack_into('<d', self._data, offset + self.BALANCE_OFFSET, float(balance))
+        if account_type is not None:
+            struct.pack_into('12s', self._data, offset + self.TYPE_OFFSET, account_type.encode()[:12])
+        if pin_hash is not None:
+            struct.pack_into('128s', self._data, offset + self.PIN_HASH_OFFSET, pin_hash.encode())
+        return True
+
+    @_locked
+    def read_block(self, start, stop):
+        """Raw bytes of the records in slots ``start`` to ``stop``, for bulk readers such as end_of_day.py."""
+        stop = min(stop, self.count)
+        return self._data[self.HEADER_SIZE + start * self.RECORD.size:self.HEADER_SIZE + stop * self.RECORD.size]
+
+    @classmethod
+    def unpack_block(cls, data):
+        """Yield the active records in ``data``, bytes returned by ``read_block``."""
+        for number, name, account_type, balance, personal_info, pin_hash, active in cls.RECORD.iter_unpack(data):
+            if active:
+                yield AccountRecord(_text(number), _text(name), _text(account_type), balance,
+                                    _text(personal_info), _text(pin_hash), True)
+
+    @_locked
+    def update_balances(self, slots, balances):
+        """Overwrite the balances of the records in ``slots``, one write per record."""
+        pack_into, data = struct.Struct('<d').pack_into, self._data
+        for slot, balance in zip(slots, balances):
+            pack_into(data, self.HEADER_SIZE + slot * self.RECORD.size + self.BALANCE_OFFSET, balance)
+
+    @_locked
+    def deactivate(self, account_number):
+        """Mark an account as closed. Its number stays reserved in the index."""
+        slot = self.lookup(account_number)
+        if slot is None:
+            return False
+        self._data[self.HEADER_SIZE + (slot + 1) * self.RECORD.size - 1] = 0
+        return True
+
+    def __contains__(self, account_number):
+        return self.get(account_number) is not None
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __iter__(self):
+        """Yield every active record in slot order."""
+        for slot in range(self.count):
+            record = self.read(slot)
+            if record.active:
+                yield record
+
+    def import_csv(self, csv_path, hash_pin, imported_account=None):
+        """Copy every row of an ``account_info.csv`` file into the store.
+
+        Accepts both the column names written by the bank
+        (account_name, initial_balance, personal_info, pin) and the ones in
+        the shipped file (name, current_amount, status, pins). Rows whose
+        account number is already stored are skipped. Each account that is
+        imported is passed to ``imported_account(account_number, balance)``
+        if given. Returns the number of accounts imported.
+        """
+        imported = 0
+        with open(csv_path, newline='') as file:
+            for row in csv.DictReader(file):
+                account_number = row['account_number']
+                if not account_number or self.lookup(account_number) is not None:
+                    continue
+                balance = float(row.get('initial_balance', row.get('current_amount')) or 0)
+                self.append(account_number,
+                            row.get('account_name', row.get('name', '')),
+                            row['account_type'],
+                            balance,
+                            row.get('personal_info', row.get('status', '')),
+                            hash_pin(row.get('pin', row.get('pins')) or ''))
+                if imported_account is not None:
+                    imported_account(account_number, balance)
+                imported += 1
+        self.flush()
+        return imported
+
+    @_locked
+    def flush(self):
+        self._data.flush()
+        self._index.flush()
+
+    def close(self):
+        self.flush()
+        self._data.close()
+        self._data_file.close()
+        self._close_index()
+
+
+class AccountMap:
+    """Dict-like view of an AccountStore that builds account objects on demand.
+
+    Only the accounts that are actually looked up are materialised (via
+    ``factory(record)``); everything else stays on disk. The
+    ``cache_size`` most recently used accounts are kept in memory, plus
+    any that are dirty or still referenced elsewhere, e.g. by a thread
+    in the middle of a posting. The rest are dropped and read again on
+    their next use.
+    Accounts marked dirty have their balance and type written back to
+    their existing record by ``write_back``, so saving costs one small
+    in-place write per changed account. An optional ``validator`` rejects
+    malformed account numbers before the index is consulted.
+
+    The map is safe to share between threads: an account in use is never
+    materialised twice, so every thread mutates the same object.
+    """
+
+    def __init__(self, store, factory, validator=None, cache_size=10000):
+        self.store = store
+        self.factory = factory
+        self.validator = validator
+        self.cache_size = cache_size
+        self._loaded = weakref.WeakValueDictionary()  # Every materialised account still referenced anywhere
+        self._recent = OrderedDict()  # The cache_size most recently used accounts, least recent first
+        self._dirty = {}  # account_number -> account, held until written back
+        self._lock = threading.Lock()
+
+    def _touch(self, account_number, account):
+        # Called with the lock held
+        self._recent[account_number] = account
+        self._recent.move_to_end(account_number)
+        while len(self._recent) > self.cache_size:
+            self._recent.popitem(last=False)
+
+    def mark_dirty(self, account_number):
+        with self._lock:
+            account = self._loaded.get(account_number)
+            if account is not None:
+                self._dirty[account_number] = account
+
+    def write_back(self, account_numbers=None):
+        """Write dirty accounts' balance and type into their records.
+
+        With ``account_numbers`` only those accounts are written; callers
+        that hold the accounts' locks use this so a concurrent save can
+        never store a stale balance.
+        """
+        with self._lock:
+            if account_numbers is None:
+                dirty, self._dirty = self._dirty, {}
+            else:
+                dirty = {account_number: self._dirty.pop(account_number) for account_number in account_numbers
+                         if account_number in self._dirty}
+        for account_number, account in dirty.items():
+            self.store.update(account_number, account.balance, account.account_type)
+        return len(dirty)
+
+    def flush(self):
+        self.write_back()
+        self.store.flush()
+
+    def reload(self):
+        """Re-read the balances of loaded accounts after the store was changed in bulk, e.g. at end of day.
+
+        Dirty accounts must have been written back first.
+        """
+        with self._lock:
+            loaded = list(self._loaded.items())
+        for account_number, account in loaded:
+            record = self.store.get(account_number)
+            if record is not None:
+                account.balance = record.balance
+
+    def get(self, account_number, default=None):
+        with self._lock:
+            account = self._loaded.get(account_number)
+            if account is not None:
+                self._touch(account_number, account)
+                return account
+        if self.validator and not self.validator(account_number):
+            return default
+        record = self.store.get(account_number)
+        if record is None:
+            return default
+        account = self.factory(record)
+        with self._lock:
+            account = self._loaded.setdefault(account_number, account)
+            self._touch(account_number, account)
+        return account
+
+    def __getitem__(self, account_number):
+        account = self.get(account_number)
+        if account is None:
+            raise KeyError(account_number)
+        return account
+
+    def __setitem__(self, account_number, account):
+        if account_number not in self.store:
+            self.store.append(account_number, account.account_name, account.account_type,
+                              account.balance, account.personal_info, account.pin_hash)
+        with self._lock:
+            self._loaded[account_number] = account
+            self._touch(account_number, account)
+
+    def __delitem__(self, account_number):
+        if not self.store.deactivate(account_number):
+            raise KeyError(account_number)
+        with self._lock:
+            self._loaded.pop(account_number, None)
+            self._recent.pop(account_number, None)
+            self._dirty.pop(account_number, None)
+
+    def __contains__(self, account_number):
+        return account_number in self._loaded or account_number in self.store
+
+    def __len__(self):
+        return len(self.store)
+
+    def __iter__(self):
+        for record in self.store:
+            yield record.account_number
+
+    def items(self):
+        for record in self.store:
+            yield record.account_number, self.get(record.account_number)
+
+    def values(self):
+        for _, account in self.items():
+            yield account
+
+
+if __name__ == '__main__':
+    from auth import hash_pin
+    from ledger import Ledger
+    from postings import PostingEngine, opening_legs
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else 'account_info.csv'
+    store_path = sys.argv[2] if len(sys.argv) > 2 else 'accounts.dat'
+    store = AccountStore(store_path)
+    # Opening balances go to the ledger beside the store, as when the bank migrates the file itself
+    ledger = Ledger(os.path.join(os.path.dirname(store_path), 'ledger'))
+    postings = PostingEngine(ledger)
+
+    def post_opening_balance(account_number, balance):
+        if balance:
+            postings.post(opening_legs(account_number, balance))
+
+    count = store.import_csv(csv_path, hash_pin, post_opening_balance)
+    ledger.close()
+    store.close()
+    print(f"Migrated {count} accounts from {csv_path} to {store_path}")
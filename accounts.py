@@ -0,0 +1,69 @@
+import getpass
+from collections import deque
+
+from auth import hash_pin, verify_pin
+from transactions import DEPOSIT, TRANSFER, WITHDRAWAL, Transaction
+
+
+class BankAccount:
+    HISTORY_TAIL = 20  # Recent postings kept in memory; older ones are read from the ledger
+
+    def __init__(self, account_name, account_number, account_type, initial_balance, personal_info, pin, ledger=None, pin_hash=None):
+        self.account_name = account_name
+        self.account_number = account_number
+        self.account_type = account_type
+        self.balance = initial_balance
+        self.personal_info = personal_info
+        self.transaction_history = deque(maxlen=self.HISTORY_TAIL)  # Latest postings made in this session
+        self.pin_hash = pin_hash if pin_hash is not None else self._hash_pin(pin) # Hash the PIN for storage
+        self.ledger = ledger
+        
+    @classmethod
+    def from_record(cls, record, ledger=None):
+        """Rebuild an account from an AccountStore record without re-hashing its PIN."""
+        return cls(record.account_name, record.account_number, record.account_type, record.balance,
+                   record.personal_info, '', ledger, pin_hash=record.pin_hash)
+
+    def _hash_pin(self, pin):
+        """Hash the PIN with a salted key-derivation function for storage."""
+        return hash_pin(pin)
+
+    def authenticate(self, pin_attempt):
+        """Check the provided PIN against the stored hash in constant time; a missing PIN fails."""
+        return isinstance(pin_attempt, str) and verify_pin(pin_attempt, self.pin_hash)
+
+    def deposit(self, amount, counterparty=None):
+        """Add ``amount`` to the account and return the posting; a counterparty makes it a transfer in."""
+        self.balance += amount
+        transaction = Transaction(self.account_number, TRANSFER if counterparty else DEPOSIT, amount,
+                                  counterparty, self.balance)
+        self.transaction_history.append(transaction)
+        return transaction
+
+    def withdraw(self, amount, counterparty=None): 
+        """Take ``amount`` out of the account and return the posting, or None if the balance is too low."""
+        if self.balance >= amount:
+            self.balance -= amount
+            transaction = Transaction(self.account_number, TRANSFER if counterparty else WITHDRAWAL, -amount,
+                                      counterparty, self.balance)
+            self.transaction_history.append(transaction)
+            return transaction
+        print("Insufficient balance!")
+        return None
+
+
+    def get_account_info(self):
+        return f"Account Name: {self.account_name}\nAccount Number: {self.account_number}\nAccount Type: {self.account_type}\nBalance: {self.balance}"
+    
+    def get_transaction_history(self): 
+        return list(self.transaction_history)
+
+    def _record_transaction(self, transaction):
+        self.ledger.append(transaction)
+            
+    def _get_valid_pin(self):
+        while True:
+            pin = getpass.getpass("Choose a 4-digit PIN: ")
+            if pin.isdigit() and len(pin) == 4:
+                return pin
+            print("Invalid PIN! Please enter a 4-digit number.")
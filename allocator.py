@@ -0,0 +1,102 @@
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process lock only
+    fcntl = None
+
+
+class AccountNumberAllocator:
+    """Hands out unique account numbers in constant time.
+
+    Numbers are ``2000``, a seven digit sequence value and a Luhn check
+    digit, e.g. ``200000000018``. The next free sequence value is kept in
+    ``sequence_path``; each allocator reserves a block of values from that
+    file at a time (under a file lock, so several processes can share it)
+    and hands them out from memory. Values already taken by an account in
+    the store, such as older randomly drawn numbers, are skipped.
+    """
+
+    PREFIX = '2000'
+    LENGTH = len(PREFIX) + 7 + 1
+
+    def __init__(self, store, sequence_path='account_seq', block_size=100):
+        self.store = store
+        self.sequence_path = sequence_path
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._block = iter(())
+
+    @staticmethod
+    def check_digit(digits):
+        """Return the Luhn check digit for a string of digits."""
+        total = 0
+        for position, digit in enumerate(reversed(digits)):
+            value = int(digit)
+            if position % 2 == 0:
+                value *= 2
+                if value > 9:
+                    value -= 9
+            total += value
+        return str((10 - total % 10) % 10)
+
+    @classmethod
+    def is_valid(cls, account_number):
+        """Cheap typo check to run before looking an account up.
+
+        Numbers in the allocator's format must carry a correct check
+        digit. Older numbers of other lengths have no check digit and only
+        need to be numeric.
+        """
+        account_number = str(account_number)
+        if not account_number.isdigit():
+            return False
+        if len(account_number) == cls.LENGTH and account_number.startswith(cls.PREFIX):
+            return cls.check_digit(account_number[:-1]) == account_number[-1]
+        return True
+
+    def format(self, value):
+        digits = f'{self.PREFIX}{value:07d}'
+        return digits + self.check_digit(digits)
+
+    def reserve_block(self, size):
+        """Claim ``size`` consecutive sequence values from the sequence file.
+
+        Returns a range; a worker can turn its values into numbers with
+        ``format`` without touching the file again.
+        """
+        fd = os.open(self.sequence_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            start = int(os.read(fd, 32) or 1)
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, str(start + size).encode())
+            os.fsync(fd)
+        finally:
+            os.close(fd)  # also releases the flock
+        return range(start, start + size)
+
+    def allocate(self):
+        """Return one unused account number."""
+        with self._lock:
+            while True:
+                value = next(self._block, None)
+                if value is None:
+                    self._block = iter(self.reserve_block(self.block_size))
+                    continue
+                account_number = self.format(value)
+                if self.store.lookup(account_number) is None:
+                    return account_number
+
+    def reserve(self, count, exclude=()):
+        """Return ``count`` unused account numbers, also avoiding ``exclude``."""
+        numbers = []
+        while len(numbers) < count:
+            for value in self.reserve_block(count - len(numbers)):
+                account_number = self.format(value)
+                if account_number not in exclude and self.store.lookup(account_number) is None:
+                    numbers.append(account_number)
+        return numbers
@@ -0,0 +1,159 @@
+"""Columnar analytics over the whole ledger.
+
+``LedgerColumns`` decodes the ledger's packed postings straight into
+typed NumPy arrays, one per column, caches the arrays as .npy files next
+to the ledger and answers summary questions with vectorised operations.
+Later runs load the cache memory-mapped and only decode postings
+committed since it was written.
+
+NumPy is optional for the rest of the bank and only needed here.
+"""
+import json
+import os
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from transactions import Transaction
+
+if np is not None:
+    # Transaction.RECORD as a packed NumPy record
+    RECORD = np.dtype([('txn_id', '<u8'), ('timestamp', '<f8'), ('account', '<u8'), ('kind', 'u1'),
+                       ('amount', '<f8'), ('counterparty', '<u8'), ('balance_after', '<f8')])
+    assert RECORD.itemsize == Transaction.RECORD.size
+
+
+class LedgerColumns:
+    """The ledger as parallel arrays.
+
+    ``timestamp`` (float64 seconds), ``account`` (int32 index into
+    ``accounts``), ``kind`` (the transactions module's kind codes), ``amount``
+    (float64, negative for debits) and ``counterparty`` (int32 index into
+    ``accounts``, -1 when there is none).
+    """
+
+    COLUMNS = ('timestamp', 'account', 'kind', 'amount', 'counterparty')
+    DTYPES = {'timestamp': 'float64', 'account': 'int32', 'kind': 'uint8', 'amount': 'float64', 'counterparty': 'int32'}
+
+    def __init__(self, ledger, cache_dir=None):
+        if np is None:
+            raise ImportError("Ledger analytics need NumPy: pip install numpy")
+        self.ledger = ledger
+        self.cache_dir = cache_dir or os.path.join(ledger.directory, 'analytics')
+        self.position = 0  # txn_id of the last posting in the arrays
+        self.accounts = []
+        self._account_index = {}
+        for name in self.COLUMNS:
+            setattr(self, name, np.empty(0, self.DTYPES[name]))
+        if os.path.exists(os.path.join(self.cache_dir, 'meta.json')):
+            self._load()
+        self.refresh()
+
+    def _load(self):
+        with open(os.path.join(self.cache_dir, 'meta.json')) as file:
+            meta = json.load(file)
+        if not isinstance(meta['position'], int):
+            return  # Cached from the old text ledger; rebuilt from scratch
+        self.position = meta['position']
+        self.accounts = meta['accounts']
+        self._account_index = {account_number: i for i, account_number in enumerate(self.accounts)}
+        for name in self.COLUMNS:
+            setattr(self, name, np.load(os.path.join(self.cache_dir, f'{name}.npy'), mmap_mode='r'))
+
+    def _save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        for name in self.COLUMNS:
+            np.save(os.path.join(self.cache_dir, f'{name}.npy'), getattr(self, name))
+        temporary = os.path.join(self.cache_dir, 'meta.json.tmp')
+        with open(temporary, 'w') as file:
+            json.dump({'position': self.position, 'accounts': self.accounts}, file)
+        os.replace(temporary, os.path.join(self.cache_dir, 'meta.json'))  # The arrays count once meta.json says so
+
+    def _index(self, account_number):
+        index = self._account_index.get(account_number)
+        if index is None:
+            index = self._account_index[account_number] = len(self.accounts)
+            self.accounts.append(account_number)
+        return index
+
+    def _indexes(self, account_numbers):
+        # Map raw account numbers to positions in self.accounts, one dict lookup per distinct number
+        unique, inverse = np.unique(account_numbers, return_inverse=True)
+        lookup = np.array([self._index(str(number)) for number in unique.tolist()], 'int32')
+        return lookup[inverse] if len(unique) else np.empty(0, 'int32')
+
+    def refresh(self):
+        """Decode postings committed since the last refresh and update the cache; returns how many."""
+        self.ledger.flush()
+        blocks = [np.frombuffer(data, RECORD) for data in self.ledger.scan_blocks(self.position)]
+        if not blocks:
+            return 0
+        records = np.concatenate(blocks)
+        counterparty = np.full(len(records), -1, 'int32')
+        has_counterparty = records['counterparty'] != 0
+        counterparty[has_counterparty] = self._indexes(records['counterparty'][has_counterparty])
+        new = {'timestamp': records['timestamp'], 'account': self._indexes(records['account']),
+               'kind': records['kind'], 'amount': records['amount'], 'counterparty': counterparty}
+        for name in self.COLUMNS:
+            setattr(self, name, np.concatenate([getattr(self, name), new[name].astype(self.DTYPES[name])]))
+        self.position = int(records['txn_id'][-1])
+        self._save()
+        return len(records)
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def daily_volume(self):
+        """Postings, credits and debits per UTC day, as a list of (date, postings, credits, debits)."""
+        days, day_index = np.unique((self.timestamp // 86400).astype('int64'), return_inverse=True)
+        postings = np.bincount(day_index, minlength=len(days))
+        credits = np.bincount(day_index, np.clip(self.amount, 0, None), len(days))
+        debits = np.bincount(day_index, -np.clip(self.amount, None, 0), len(days))
+        return [(time.strftime('%Y-%m-%d', time.gmtime(day * 86400)), int(count), float(credit), float(debit))
+                for day, count, credit, debit in zip(days.tolist(), postings, credits, debits)]
+
+    def top_counterparties(self, account_number=None, limit=10):
+        """Accounts that received or sent the most money by transfer, largest first.
+
+        With ``account_number``, only transfers to and from that account
+        are counted. Returns (account_number, transfers, amount) tuples.
+        """
+        mask = self.counterparty >= 0
+        if account_number is not None:
+            index = self._account_index.get(str(account_number))
+            if index is None:
+                return []
+            mask &= self.account == index
+        counterparty = self.counterparty[mask]
+        amounts = np.bincount(counterparty, np.abs(self.amount[mask]), len(self.accounts))
+        counts = np.bincount(counterparty, minlength=len(self.accounts))
+        top = np.argsort(amounts)[::-1][:limit]
+        return [(self.accounts[i], int(counts[i]), float(amounts[i])) for i in top.tolist() if counts[i]]
+
+    def balances(self, as_of=None):
+        """Balance implied by the ledger for every account, optionally as of a timestamp.
+
+        Every way of loading accounts from a CSV file (the bank's first-run
+        migration, load_accounts_from_csv, account_store.py and
+        bulk_import.py) posts their balances as opening balances, so these
+        agree with the account store.
+        """
+        mask = slice(None) if as_of is None else self.timestamp <= as_of
+        totals = np.bincount(self.account[mask], self.amount[mask], len(self.accounts))
+        return dict(zip(self.accounts, totals.tolist()))
+
+    def by_account_type(self, account_type_of):
+        """Postings, credits and debits per account type; ``account_type_of`` maps an account number to its type."""
+        types = {}
+        type_of_account = np.array([types.setdefault(account_type_of(account_number), len(types))
+                                    for account_number in self.accounts], 'int32')
+        type_index = type_of_account[self.account] if len(self.accounts) else np.empty(0, 'int32')
+        postings = np.bincount(type_index, minlength=len(types))
+        credits = np.bincount(type_index, np.clip(self.amount, 0, None), len(types))
+        debits = np.bincount(type_index, -np.clip(self.amount, None, 0), len(types))
+        return {account_type: {'postings': int(postings[i]), 'credits': float(credits[i]),
+                               'debits': float(debits[i]), 'net_flow': float(credits[i] - debits[i])}
+                for account_type, i in types.items()}
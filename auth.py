@@ -0,0 +1,85 @@
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+
+ALGORITHM = 'pbkdf2_sha256'
+ITERATIONS = 50000  # Raise to make each PIN guess more expensive; old hashes keep their own count
+
+
+def hash_pin(pin, iterations=ITERATIONS, salt=None):
+    """Derive a salted PBKDF2 hash of a PIN or password for storage.
+
+    The result is ``pbkdf2_sha256$<iterations>$<salt>$<hash>`` so the
+    work factor can be raised later without invalidating stored hashes.
+    """
+    salt = salt or secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac('sha256', pin.encode(), salt.encode(), iterations).hex()
+    return f'{ALGORITHM}${iterations}${salt}${digest}'
+
+
+def verify_pin(pin, stored_hash):
+    """Check a PIN against a stored hash in constant time.
+
+    Plain SHA-256 hex digests written by earlier versions are still
+    accepted; ``needs_rehash`` reports them so callers can upgrade them.
+    """
+    if stored_hash.startswith(ALGORITHM + '$'):
+        _, iterations, salt, _ = stored_hash.split('$')
+        attempt = hash_pin(pin, int(iterations), salt)
+    else:
+        attempt = hashlib.sha256(pin.encode()).hexdigest()
+    return hmac.compare_digest(attempt, stored_hash)
+
+
+def needs_rehash(stored_hash, iterations=ITERATIONS):
+    if not stored_hash.startswith(ALGORITHM + '$'):
+        return True
+    return int(stored_hash.split('$')[1]) < iterations
+
+
+class SessionCache:
+    """In-memory session tokens with a time-to-live and LRU eviction.
+
+    ``log_in`` pays for one key derivation and receives a token; later
+    operations in the same session check the token with a dict lookup
+    instead of hashing the PIN again.
+    """
+
+    def __init__(self, ttl=900, max_sessions=10000, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.clock = clock
+        self._sessions = OrderedDict()  # token -> (account_number, expiry)
+        self._lock = threading.Lock()
+
+    def issue(self, account_number):
+        with self._lock:
+            token = secrets.token_urlsafe(24)
+            self._sessions[token] = (account_number, self.clock() + self.ttl)
+            if len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return token
+
+    def validate(self, token, account_number):
+        """Return True if ``token`` is a live session for ``account_number``."""
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                return False
+            owner, expiry = session
+            if expiry < self.clock():
+                del self._sessions[token]
+                return False
+            self._sessions.move_to_end(token)
+            return owner == account_number
+
+    def revoke(self, token):
+        with self._lock:
+            self._sessions.pop(token, None)
+
+    def __len__(self):
+        return len(self._sessions)
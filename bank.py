@@ -0,0 +1,888 @@
+import math
+import os
+import sys
+import threading
+import time
+from typing import Dict
+
+from account_store import AccountMap, AccountStore
+from accounts import BankAccount
+from allocator import AccountNumberAllocator
+from auth import SessionCache, hash_pin, needs_rehash
+from employee_directory import EmployeeDirectory
+from employees import EmployeeManagement
+from ledger import Ledger, iter_positions
+from locks import LockTable
+from metrics import registry as metrics
+from postings import CASH, INTERNAL_ACCOUNTS, SUSPENSE, PostingEngine, opening_legs
+from reporting import ReportingEngine
+from screening import FLAG, HOLD, Screener
+from snapshots import SnapshotStore
+from transactions import ADJUSTMENT, DEPOSIT, TRANSFER, WITHDRAWAL, Transaction
+
+
+def _valid_amount(amount):
+    """True for an amount of money that can be posted: a finite number above zero."""
+    return isinstance(amount, (int, float)) and math.isfinite(amount) and amount > 0
+
+
+class _lazy:
+    """Like functools.cached_property, but safe when first used from several threads."""
+
+    _lock = threading.RLock()
+
+    def __init__(self, load):
+        self.load = load
+        self.__doc__ = load.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, bank, owner=None):
+        if bank is None:
+            return self
+        with self._lock:
+            if self.name not in bank.__dict__:
+                bank.__dict__[self.name] = self.load(bank)
+        return bank.__dict__[self.name]
+
+
+class BankManagementSystem(EmployeeManagement):
+    """The bank's accounts, ledger and employees.
+
+    Constructing one does no I/O: the ledger, the account store and the
+    employee list are opened the first time they are used.
+
+    Every balance change is a ledger posting carrying the balance it
+    leaves behind. The posting is made durable in the ledger's
+    write-ahead log before the balance reaches the account store, so
+    after a crash opening the store replays the log and lands on the
+    balances of every committed posting. ``checkpoint`` makes the store
+    durable and empties the log.
+
+    Postings go through the double-entry ``postings`` engine: money paid
+    in or out is balanced against the bank's CASH account and manual
+    adjustments against SUSPENSE, so the ledger as a whole always nets
+    to zero.
+    """
+
+    def __init__(self, data_dir='.'):
+        self.data_dir = data_dir
+        self.sessions = SessionCache()  # Tokens issued by log_in
+        self.locks = LockTable()  # Balance changes hold their accounts' locks
+        self.metrics = metrics  # Operation counters and latencies; see metrics.py
+
+    @_lazy
+    def ledger(self):
+        """Shared transaction ledger for every account."""
+        return Ledger(os.path.join(self.data_dir, 'ledger'))
+
+    @_lazy
+    def postings(self):
+        """Double-entry posting engine in front of the ledger."""
+        return PostingEngine(self.ledger)
+
+    @_lazy
+    def account_store(self):
+        store_path = os.path.join(self.data_dir, 'accounts.dat')
+        first_run = not os.path.exists(store_path)
+        store = AccountStore(store_path)
+        csv_path = os.path.join(self.data_dir, 'account_info.csv')
+        # Balances from postings that were logged but may not have reached the store
+        for record in self.ledger.recovered:
+            if not math.isnan(record.balance_after):
+                store.update(record.account_number, balance=record.balance_after)
+        if first_run and os.path.exists(csv_path):
+            store.import_csv(csv_path, hash_pin, self._post_opening_balance)  # One-time migration of the old CSV file
+            self.ledger.flush()
+        store.flush()
+        return store
+
+    def _post_opening_balance(self, account_number, balance):
+        # Imported balances enter the ledger as opening balances, so every balance is backed by postings
+        if balance:
+            self.postings.post(opening_legs(account_number, balance))
+
+    @_lazy
+    def screening(self):
+        """Sliding-window fraud and velocity screening of postings; see screening.py."""
+        return Screener()
+
+    @_lazy
+    def scheduler(self):
+        """Future-dated and recurring transfers; see scheduler.py."""
+        from scheduler import Scheduler  # Pulls in calendar and datetime; only needed here
+        return Scheduler(self, os.path.join(self.data_dir, 'schedules.log'))
+
+    @_lazy
+    def snapshots(self):
+        """Periodic snapshots of every balance, for balance_as_of; see snapshots.py."""
+        return SnapshotStore(os.path.join(self.data_dir, 'snapshots'))
+
+    @_lazy
+    def rates(self):
+        """Interest and fee tables by account type, edited in configure_system; see end_of_day.py."""
+        from end_of_day import load_rates
+        return load_rates(os.path.join(self.data_dir, 'rates.json'))
+
+    @_lazy
+    def allocator(self):
+        return AccountNumberAllocator(self.account_store, os.path.join(self.data_dir, 'account_seq'))
+
+    @_lazy
+    def accounts(self) -> Dict[str, BankAccount]:
+        """Accounts by number; records are read from the store on demand."""
+        return AccountMap(self.account_store, lambda record: BankAccount.from_record(record, self.ledger),
+                          self.allocator.is_valid)
+
+    @_lazy
+    def reports(self):
+        """Running report totals, kept up to date from the ledger."""
+        return ReportingEngine(self.ledger, self._account_type, os.path.join(self.data_dir, 'reports.json'))
+
+    def _account_type(self, account_number):
+        if account_number in INTERNAL_ACCOUNTS:
+            return 'internal'
+        record = self.account_store.get(account_number)
+        return record.account_type if record else 'unknown'
+
+    @_lazy
+    def employees(self) -> EmployeeDirectory:
+        return self.load_employees_from_csv()
+
+    def create_account(self):
+        bank_account = BankAccount('', '', '', 0, '', '', pin_hash='')  # Create a BankAccount instance
+
+        account_name = input("Enter your full name: ")
+        account_type = input("Enter account type (e.g., savings or current): ")
+        initial_balance = float(input("Enter initial balance: "))
+        personal_info = input("Enter personal info (e.g., married or single): ")
+        pin = bank_account._get_valid_pin() # Call _get_valid_pin() from the BankAccount instance
+        account_number = self.open_account(account_name, account_type, initial_balance, personal_info, pin)
+        
+        print("Account created successfully!")
+        print("Your account number is:", account_number)
+        print("Remember to keep your PIN safe.")
+
+    @metrics.instrument('open_account')
+    def open_account(self, account_name, account_type, initial_balance, personal_info, pin, account_number=None):
+        """Create and store a new account without prompting; returns its account number.
+
+        ``account_number`` is for callers that allocate numbers themselves,
+        such as the sharded router. Raises ValueError, before anything is
+        stored, unless ``initial_balance`` is zero or a valid amount.
+        """
+        if not (initial_balance == 0 or _valid_amount(initial_balance)):
+            raise ValueError(f"Invalid initial balance {initial_balance!r}")
+        account_number = account_number or self.allocator.allocate()
+        account = BankAccount(account_name, account_number, account_type, initial_balance, personal_info, pin, self.ledger)
+        if initial_balance:
+            self._record_transaction(*opening_legs(account_number, initial_balance))  # Before the account is stored
+        self.accounts[account_number] = account
+        return account_number
+
+    @metrics.instrument('load_accounts_from_csv')
+    def load_accounts_from_csv(self, path=None, hash_pin=hash_pin):
+        """Import account_info.csv, or the CSV at ``path``, into the account store.
+
+        Each imported balance is posted as an opening balance. ``hash_pin``
+        may be swapped for a cheaper function only for throwaway data,
+        e.g. benchmarks.
+        """
+        imported = self.account_store.import_csv(path or os.path.join(self.data_dir, 'account_info.csv'), hash_pin,
+                                                 self._post_opening_balance)
+        self.ledger.flush()
+        return imported
+            
+    @metrics.instrument('bulk_import')
+    def bulk_import(self, path, chunk_size=10000, workers=None):
+        """Stream a large CSV of new accounts into the store; see bulk_import.py."""
+        from bulk_import import import_accounts  # Pulls in multiprocessing; only needed here
+        return import_accounts(path, self.account_store, self.postings, self.allocator, chunk_size, workers)
+
+    def ledger_analytics(self):
+        """Columnar view of the whole ledger for bulk analysis; see analytics.py."""
+        from analytics import LedgerColumns  # NumPy is optional; only needed here
+        return LedgerColumns(self.ledger)
+
+    def save_account(self, account):
+        """Persist an account: new accounts are appended, existing ones updated in place."""
+        if account.account_number in self.accounts:
+            self.accounts.mark_dirty(account.account_number)
+        else:
+            self.accounts[account.account_number] = account
+        self.save_balances()
+
+    def save_balances(self, *account_numbers):
+        """Write changed balances back into the account store.
+
+        With account numbers, only those accounts are saved; balance
+        changes pass the accounts whose locks they hold.
+        """
+        return self.accounts.write_back(account_numbers or None)
+
+    def view_all_accounts(self):
+        for self.account_number, account in self.accounts.items():
+            print(account.get_account_info())
+            print()
+            
+                 
+    @metrics.instrument('deposit')
+    def deposit(self, account_number, amount, token=None):
+        """Deposit into an account. If a session token is given it must belong to the account."""
+        if token is not None and not self.sessions.validate(token, account_number):
+            metrics.error('deposit', 'failed_auth')
+            return False
+        if not _valid_amount(amount):
+            metrics.error('deposit', 'invalid_amount')
+            return False
+        account = self.accounts.get(account_number)
+        if account:
+            with self.locks.hold(account_number):
+                if not self._screen('deposit', account_number, amount):
+                    return False
+                self._record_transaction(account.deposit(amount), Transaction(CASH, DEPOSIT, -amount, account_number))
+                self.ledger.flush()
+                self.accounts.mark_dirty(account_number)
+                self.save_balances(account_number)
+            return True
+        metrics.error('deposit', 'unknown_account')
+        return False
+    
+    @metrics.instrument('withdraw')
+    def withdraw(self, account_number, amount, token=None):
+        """Withdraw from an account. If a session token is given it must belong to the account."""
+        if token is not None and not self.sessions.validate(token, account_number):
+            metrics.error('withdraw', 'failed_auth')
+            return False
+        if not _valid_amount(amount):
+            metrics.error('withdraw', 'invalid_amount')
+            return False
+        account = self.accounts.get(account_number)
+        if account:
+            with self.locks.hold(account_number):
+                if not self._screen('withdraw', account_number, -amount):
+                    return False
+                transaction = account.withdraw(amount)
+                if not transaction:
+                    metrics.error('withdraw', 'insufficient_funds')
+                    return False
+                self._record_transaction(transaction, Transaction(CASH, WITHDRAWAL, amount, account_number))
+                self.ledger.flush()
+                self.accounts.mark_dirty(account_number)
+                self.save_balances(account_number)
+                self.screening.observe(account_number, -amount)
+            return True
+        metrics.error('withdraw', 'unknown_account')
+        return False
+
+    @metrics.instrument('transfer')
+    def transfer(self, sender_account_number, recipient_account_number, amount, sender_pin=None, token=None):
+        """Move money between accounts, authorised by the sender's PIN or a session token from log_in."""
+        if not _valid_amount(amount):
+            metrics.error('transfer', 'invalid_amount')
+            return False
+        if sender_account_number == recipient_account_number:  # Refused by transfer_batch and the sharded router too
+            metrics.error('transfer', 'same_account')
+            return False
+        sender_account = self.accounts.get(sender_account_number)
+        recipient_account = self.accounts.get(recipient_account_number)
+        if token is not None:
+            authorised = self.sessions.validate(token, sender_account_number)
+        else:
+            authorised = sender_account is not None and sender_account.authenticate(sender_pin)
+
+        if sender_account and recipient_account and authorised:
+            with self.locks.hold(sender_account_number, recipient_account_number):
+                if not self._screen('transfer', sender_account_number, -amount, recipient_account_number):
+                    return False
+                debit = sender_account.withdraw(amount, recipient_account_number)
+                if not debit:
+                    metrics.error('transfer', 'insufficient_funds')
+                    return False
+                credit = recipient_account.deposit(amount, sender_account_number)
+                self._record_transaction(debit, credit)
+                self.ledger.flush()  # Commit both legs of the transfer together
+                self.accounts.mark_dirty(sender_account_number)
+                self.accounts.mark_dirty(recipient_account_number)
+                self.save_balances(sender_account_number, recipient_account_number)
+                self.screening.observe(sender_account_number, -amount, recipient_account_number)
+            return True
+        metrics.error('transfer', 'unknown_account' if not sender_account or not recipient_account else 'failed_auth')
+        return False
+
+    @metrics.instrument('transfer_batch')
+    def transfer_batch(self, transfers, preauthorised=False, kind=TRANSFER):
+        """Post many transfers in one pass.
+
+        ``transfers`` is an iterable of (sender_account_number,
+        recipient_account_number, amount, sender_pin) tuples. Items are
+        checked in order against running balances, so money received
+        earlier in the batch can be spent later in it. Each sender's PIN
+        is verified once per batch. Items that fail are rejected without
+        affecting the rest; the accepted ones are written to the ledger in
+        a single flush before any balance changes. PINs are checked before
+        the batch takes its accounts' locks, so slow key derivation never
+        blocks other postings. With ``preauthorised`` no PINs are checked:
+        the caller, such as the scheduler, checked the senders' authority
+        beforehand. ``kind`` is the postings' transaction kind; the
+        scheduler posts SCHEDULED_TRANSFER so it can find its own postings.
+
+        Returns one result dict per item, in input order, with a 'status'
+        of 'posted' or 'rejected' (plus an 'error' message).
+        """
+        results = []
+        candidates = []
+        verified = {}
+        for sender_account_number, recipient_account_number, amount, sender_pin in transfers:
+            result = {'sender': sender_account_number, 'recipient': recipient_account_number,
+                      'amount': amount, 'status': 'rejected'}
+            results.append(result)
+            sender_account = self.accounts.get(sender_account_number)
+            recipient_account = self.accounts.get(recipient_account_number)
+            if not sender_account or not recipient_account:
+                result['error'] = "Account not found!"
+                metrics.error('transfer_batch', 'unknown_account')
+                continue
+            if sender_account_number == recipient_account_number:
+                result['error'] = "Cannot transfer to the same account!"
+                continue
+            try:
+                amount = float(amount)
+            except (TypeError, ValueError):
+                result['error'] = "Invalid amount!"
+                continue
+            if not _valid_amount(amount):
+                result['error'] = "Invalid amount!"
+                continue
+            key = (sender_account_number, sender_pin)
+            if not preauthorised and key not in verified:
+                verified[key] = sender_account.authenticate(sender_pin)
+            if not preauthorised and not verified[key]:
+                result['error'] = "Authentication failed!"
+                metrics.error('transfer_batch', 'failed_auth')
+                continue
+            candidates.append((result, sender_account, recipient_account, amount))
+
+        involved = {account.account_number for _, sender, recipient, _ in candidates for account in (sender, recipient)}
+        with self.locks.hold(*involved):
+            balances = {}
+            postings = []
+            for result, sender_account, recipient_account, amount in candidates:
+                sender_account_number = sender_account.account_number
+                recipient_account_number = recipient_account.account_number
+                available = balances.get(sender_account_number, sender_account.balance)
+                if available < amount:
+                    result['error'] = "Insufficient balance!"
+                    metrics.error('transfer_batch', 'insufficient_funds')
+                    continue
+                if not self._screen('transfer_batch', sender_account_number, -amount, recipient_account_number):
+                    result['error'] = "Held for review!"
+                    continue
+                balances[sender_account_number] = available - amount
+                balances[recipient_account_number] = balances.get(recipient_account_number, recipient_account.balance) + amount
+                postings.append(Transaction(sender_account_number, kind, -amount, recipient_account_number,
+                                            balances[sender_account_number]))
+                postings.append(Transaction(recipient_account_number, kind, amount, sender_account_number,
+                                            balances[recipient_account_number]))
+                result['status'] = 'posted'
+                # Observed straight away, so later items in the batch are screened against this one
+                self.screening.observe(sender_account_number, -amount, recipient_account_number)
+
+            self._record_transaction(*postings)
+            self.ledger.flush()
+
+            for transaction in postings:
+                self.accounts[transaction.account_number].transaction_history.append(transaction)
+            for account_number, balance in balances.items():
+                self.accounts[account_number].balance = balance
+                self.accounts.mark_dirty(account_number)
+            self.save_balances(*balances)
+        return results
+
+    def schedule_transfer(self, sender_account_number, recipient_account_number, amount, first_due,
+                          every=None, times=None, sender_pin=None, token=None):
+        """Set up a future-dated or recurring transfer; returns its schedule id, or None.
+
+        ``first_due`` is a time in seconds since the epoch. ``every`` is
+        None for a single transfer, or 'daily', 'weekly', 'monthly' or a
+        number of seconds, repeated ``times`` times or until cancelled.
+        The sender's PIN or session token is checked now; the transfers
+        themselves are made by ``run_scheduled_transfers``.
+        """
+        sender_account = self.accounts.get(sender_account_number)
+        if sender_account is None or self.accounts.get(recipient_account_number) is None:
+            metrics.error('schedule_transfer', 'unknown_account')
+            return None
+        if token is not None:
+            authorised = self.sessions.validate(token, sender_account_number)
+        else:
+            authorised = sender_account.authenticate(sender_pin)
+        if not authorised:
+            metrics.error('schedule_transfer', 'failed_auth')
+            return None
+        if not _valid_amount(amount) or sender_account_number == recipient_account_number:
+            return None
+        return self.scheduler.add(sender_account_number, recipient_account_number, amount, first_due, every, times)
+
+    def cancel_scheduled_transfer(self, schedule_id):
+        return self.scheduler.cancel(schedule_id)
+
+    @metrics.instrument('run_scheduled_transfers')
+    def run_scheduled_transfers(self, now=None):
+        """Make every scheduled transfer due by ``now``, including ones missed while the bank was down."""
+        return self.scheduler.run_due(now)
+
+    @metrics.instrument('adjust_balance')
+    def adjust_balance(self, account_number, new_balance):
+        """Set an account's balance, recording the difference as an adjustment posting."""
+        account = self.accounts.get(account_number)
+        if account is None:
+            return False
+        with self.locks.hold(account_number):
+            difference = new_balance - account.balance
+            self._record_transaction(Transaction(account_number, ADJUSTMENT, difference, balance_after=new_balance),
+                                     Transaction(SUSPENSE, ADJUSTMENT, -difference, account_number))
+            self.ledger.flush()
+            account.balance = new_balance
+            self.accounts.mark_dirty(account_number)
+            self.save_balances(account_number)
+        return True
+
+    @metrics.instrument('end_of_day')
+    def run_end_of_day(self, business_date=None, chunk_size=100000):
+        """Pay a business date's interest and charge its fees on every account, once; see end_of_day.py.
+
+        ``business_date`` is 'YYYY-MM-DD', today by default. Every account
+        lock is held for the whole run. Returns the run's totals.
+        """
+        from end_of_day import EndOfDay  # NumPy is optional; only needed here
+        business_date = business_date or time.strftime('%Y-%m-%d')
+        time.strptime(business_date, '%Y-%m-%d')  # ValueError if malformed
+        with self.locks.hold_all():
+            if 'accounts' in self.__dict__:
+                self.accounts.flush()
+            run = EndOfDay(self.account_store, self.postings, os.path.join(self.data_dir, 'eod.json'), chunk_size)
+            result = run.run(business_date, self.rates)
+            if 'accounts' in self.__dict__:
+                self.accounts.reload()
+        if not result['skipped']:
+            self.snapshot()  # Closing balances of the business date
+        return result
+
+    @metrics.instrument('snapshot')
+    def snapshot(self, chunk_size=100000):
+        """Save every balance, the bank's own accounts included, as a snapshot for balance_as_of.
+
+        The account locks are held only while the records are copied, a
+        block of ``chunk_size`` at a time; they are decoded and the file is
+        written after the locks are released.
+        """
+        store = self.account_store
+        with self.locks.hold_all():
+            if 'accounts' in self.__dict__:
+                self.accounts.flush()
+            self.ledger.flush()
+            blocks = [store.read_block(first, first + chunk_size) for first in range(0, store.count, chunk_size)]
+            internal = self.postings.trial_balance()['internal_balances']
+            txn_id, timestamp = self.ledger.last_txn_id, time.time()
+        balances = [(record.account_number, record.balance) for block in blocks
+                    for record in AccountStore.unpack_block(block)]
+        del blocks
+        return self.snapshots.take(txn_id, timestamp, balances + list(internal.items()))
+
+    @metrics.instrument('balance_as_of')
+    def balance_as_of(self, account_number, timestamp):
+        """An account's balance at ``timestamp`` (seconds since the epoch), or None for an unknown account.
+
+        Starts from the newest snapshot taken by then and replays only the
+        account's postings after it, a page at a time, up to ``timestamp``.
+        """
+        if account_number not in INTERNAL_ACCOUNTS and self.account_store.lookup(account_number) is None:
+            return None
+        self.ledger.flush()
+        balance, cursor = self.snapshots.balance(account_number, timestamp)
+        cursor = cursor or 0
+        while True:
+            page = self.ledger.read(account_number, since=cursor, limit=100)
+            for posting in page:
+                if posting.timestamp > timestamp:
+                    return balance
+                balance = balance + posting.amount if math.isnan(posting.balance_after) else posting.balance_after
+            if len(page) < 100:
+                return balance
+            cursor = page[-1].txn_id
+
+    def reconcile(self, workers=None):
+        """Audit the whole ledger against the stored balances; see PostingEngine.reconcile."""
+        with self.locks.hold_all():
+            if 'accounts' in self.__dict__:
+                self.accounts.flush()
+            balances = {record.account_number: record.balance for record in self.account_store}
+            return self.postings.reconcile(balances, workers)
+
+    def checkpoint(self):
+        """Make the account store and ledger durable, then empty the write-ahead log.
+
+        Holds every account lock, so no posting can be logged but not yet
+        applied to the store while the log is emptied.
+        """
+        with self.locks.hold_all():
+            if 'accounts' in self.__dict__:
+                self.accounts.flush()
+            else:
+                self.account_store.flush()  # Opening the store applies the log's balances first
+            self.ledger.checkpoint()
+
+    def close(self):
+        """Checkpoint and close whichever data files were opened."""
+        if 'scheduler' in self.__dict__:
+            self.scheduler.close()
+        if 'snapshots' in self.__dict__:
+            self.snapshots.close()
+        if 'reports' in self.__dict__:
+            self.ledger.flush()
+            self.reports.close()
+        if 'account_store' in self.__dict__:
+            self.checkpoint()
+        if 'ledger' in self.__dict__:
+            self.ledger.close()
+        if 'account_store' in self.__dict__:
+            self.account_store.close()
+
+    def close_account(self, account_number): 
+        if account_number in self.accounts:
+            del self.accounts[account_number]
+            print("Account closed successfully.")
+        else:
+            print("Account not found.")
+         
+    def get_account_info(self, account_number):
+        account = self.accounts.get(account_number)
+        if account:
+            return account.get_account_info()
+        return "Account not found!"
+   
+    
+    def _screen(self, operation, account_number, amount, counterparty=None):
+        """Run a posting through the screening stage; False if it is held, which refuses it."""
+        if self.screening.screen(account_number, amount, counterparty).action == HOLD:
+            metrics.error(operation, 'held_for_review')
+            return False
+        return True
+
+    @metrics.instrument('record_transaction')
+    def _record_transaction(self, *transactions):
+        """Post balanced legs; legs passed together are committed together."""
+        self.postings.post(list(transactions))
+    
+    
+    def update_account_info(self, account_number):
+        account = self.accounts.get(account_number)
+        if account:
+            print("Current Account Info:")
+            print(account.get_account_info())
+            print()
+            choice = input("What information would you like to update? (balance, status, or transaction history): ").lower()
+            if choice == "balance":
+                new_balance = float(input("Enter the new balance: "))
+                self.adjust_balance(account_number, new_balance)
+                print("Balance updated successfully!")
+            elif choice == "status":
+                new_status = input("Enter the new status: ")
+                account.account_type = new_status
+                self.save_account(account)
+                print("Account status updated successfully!")
+            elif choice == "transaction history":
+                print("Transaction history cannot be manually updated.")
+            else:
+                print("Invalid choice!")
+        else:
+            print("Account not found!")
+            
+            
+    @metrics.instrument('log_in')
+    def log_in(self, account_number, pin):
+        """Check the PIN once and return a session token for later operations, or None."""
+        account = self.accounts.get(account_number)
+        if account and account.authenticate(pin):
+            if needs_rehash(account.pin_hash):
+                # Upgrade hashes from older versions while the PIN is at hand
+                account.pin_hash = hash_pin(pin)
+                self.account_store.update(account_number, pin_hash=account.pin_hash)
+            return self.sessions.issue(account_number)
+        metrics.error('log_in', 'failed_auth' if account else 'unknown_account')
+        return None
+
+    def log_out(self, token):
+        self.sessions.revoke(token)
+
+    
+    def customer_service(self):
+        print("Welcome to Customer Service!")
+        print("How can we assist you today?\n ")
+        
+        while True:
+            print("1. Account inquiries")
+            print("2. Transaction issues")
+            print("3. General assistance")
+            print("4. Go back to main menu\n ")
+            
+            choice = input("Enter your choice: ")
+            
+            if choice == "1":
+                account_number = input("Enter your account number: ")
+                account = self.accounts.get(account_number)
+                if account:
+                    print(account.get_account_info())
+                else:
+                    print("Account not found!")
+            elif choice == "2":
+                print("Please type your transaction issue.")
+                transaction_issue = input("Type your transaction issue: ")
+                print("Transaction issue recorded successfully!\n")
+                # Placeholder code to handle transaction issues
+                print(f"Transaction issue: {transaction_issue}. Our support team will contact you shortly.\n")
+            elif choice == "3":
+                print("Type your assistance request.")
+                assistance_request = input("Type your assistance request: ")
+                print("Assistance request recorded successfully!\n")
+                # Placeholder code to provide general assistance
+                print(f"Assistance request: {assistance_request}. We'll do our best to help you.\n")
+            elif choice == "4":
+                print("Returning to the main menu...\n ")
+                break
+            else:
+                print("Invalid choice. Please enter a valid option.\n ")
+                
+    # Modify the admin_tasks method to include the management of employee accounts
+    def admin_tasks(self, current_user_position):
+        print("\nAdministrative Tasks:")
+        print("1. Managing employee accounts")
+        print("2. Monitoring and auditing transactions")
+        print("3. Generating reports")
+        print("4. Configuring system parameters")
+        print("5. View all employees")
+        print("6. Performance metrics")
+        print("7. Generate account statements")
+        print("8. Back to main menu\n ")
+
+        admin_choice = input("Enter your choice: ")
+        if admin_choice == "1":
+            # Access to managing employee accounts restricted to the branch manager
+            self.manage_employee_accounts(current_user_position)
+        elif admin_choice == "2":
+            self.monitor_transactions()
+        elif admin_choice == "3":
+            self.generate_reports()
+        elif admin_choice == "4":
+            self.configure_system()
+        elif admin_choice == "5":
+            # View all employees
+            self.view_all_employees()
+            employee_choice = input("Enter employee ID to update/delete (or press Enter to go back): ")
+            if employee_choice:
+                self.update_or_delete_employee(employee_choice)
+        elif admin_choice == "6":
+            self.performance_metrics()
+        elif admin_choice == "7":
+            start_date = input("Enter the first date (YYYY-MM-DD): ")
+            end_date = input("Enter the last date (YYYY-MM-DD): ")
+            fmt = input("Format: txt, csv or html (default txt): ").strip().lower() or 'txt'
+            try:
+                result = self.generate_statements(start_date, end_date, fmt)
+            except ValueError as error:
+                print(f"Could not generate statements: {error}\n ")
+            else:
+                print(f"{result['statements']} statements written in {result['seconds']:.1f} s "
+                      f"({result['per_second']:.0f} statements/s)\n ")
+        elif admin_choice == "8":
+            print("Returning to the main menu...\n ")
+        else:
+            print("Invalid choice. Please enter a valid option.\n ")
+            
+             
+    def monitor_transactions(self):
+        print("Monitoring transactions...")
+        self.ledger.flush()  # Postings still waiting for a group commit are not in the reports yet
+        totals = self.reports.totals()
+        print(f"Postings: {totals['postings']} across {totals['accounts']} accounts")
+        for kind, report in sorted(totals['by_kind'].items()):
+            print(f"  {kind.capitalize()}: {report['postings']} postings, {report['amount']:.2f} total")
+        print("Most recent postings:")
+        for i, (timestamp, account_number, transaction) in enumerate(self.reports.recent_postings(), start=1):
+            print(f"{i}. {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))} {account_number} {transaction}")
+        if 'screening' in self.__dict__:
+            print(f"Screening: {self.screening.counts[HOLD]} postings held for review, "
+                  f"{self.screening.counts[FLAG]} flagged")
+            for timestamp, account_number, amount, counterparty, reasons in list(self.screening.held)[-10:]:
+                print(f"  HELD {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))} {account_number} "
+                      f"{amount:+.2f}{f' with {counterparty}' if counterparty else ''}: {'; '.join(reasons)}")
+        trial = self.postings.trial_balance()
+        print(f"Trial balance since startup: {trial['debits']:.2f} debits, {trial['credits']:.2f} credits, "
+              f"imbalance {trial['imbalance']:.2f}")
+        if input("Run a full reconciliation of the ledger? (y/n): ").strip().lower() == 'y':
+            result = self.reconcile()
+            print(f"Checked {result['postings']} postings against {result['accounts']} accounts; "
+                  f"ledger imbalance {result['imbalance']:.2f}")
+            for account_number, balance, posted in result['mismatched']:
+                print(f"  {account_number}: stored balance {balance:.2f}, ledger says {posted:.2f}")
+            if result['unknown_accounts']:
+                print(f"  Postings for {len(result['unknown_accounts'])} accounts that are not in the store")
+        print()
+
+    def performance_metrics(self):
+        print("Performance metrics since startup:")
+        for operation, summary in sorted(self.metrics.summary().items()):
+            errors = ', '.join(f"{reason} {count}" for reason, count in sorted(summary['errors'].items()))
+            latency = (f"mean {summary['mean_ms']:.3f} ms, p50 <= {summary['p50_ms']:.3f} ms, p99 <= {summary['p99_ms']:.3f} ms"
+                       if summary['calls'] else "")
+            print(f"  {operation}: {summary['calls']} calls  {latency}" + (f"  errors: {errors}" if errors else ""))
+        print()
+        print("1. Save metrics in Prometheus format")
+        print("2. Stop profiling and show the report" if self.metrics.profiling else "2. Start profiling")
+        print("3. Back\n ")
+        choice = input("Enter your choice: ")
+        if choice == "1":
+            path = input("File to write (default metrics.prom): ").strip() or os.path.join(self.data_dir, 'metrics.prom')
+            self.metrics.dump(path)
+            print(f"Metrics saved to {path}")
+        elif choice == "2" and self.metrics.profiling:
+            print(self.metrics.stop_profiling())
+        elif choice == "2":
+            mode = input("Profile with cprofile or tracemalloc? ").strip().lower() or 'cprofile'
+            operations = input("Operations to profile, separated by commas (or press Enter for all): ")
+            try:
+                self.metrics.start_profiling(mode, [name.strip() for name in operations.split(',') if name.strip()])
+            except ValueError as error:
+                print(error)
+            else:
+                print(f"Profiling with {mode}; come back here to stop it.")
+        print()
+
+    def generate_reports(self):
+        print("Generating reports...")
+        self.ledger.flush()
+        # Report on account activity
+        print("Account Activity Report:")
+        totals = self.reports.totals()
+        print(f"Active accounts: {totals['accounts']}")
+        print(f"Credits: {totals['credits']:.2f}  Debits: {totals['debits']:.2f}  Net flow: {totals['net_flow']:.2f}")
+        print()
+
+        # Report on transaction volumes
+        print("Transaction Volume Report:")
+        for account_type, report in sorted(self.reports.by_account_type().items()):
+            print(f"Account Type: {account_type}")
+            print(f"Accounts: {report['accounts']}  Total Transactions: {report['postings']}  Net flow: {report['net_flow']:.2f}")
+        print()
+
+        # Report on financial performance
+        performance = self.reports.financial_performance()
+        print("Financial Performance Report:")
+        print(f"Deposits: {performance['deposits']:.2f}")
+        print(f"Withdrawals: {performance['withdrawals']:.2f}")
+        print(f"Net inflow: {performance['net_inflow']:.2f}")
+        print(f"Transfer volume: {performance['transfer_volume']:.2f}")
+        print()
+
+        export_path = input("Export the report to a .csv or .json file (or press Enter to skip): ").strip()
+        if export_path.endswith('.json'):
+            self.reports.export_json(export_path)
+            print(f"Report saved to {export_path}")
+        elif export_path.endswith('.csv'):
+            count = self.reports.export_csv(export_path)
+            print(f"Activity for {count} accounts saved to {export_path}")
+        elif export_path:
+            print("Invalid file name! Use a .csv or .json extension.")
+
+    def configure_system(self):
+        from end_of_day import RATE_FIELDS, save_rates
+        print("Configuring system...")
+        print("Interest and fee rates by account type:")
+        for account_type, table in sorted(self.rates.items()):
+            print(f"  {account_type}: " + ', '.join(f"{field} {table[field]}" for field in RATE_FIELDS))
+        print("1. Change the rates for an account type")
+        print("2. Run end-of-day interest and fees")
+        print("3. Back\n ")
+        choice = input("Enter your choice: ")
+        if choice == "1":
+            account_type = input("Account type (e.g., savings or current): ").strip().lower()
+            table = dict(self.rates.get(account_type, dict.fromkeys(RATE_FIELDS, 0.0)))
+            try:
+                for field in RATE_FIELDS:
+                    value = input(f"{field} (or press Enter to keep {table[field]}): ").strip()
+                    if value:
+                        table[field] = float(value)
+            except ValueError:
+                print("Invalid number! Rates not changed.\n ")
+                return
+            self.rates[account_type] = table
+            save_rates(os.path.join(self.data_dir, 'rates.json'), self.rates)
+            print("System configured successfully\n ")
+        elif choice == "2":
+            business_date = input("Business date (YYYY-MM-DD, or press Enter for today): ").strip() or None
+            try:
+                result = self.run_end_of_day(business_date)
+            except (ImportError, ValueError) as error:
+                print(f"End-of-day run failed: {error}\n ")
+                return
+            if result['skipped']:
+                print("End-of-day processing has already been run for that date.\n ")
+            else:
+                print(f"Interest {result['interest']:.2f} and fees {result['fees']:.2f} posted across "
+                      f"{result['accounts']} accounts in {result['seconds']:.2f} s\n ")
+
+    @metrics.instrument('statement')
+    def statement(self, account_number, start_date, end_date, fmt='txt', file=None):
+        """Write an account's statement for 'YYYY-MM-DD' dates ``start_date`` to ``end_date`` inclusive.
+
+        ``fmt`` is 'txt', 'csv' or 'html'; the statement goes to ``file``,
+        standard output by default. Returns the number of transactions
+        listed, or None for an unknown account. See statements.py.
+        """
+        from statements import FORMATS, period, plan, write_statement
+        record = self.account_store.get(account_number)
+        if record is None:
+            return None
+        start, end = period(start_date, end_date)
+        opening, positions = plan(self.ledger, self.snapshots, account_number, start, end)
+        return write_statement(FORMATS[fmt](file or sys.stdout), account_number, record.account_name, opening,
+                               iter_positions(self.ledger.directory, positions), start, end)
+
+    @metrics.instrument('generate_statements')
+    def generate_statements(self, start_date, end_date, fmt='txt', directory=None, workers=None):
+        """Write every account's statement for the period into ``directory`` using a process pool.
+
+        Returns the number of statements, the seconds taken and statements per second.
+        """
+        from statements import generate_statements, period
+        start, end = period(start_date, end_date)
+        accounts = ((record.account_number, record.account_name) for record in self.account_store)
+        return generate_statements(self.ledger, self.snapshots, accounts, start, end, fmt,
+                                   directory or os.path.join(self.data_dir, 'statements'), workers)
+
+    @metrics.instrument('get_transaction_history')
+    def get_transaction_history(self, account_number, since=None, before=None, limit=20):
+        """Return a page of an account's postings from the ledger, oldest first.
+
+        ``since`` and ``before`` are txn_id cursors. Without them the
+        latest ``limit`` postings come back; pass the first txn_id of a
+        page as ``before`` for the page preceding it, or the last one as
+        ``since`` for the page after it. ``limit=None`` returns the whole
+        selected range.
+        """
+        if self.accounts.get(account_number) is None:
+            return "Account not found!"
+        return self.ledger.read(account_number, since, before, limit)
+    
+    def get_account_info(self, account_number):
+        account = self.accounts.get(account_number)
+        if account:
+            return {
+                'account_name': account.account_name,
+                'account_number': account.account_number,
+                'account_type': account.account_type,
+                'balance': account.balance
+            }
+        return {"error": "Account not found!"}
@@ -0,0 +1,69 @@
+"""Columnar ledger analytics on a synthetic ledger.
+
+Usage: python benchmarks/bench_analytics.py [--rows N] [--accounts N]
+
+Writes a ledger of random deposits, withdrawals and transfers to a
+temporary directory, then times the one-off decode into NumPy arrays,
+reloading the memory-mapped cache, and each summary query.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from analytics import LedgerColumns  # noqa: E402
+from ledger import Ledger  # noqa: E402
+from transactions import DEPOSIT, TRANSFER, WITHDRAWAL, Transaction  # noqa: E402
+
+
+def build_ledger(directory, rows, accounts):
+    ledger = Ledger(directory, batch_size=10000)
+    numbers = [f'2000{i:08d}' for i in range(accounts)]
+    start = time.time() - 90 * 86400
+    for i in range(rows):
+        account_number = random.choice(numbers)
+        amount = round(random.uniform(1, 500), 2)
+        choice = random.random()
+        timestamp = start + i * 90 * 86400 / rows
+        if choice < 0.3:
+            transaction = Transaction(account_number, DEPOSIT, amount, timestamp=timestamp)
+        elif choice < 0.5:
+            transaction = Transaction(account_number, WITHDRAWAL, -amount, timestamp=timestamp)
+        elif choice < 0.75:
+            transaction = Transaction(account_number, TRANSFER, -amount, random.choice(numbers), timestamp=timestamp)
+        else:
+            transaction = Transaction(account_number, TRANSFER, amount, random.choice(numbers), timestamp=timestamp)
+        ledger.append(transaction)
+    ledger.flush()
+    return ledger
+
+
+def timed(label, function):
+    start = time.perf_counter()
+    result = function()
+    print(f"{label:<22} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--accounts', type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        ledger = timed("write ledger", lambda: build_ledger(directory, args.rows, args.accounts))
+        timed("decode + cache", lambda: LedgerColumns(ledger))
+        columns = timed("load cache", lambda: LedgerColumns(ledger))
+        days = timed("daily volume", columns.daily_volume)
+        timed("top counterparties", columns.top_counterparties)
+        timed("balances", columns.balances)
+        timed("balances as of", lambda: columns.balances(columns.timestamp[len(columns) // 2]))
+        timed("by account type", lambda: columns.by_account_type(lambda number: 'savings' if int(number) % 2 else 'current'))
+        print(f"{len(columns)} postings over {len(days)} days, {len(columns.accounts)} accounts")
+        ledger.close()
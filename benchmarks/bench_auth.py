@@ -0,0 +1,64 @@
+"""Logins/sec and authenticated transfers/sec, before and after session tokens.
+
+Usage: python benchmarks/bench_auth.py [--transfers N] [--logins N]
+
+"before" is the old scheme: unsalted SHA-256 PIN hashes and a PIN check
+inside every transfer. "kdf+pin" shows what PBKDF2 would cost if every
+transfer still re-checked the PIN. "after" pays for one key derivation
+at log_in and authorises transfers with the session token.
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bank import BankManagementSystem  # noqa: E402
+from auth import hash_pin  # noqa: E402
+
+
+def make_bank(data_dir, legacy):
+    bank = BankManagementSystem(data_dir)
+    for account_number in ('1001', '1002'):
+        pin_hash = hashlib.sha256(b'1234').hexdigest() if legacy else hash_pin('1234')
+        bank.account_store.append(account_number, 'bench', 'savings', 1e12, 'single', pin_hash)
+    return bank
+
+
+def rate(count, seconds):
+    return f'{count / seconds:12,.0f}/s'
+
+
+def run(logins, transfers):
+    for label, legacy, use_token in (('before', True, False), ('kdf+pin', False, False), ('after', False, True)):
+        count = transfers if legacy or use_token else min(transfers, logins)
+        with tempfile.TemporaryDirectory() as data_dir:
+            bank = make_bank(data_dir, legacy)
+            account = bank.accounts.get('1001')
+
+            start = time.perf_counter()
+            for _ in range(logins):
+                account.authenticate('1234')
+            login_seconds = time.perf_counter() - start
+
+            token = bank.sessions.issue('1001')
+            start = time.perf_counter()
+            for _ in range(count):
+                if use_token:
+                    bank.transfer('1001', '1002', 1.0, token=token)
+                else:
+                    bank.transfer('1001', '1002', 1.0, '1234')
+            transfer_seconds = time.perf_counter() - start
+            bank.close()
+        print(f'{label:8}  logins {rate(logins, login_seconds)}  authenticated transfers {rate(count, transfer_seconds)}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--transfers', type=int, default=5000)
+    args = parser.parse_args()
+    run(args.logins, args.transfers)
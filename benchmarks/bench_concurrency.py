@@ -0,0 +1,62 @@
+"""Concurrent transfer stress test: conservation of funds and throughput per thread count.
+
+Usage: python benchmarks/bench_concurrency.py [--accounts N] [--transfers N] [--threads 1,2,4,8,16]
+
+Random transfers between a pool of accounts are posted from a thread
+pool through BankManagementSystem.transfer. After each run the sum of all
+balances, both in memory and in the account store, must equal the
+starting sum; any lost update makes the run fail.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bank import BankManagementSystem  # noqa: E402
+
+OPENING_BALANCE = 1_000_000.0
+
+
+def run(accounts, transfers, threads):
+    with tempfile.TemporaryDirectory() as data_dir:
+        bank = BankManagementSystem(data_dir)
+        numbers = [str(1000 + i) for i in range(accounts)]
+        bank.account_store.append_many([(number, 'bench', 'savings', OPENING_BALANCE, 'single', '')
+                                        for number in numbers])
+        tokens = {number: bank.sessions.issue(number) for number in numbers}
+        rng = random.Random(42)
+        work = [tuple(rng.sample(numbers, 2)) for _ in range(transfers)]
+
+        def post(pair):
+            sender, recipient = pair
+            return bank.transfer(sender, recipient, 1.0, token=tokens[sender])
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            posted = sum(pool.map(post, work, chunksize=64))
+        elapsed = time.perf_counter() - start
+
+        bank.accounts.flush()
+        expected = OPENING_BALANCE * accounts
+        in_memory = sum(account.balance for account in bank.accounts.values())
+        stored = sum(record.balance for record in bank.account_store)
+        bank.close()
+    conserved = in_memory == expected and stored == expected
+    print(f'threads {threads:3}  posted {posted:7}  {posted / elapsed:10,.0f} transfers/s  '
+          f'conserved {"yes" if conserved else f"NO ({in_memory - expected:+} in memory, {stored - expected:+} stored)"}')
+    return conserved
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--accounts', type=int, default=1000)
+    parser.add_argument('--transfers', type=int, default=20000)
+    parser.add_argument('--threads', default='1,2,4,8,16')
+    args = parser.parse_args()
+    results = [run(args.accounts, args.transfers, int(threads)) for threads in args.threads.split(',')]
+    sys.exit(0 if all(results) else 1)
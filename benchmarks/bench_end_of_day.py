@@ -0,0 +1,63 @@
+"""End-of-day interest and fee run over a large account base, against a time budget.
+
+Usage: python benchmarks/bench_end_of_day.py [--accounts N] [--chunk-size N] [--budget SECONDS] [--sync]
+
+Fills an account store in a temporary directory with --accounts accounts
+(70% savings, 30% current, log-normal balances). It runs end-of-day for
+one business date and then runs the same date again, which must do
+nothing. The script prints accounts per second and whether the run
+fitted in --budget seconds. It then checks that the store's total moved
+by exactly the interest paid less the fees charged, and that the
+trial balance is even. fsync is off unless --sync is given.
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bank import BankManagementSystem  # noqa: E402
+from synthetic import account_numbers  # noqa: E402
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--accounts', type=int, default=1_000_000)
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    parser.add_argument('--budget', type=float, default=60.0, help="seconds the run must finish in")
+    parser.add_argument('--sync', action='store_true', help="fsync the write-ahead log on every commit")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as data_dir:
+        bank = BankManagementSystem(data_dir)
+        bank.ledger.wal.sync_to_disk = args.sync
+        bank.account_store.append_many([(number, 'bench', rng.choice(['savings'] * 7 + ['current'] * 3),
+                                         round(rng.lognormvariate(7, 1.5), 2), 'single', '')
+                                        for number in account_numbers(args.accounts)])
+        before = math.fsum(record.balance for record in bank.account_store)
+
+        start = time.perf_counter()
+        result = bank.run_end_of_day('2026-01-31', args.chunk_size)
+        elapsed = time.perf_counter() - start
+        again = bank.run_end_of_day('2026-01-31', args.chunk_size)
+
+        after = math.fsum(record.balance for record in bank.account_store)
+        trial = bank.postings.trial_balance()
+        bank.close()
+
+    rate = args.accounts / elapsed
+    print(f"{args.accounts} accounts in {elapsed:.2f} s: {rate:,.0f} accounts/s, {result['postings']} postings "
+          f"({'within' if elapsed <= args.budget else 'OVER'} the {args.budget:.0f} s budget)")
+    print(f"interest {result['interest']:,.2f}  fees {result['fees']:,.2f}  "
+          f"second run {'skipped' if again['skipped'] else 'POSTED AGAIN'}")
+    drift = after - before - (result['interest'] - result['fees'])
+    ok = abs(drift) < 1e-3 and abs(trial['imbalance']) < 1e-6 and again['skipped'] and elapsed <= args.budget
+    print(f"balances {'agree' if abs(drift) < 1e-3 else f'DRIFT {drift:+}'}, "
+          f"trial balance imbalance {trial['imbalance']:.6f}")
+    sys.exit(0 if ok else 1)
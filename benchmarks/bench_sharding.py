@@ -0,0 +1,87 @@
+"""Throughput of the sharded bank as the number of shard processes grows.
+
+Usage: python benchmarks/bench_sharding.py [--shards 1,2,4,8] [--accounts N] [--operations N] [--sync]
+
+For each shard count, a ShardedBank is started in a temporary
+directory. --accounts accounts are opened and logged in, and then
+--operations random operations are posted from a pool of client
+threads, eight per shard. The mix is 30% deposits, 20% withdrawals and
+50% transfers, and most transfers cross shards. The script prints
+operations per second and the speed-up over the first shard count.
+Afterwards it checks that customer balances add up to the opening
+balances plus the net deposits, and that no money is left in CLEARING.
+
+Scaling is bounded by the cores available (reported at the start): every
+shard is a process, and so is the router. The write-ahead log's fsync is
+off unless --sync is given, so the numbers measure CPU rather than the
+disk.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sharding import ShardedBank  # noqa: E402
+
+OPENING_BALANCE = 1_000_000.0
+PIN = '1234'
+
+
+def run(shards, accounts, operations, sync):
+    with tempfile.TemporaryDirectory() as data_dir:
+        bank = ShardedBank(data_dir, shards, sync)
+        with ThreadPoolExecutor(8 * shards) as pool:
+            numbers = list(pool.map(lambda i: bank.open_account(f'bench {i}', 'savings', OPENING_BALANCE, '', PIN),
+                                    range(accounts)))
+            tokens = dict(zip(numbers, pool.map(lambda number: bank.log_in(number, PIN), numbers)))
+
+            rng = random.Random(42)
+            work = []
+            for _ in range(operations):
+                roll = rng.random()
+                op = 'deposit' if roll < 0.3 else 'withdraw' if roll < 0.5 else 'transfer'
+                work.append((op, *rng.sample(numbers, 2)))
+
+            def post(item):
+                op, account_number, other = item
+                if op == 'transfer':
+                    return op, bank.transfer(account_number, other, 1.0, token=tokens[account_number])
+                return op, getattr(bank, op)(account_number, 1.0, tokens[account_number])
+
+            start = time.perf_counter()
+            results = list(pool.map(post, work, chunksize=16))
+            elapsed = time.perf_counter() - start
+
+        net_deposits = sum(1.0 if op == 'deposit' else -1.0 for op, ok in results if ok and op != 'transfer')
+        expected = OPENING_BALANCE * accounts + net_deposits
+        total = bank.total_balance()
+        clearing = bank.clearing_balance()
+        bank.close()
+    conserved = abs(total - expected) < 1e-6 and abs(clearing) < 1e-6
+    return operations / elapsed, conserved, total - expected, clearing
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--shards', default='1,2,4,8')
+    parser.add_argument('--accounts', type=int, default=200)
+    parser.add_argument('--operations', type=int, default=20000)
+    parser.add_argument('--sync', action='store_true', help="fsync the write-ahead log on every commit")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} cores available")
+    baseline = None
+    ok = True
+    for shards in (int(count) for count in args.shards.split(',')):
+        rate, conserved, drift, clearing = run(shards, args.accounts, args.operations, args.sync)
+        baseline = baseline or rate
+        ok &= conserved
+        print(f"shards {shards:3d}  {rate:10,.0f} ops/s  speed-up {rate / baseline:5.2f}x  "
+              f"conserved {'yes' if conserved else f'NO (drift {drift:+}, clearing {clearing:+})'}")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,72 @@
+"""Point-in-time balance queries: balance_as_of against replaying the whole history.
+
+Usage: python benchmarks/bench_snapshots.py [--accounts N] [--deposits N] [--snapshots N] [--queries N]
+
+Opens --accounts accounts in a temporary directory and makes --deposits
+deposits spread over them, taking --snapshots balance snapshots at even
+intervals along the way. Then, for --queries random (account, moment)
+pairs, it asks balance_as_of. It compares the answer with a full replay
+of the account's postings up to that moment. The script prints both
+latencies and fails if any answer differs.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bank import BankManagementSystem  # noqa: E402
+from synthetic import account_numbers  # noqa: E402
+
+
+def replay(bank, account_number, timestamp):
+    balance = 0.0
+    for posting in bank.ledger.read(account_number):
+        if posting.timestamp > timestamp:
+            break
+        balance += posting.amount
+    return balance
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--accounts', type=int, default=100)
+    parser.add_argument('--deposits', type=int, default=50000)
+    parser.add_argument('--snapshots', type=int, default=20)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as data_dir:
+        bank = BankManagementSystem(data_dir)
+        bank.ledger.wal.sync_to_disk = False
+        numbers = list(account_numbers(args.accounts))
+        bank.account_store.append_many([(number, 'bench', 'savings', 0.0, 'single', '') for number in numbers])
+        moments = []
+        every = max(1, args.deposits // args.snapshots)
+        for i in range(args.deposits):
+            bank.deposit(rng.choice(numbers), round(rng.uniform(1, 100), 2))
+            if i % 100 == 0:
+                moments.append(time.time())
+            if (i + 1) % every == 0:
+                bank.snapshot()
+
+        queries = [(rng.choice(numbers), rng.choice(moments)) for _ in range(args.queries)]
+        start = time.perf_counter()
+        answers = [bank.balance_as_of(account_number, moment) for account_number, moment in queries]
+        fast = (time.perf_counter() - start) / len(queries)
+        start = time.perf_counter()
+        expected = [replay(bank, account_number, moment) for account_number, moment in queries]
+        slow = (time.perf_counter() - start) / len(queries)
+        bank.close()
+
+    wrong = sum(abs(answer - value) > 1e-6 for answer, value in zip(answers, expected))
+    print(f"{args.deposits} deposits over {args.accounts} accounts, {args.snapshots} snapshots")
+    print(f"balance_as_of {fast * 1e6:9.1f} us/query   full replay {slow * 1e6:9.1f} us/query   "
+          f"speed-up {slow / fast:5.1f}x   {'all answers agree' if not wrong else f'{wrong} WRONG'}")
+    sys.exit(1 if wrong else 0)
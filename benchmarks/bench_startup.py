@@ -0,0 +1,40 @@
+"""Cold-start cost of the bank library, checked against a budget.
+
+Usage: python benchmarks/bench_startup.py [--runs N] [--budget-ms MS]
+
+Each run starts a fresh interpreter that imports BankAccount and builds a
+BankManagementSystem. The time above a bare interpreter start is compared
+with the budget, and the script exits non-zero when the best run is over
+it. Data files are only opened on first use, so construction should stay
+cheap no matter how many accounts or employees exist.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def best_time(code, runs):
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--budget-ms', type=float, default=50.0)
+    args = parser.parse_args()
+
+    baseline = best_time('pass', args.runs)
+    startup = best_time('import BankAccount; BankAccount.BankManagementSystem()', args.runs)
+    overhead_ms = (startup - baseline) * 1000
+    print(f"interpreter {baseline * 1000:.1f} ms  import + construct {startup * 1000:.1f} ms  "
+          f"overhead {overhead_ms:.1f} ms  budget {args.budget_ms:.1f} ms")
+    sys.exit(0 if overhead_ms <= args.budget_ms else 1)
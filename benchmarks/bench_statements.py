@@ -0,0 +1,65 @@
+"""Month-end statement run: statements per second from the streaming generator.
+
+Usage: python benchmarks/bench_statements.py [--accounts N] [--deposits N] [--format txt|csv|html] [--workers 1,4]
+
+Opens --accounts accounts in a temporary directory and makes --deposits
+deposits spread over them. It takes a balance snapshot halfway, so each
+opening balance comes from a snapshot. It then writes today's statement
+for every account with each worker count in --workers. The script prints
+statements per second and the peak memory of the worker processes. The
+last run's closing balances are checked against the account store.
+"""
+import argparse
+import os
+import random
+import re
+import resource
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bank import BankManagementSystem  # noqa: E402
+from synthetic import account_numbers  # noqa: E402
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--accounts', type=int, default=2000)
+    parser.add_argument('--deposits', type=int, default=50000)
+    parser.add_argument('--format', default='txt', choices=['txt', 'csv', 'html'])
+    parser.add_argument('--workers', default='1,4')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as data_dir:
+        bank = BankManagementSystem(data_dir)
+        bank.ledger.wal.sync_to_disk = False
+        numbers = list(account_numbers(args.accounts))
+        bank.account_store.append_many([(number, f'bench {i}', 'savings', 0.0, 'single', '')
+                                        for i, number in enumerate(numbers)])
+        for i in range(args.deposits):
+            bank.deposit(rng.choice(numbers), round(rng.uniform(1, 100), 2))
+            if i == args.deposits // 2:
+                bank.snapshot()
+        today = time.strftime('%Y-%m-%d')
+
+        directory = None
+        for workers in (int(count) for count in args.workers.split(',')):
+            directory = os.path.join(data_dir, f'statements-{workers}')
+            result = bank.generate_statements(today, today, args.format, directory, workers)
+            print(f"workers {workers:3d}  {result['statements']} statements in {result['seconds']:.2f} s  "
+                  f"{result['per_second']:,.0f} statements/s")
+        print(f"peak worker memory {resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024:.1f} MiB")
+
+        wrong = 0
+        closing = re.compile(r'Closing balance\D*?(-?\d+\.\d\d)')
+        for record in bank.account_store:
+            name = next(name for name in os.listdir(directory) if name.startswith(record.account_number))
+            with open(os.path.join(directory, name)) as file:
+                wrong += abs(float(closing.findall(file.read())[-1]) - record.balance) > 0.005
+        bank.close()
+    print('closing balances agree with the store' if not wrong else f'{wrong} closing balances WRONG')
+    sys.exit(1 if wrong else 0)
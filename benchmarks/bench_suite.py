@@ -0,0 +1,166 @@
+"""Benchmark suite for the banking core at several scales, with results saved as JSON.
+
+Usage: python benchmarks/bench_suite.py [--scales 1000x10000 10000x100000] [--seed S] [--output PATH] [--compare PATH]
+
+For each ACCOUNTSxTRANSACTIONS scale, synthetic.py generates a bank in a
+temporary directory, and the suite then times the hot paths without any
+prompts:
+
+* load_accounts_from_csv, for the generated accounts,
+* loading the employee roster,
+* deposit, withdraw and transfer, replaying the Zipf-skewed workload,
+* get_transaction_history for the workload's accounts,
+* generate_reports (the first call after the workload, then a repeat), and
+* startup, meaning reopening the bank and looking up one account.
+
+Synthetic PINs come from a small pool and are hashed once each, and
+transfers use session tokens issued directly. PIN hashing is
+deliberately slow and has its own benchmark (bench_auth.py). The
+results go to --output together with the git commit they were measured
+on. --compare prints the change against an earlier results file.
+"""
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from auth import hash_pin  # noqa: E402
+from bank import BankManagementSystem  # noqa: E402
+from synthetic import generate  # noqa: E402
+
+
+class Timings:
+    """Per-operation latencies in seconds."""
+
+    def __init__(self):
+        self.samples = {}
+
+    @contextlib.contextmanager
+    def time(self, name):
+        start = time.perf_counter()
+        yield
+        self.samples.setdefault(name, []).append(time.perf_counter() - start)
+
+    def summary(self):
+        results = {}
+        for name, samples in self.samples.items():
+            ordered = sorted(samples)
+            total = sum(samples)
+            results[name] = {'count': len(samples), 'seconds': total,
+                             'ops_per_sec': len(samples) / total if total else None,
+                             'p50_ms': ordered[len(ordered) // 2] * 1000,
+                             'p99_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000}
+        return results
+
+
+@contextlib.contextmanager
+def quiet(answers=''):
+    """Silence the bank's prints and answer its prompts with ``answers``."""
+    stdin = sys.stdin
+    sys.stdin = io.StringIO(answers)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        sys.stdin = stdin
+
+
+def run_scale(accounts, transactions, seed):
+    timings = Timings()
+    with tempfile.TemporaryDirectory() as data_dir:
+        paths = generate(data_dir, accounts, transactions, seed=seed)
+        with open(paths['workload']) as file:
+            workload = [json.loads(line) for line in file]
+
+        bank = BankManagementSystem(data_dir)
+        with timings.time('load_accounts_from_csv'):
+            bank.load_accounts_from_csv(paths['accounts'], functools.lru_cache(maxsize=None)(hash_pin))
+        with timings.time('load_employees'):
+            len(bank.employees)
+
+        tokens = {}
+        with quiet():
+            for operation in workload:
+                op, amount = operation['op'], operation['amount']
+                if op == 'transfer':
+                    sender = operation['sender']
+                    token = tokens.get(sender) or tokens.setdefault(sender, bank.sessions.issue(sender))
+                    with timings.time('transfer'):
+                        bank.transfer(sender, operation['recipient'], amount, token=token)
+                else:
+                    with timings.time(op):
+                        getattr(bank, op)(operation['account'], amount)
+
+        touched = list(dict.fromkeys(operation.get('account') or operation['sender'] for operation in workload))
+        for account_number in touched[:1000]:
+            with timings.time('get_transaction_history'):
+                bank.get_transaction_history(account_number)
+
+        for name in ('generate_reports_first', 'generate_reports'):
+            with quiet('\n'), timings.time(name):
+                bank.generate_reports()
+        bank.close()
+
+        with timings.time('startup'):
+            bank = BankManagementSystem(data_dir)
+            bank.accounts.get(touched[0])
+        bank.close()
+    return timings.summary()
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous):
+    earlier = {(scale['accounts'], scale['transactions']): scale['results'] for scale in previous['scales']}
+    for scale in results['scales']:
+        before = earlier.get((scale['accounts'], scale['transactions']))
+        if before is None:
+            continue
+        print(f"\n{scale['accounts']} accounts x {scale['transactions']} transactions vs {previous['commit']}")
+        for name, result in scale['results'].items():
+            if name in before and before[name]['p50_ms']:
+                change = result['p50_ms'] / before[name]['p50_ms'] - 1
+                print(f"  {name:<26} p50 {before[name]['p50_ms']:9.3f} -> {result['p50_ms']:9.3f} ms  {change:+7.1%}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', nargs='+', default=['1000x10000', '10000x100000'],
+                        help="ACCOUNTSxTRANSACTIONS pairs")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench-results.json')
+    parser.add_argument('--compare', help="earlier results file to compare with")
+    args = parser.parse_args()
+
+    results = {'commit': git_commit(), 'python': platform.python_version(), 'platform': platform.platform(),
+               'timestamp': time.time(), 'seed': args.seed, 'scales': []}
+    for scale in args.scales:
+        accounts, transactions = (int(part) for part in scale.split('x'))
+        print(f"{accounts} accounts x {transactions} transactions")
+        scale_results = run_scale(accounts, transactions, args.seed)
+        for name, result in scale_results.items():
+            print(f"  {name:<26} {result['count']:8d}  p50 {result['p50_ms']:9.3f} ms  p99 {result['p99_ms']:9.3f} ms")
+        results['scales'].append({'accounts': accounts, 'transactions': transactions, 'results': scale_results})
+
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(f"\nResults saved to {args.output}")
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
@@ -0,0 +1,65 @@
+"""Memory and throughput of Transaction records against the old text postings.
+
+Usage: python benchmarks/bench_transactions.py [--count N]
+
+Builds N transfer postings three ways (formatted strings, Transaction
+objects and one packed buffer), reports the memory each takes per
+million postings, then times turning text into records, packing records
+and unpacking them again.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from transactions import TRANSFER, Transaction  # noqa: E402
+
+
+def measure(label, build, count):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{label:<28} {memory / count * 1e6 / 2**20:8.1f} MiB per million")
+    return result, elapsed
+
+
+def rate(label, count, elapsed):
+    print(f"{label:<28} {count / elapsed / 1e6:8.2f} M postings/s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=1000000)
+    args = parser.parse_args()
+
+    random.seed(1)
+    fields = [(f'2000{random.randrange(10**8):08d}', round(random.uniform(1, 5000), 2), f'2000{random.randrange(10**8):08d}')
+              for _ in range(args.count)]
+
+    texts, _ = measure("strings", lambda: [f"Transfer: -{amount} to {counterparty}"
+                                           for _, amount, counterparty in fields], args.count)
+    records, _ = measure("Transaction objects", lambda: [
+        Transaction(account_number, TRANSFER, -amount, counterparty, 0.0, 1.7e9, i)
+        for i, (account_number, amount, counterparty) in enumerate(fields, start=1)], args.count)
+    packed, pack_time = measure("packed records", lambda: b''.join(record.pack() for record in records), args.count)
+    print()
+
+    start = time.perf_counter()
+    for text, (account_number, _, _) in zip(texts, fields):
+        Transaction.parse(text, account_number)
+    rate("parse text", args.count, time.perf_counter() - start)
+    start = time.perf_counter()
+    [str(record) for record in records]
+    rate("format text", args.count, time.perf_counter() - start)
+    rate("pack", args.count, pack_time)
+    start = time.perf_counter()
+    Transaction.unpack_all(packed)
+    rate("unpack", args.count, time.perf_counter() - start)
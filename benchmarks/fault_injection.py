@@ -0,0 +1,136 @@
+"""Kill the bank mid-posting and check that recovery conserves funds.
+
+Usage: python benchmarks/fault_injection.py [--rounds N] [--accounts N] [--threads N]
+
+Opens accounts in a temporary data directory, then repeatedly starts a
+child process that hammers them with transfers and transfer batches
+from several threads and SIGKILLs it at a random moment. Some rounds
+also leave a half-written frame at the end of the write-ahead log, as
+a power cut in the middle of a write would. After every kill the bank
+is reopened and checked:
+
+* the balances still add up to the money that was deposited,
+* every account's balance equals the sum of its ledger postings and
+  the balance_after of its latest posting, and
+* txn_ids in the ledger are consecutive.
+
+tests/test_recovery.py runs a few of these rounds under pytest.
+
+Exits non-zero on the first violation.
+"""
+import argparse
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bank import BankManagementSystem  # noqa: E402
+
+OPENING_BALANCE = 1000.0
+PIN = '1234'
+
+
+def setup(data_dir, count):
+    bank = BankManagementSystem(data_dir)
+    numbers = [bank.open_account(f'Account {i}', 'savings', OPENING_BALANCE, '', PIN) for i in range(count)]
+    bank.close()
+    with open(os.path.join(data_dir, 'accounts.json'), 'w') as file:
+        json.dump(numbers, file)
+    return numbers
+
+
+def child(data_dir, threads, seed):
+    """Post transfers until killed."""
+    bank = BankManagementSystem(data_dir)
+    with open(os.path.join(data_dir, 'accounts.json')) as file:
+        numbers = json.load(file)
+    tokens = {number: bank.log_in(number, PIN) for number in numbers}
+    print('ready', flush=True)
+
+    def work(worker):
+        rng = random.Random(seed * 1000 + worker)
+        while True:
+            if rng.random() < 0.8:
+                sender, recipient = rng.sample(numbers, 2)
+                bank.transfer(sender, recipient, round(rng.uniform(1, 200), 2), token=tokens[sender])
+            else:
+                senders = rng.sample(numbers, 3)  # Few senders, so the batch verifies few PINs
+                batch = []
+                for _ in range(20):
+                    sender = rng.choice(senders)
+                    recipient = rng.choice([number for number in numbers if number != sender])
+                    batch.append((sender, recipient, round(rng.uniform(1, 200), 2), PIN))
+                bank.transfer_batch(batch)
+
+    for worker in range(threads):
+        threading.Thread(target=work, args=(worker,), daemon=True).start()
+    threading.Event().wait()
+
+
+def check(data_dir, numbers):
+    """Reopen the bank and return a list of problems found."""
+    problems = []
+    bank = BankManagementSystem(data_dir)
+    balances = {number: bank.accounts[number].balance for number in numbers}
+    total = sum(balances.values())
+    if abs(total - OPENING_BALANCE * len(numbers)) > 1e-6:
+        problems.append(f"total {total:.2f} != {OPENING_BALANCE * len(numbers):.2f}")
+    for number in numbers:
+        history = bank.get_transaction_history(number, limit=None)
+        posted = sum(transaction.amount for transaction in history)
+        if abs(posted - balances[number]) > 1e-6:
+            problems.append(f"{number}: balance {balances[number]:.2f} but postings sum to {posted:.2f}")
+        if history and abs(history[-1].balance_after - balances[number]) > 1e-6:
+            problems.append(f"{number}: balance {balances[number]:.2f} but the latest posting left "
+                            f"{history[-1].balance_after:.2f}")
+    ids = [record.txn_id for record in bank.ledger.scan()]
+    if ids != list(range(1, len(ids) + 1)):
+        problems.append("txn_ids are not consecutive")
+    bank.close()
+    return problems, len(ids)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--accounts', type=int, default=20)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--seed', type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.threads, args.seed)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        numbers = setup(data_dir, args.accounts)
+        for round_number in range(1, args.rounds + 1):
+            process = subprocess.Popen([sys.executable, __file__, '--child', data_dir, '--threads', str(args.threads),
+                                        '--seed', str(round_number)], stdout=subprocess.PIPE, text=True)
+            process.stdout.readline()  # Wait until the child has logged in
+            time.sleep(random.uniform(0.05, 1.0))
+            process.send_signal(signal.SIGKILL)
+            process.wait()
+            process.stdout.close()
+
+            torn = random.random() < 0.3
+            if torn:
+                with open(os.path.join(data_dir, 'ledger', 'wal.log'), 'ab') as file:
+                    file.write(os.urandom(random.randint(1, 60)))
+
+            problems, postings = check(data_dir, numbers)
+            print(f"round {round_number:3d}  postings {postings:8d}  {'torn log  ' if torn else 'clean kill'}  "
+                  f"{'ok' if not problems else 'FAILED'}")
+            for problem in problems:
+                print(f"    {problem}")
+            if problems:
+                sys.exit(1)
+    print("funds conserved after every crash")
@@ -0,0 +1,100 @@
+"""Load generator for server.py: concurrent clients, throughput and p50/p99 latency.
+
+Usage: python benchmarks/loadgen.py [--host H --port P | --unix PATH] [--clients N] [--requests N] [--accounts N]
+
+Opens --accounts accounts through the server and logs each one in, then
+runs --clients connections in parallel. Each client sends --requests
+requests, drawn from a mix of deposits, withdrawals, transfers and
+account lookups, waiting for each response before sending the next.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+
+class Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+
+    @classmethod
+    async def connect(cls, args):
+        if args.unix:
+            reader, writer = await asyncio.open_unix_connection(args.unix, limit=2 ** 20)
+        else:
+            reader, writer = await asyncio.open_connection(args.host, args.port, limit=2 ** 20)
+        return cls(reader, writer)
+
+    async def call(self, op, **fields):
+        self.next_id += 1
+        self.writer.write(json.dumps({'id': self.next_id, 'op': op, **fields}).encode() + b'\n')
+        await self.writer.drain()
+        response = json.loads(await self.reader.readline())
+        if not response['ok']:
+            raise RuntimeError(f"{op} failed: {response['error']}")
+        return response['result']
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def setup(args):
+    client = await Client.connect(args)
+    accounts = []
+    for i in range(args.accounts):
+        account_number = await client.call('create_account', account_name=f'load {i}', account_type='savings',
+                                           initial_balance=1_000_000, personal_info='single', pin='1234')
+        token = await client.call('log_in', account_number=account_number, pin='1234')
+        accounts.append((account_number, token))
+    await client.close()
+    return accounts
+
+
+async def run_client(args, accounts, seed, latencies):
+    rng = random.Random(seed)
+    client = await Client.connect(args)
+    for _ in range(args.requests):
+        (account_number, token), (recipient, _) = rng.sample(accounts, 2)
+        kind = rng.random()
+        start = time.perf_counter()
+        if kind < 0.3:
+            await client.call('deposit', account_number=account_number, amount=1, token=token)
+        elif kind < 0.5:
+            await client.call('withdraw', account_number=account_number, amount=1, token=token)
+        elif kind < 0.8:
+            await client.call('transfer', sender_account_number=account_number, recipient_account_number=recipient,
+                              amount=1, token=token)
+        else:
+            await client.call('get_account_info', account_number=account_number, token=token)
+        latencies.append(time.perf_counter() - start)
+    await client.close()
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def main(args):
+    accounts = await setup(args)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(args, accounts, seed, latencies) for seed in range(args.clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f"clients {args.clients}  requests {len(latencies)}  {len(latencies) / elapsed:,.0f} req/s  "
+          f"p50 {percentile(latencies, 0.50) * 1000:.2f} ms  p99 {percentile(latencies, 0.99) * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix')
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--accounts', type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,114 @@
+"""Deterministic synthetic bank data: accounts, employees and a transaction workload.
+
+Usage: python benchmarks/synthetic.py DIR [--accounts N] [--transactions N] [--employees N] [--seed S] [--zipf S]
+
+Writes ``accounts.csv`` (in the account_info.csv format),
+``employee_info.csv`` and ``workload.jsonl`` to DIR. Account popularity
+follows a Zipf distribution, so a few accounts take part in most
+transactions, as on a real bank's hot accounts. The same arguments
+always produce the same files.
+"""
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from allocator import AccountNumberAllocator  # noqa: E402
+from employee_directory import COLUMNS as EMPLOYEE_COLUMNS, POSITIONS  # noqa: E402
+
+FIRST_NAMES = ['ada', 'bola', 'chidi', 'dayo', 'emeka', 'funmi', 'gbenga', 'halima', 'ife', 'joy', 'kemi', 'lanre',
+               'musa', 'ngozi', 'ola', 'segun', 'tems', 'tomiwa', 'uche', 'yemi']
+LAST_NAMES = ['adeyemi', 'bello', 'okafor', 'onifara', 'eze', 'ibrahim', 'nwosu', 'ogunleye', 'balogun', 'afolabi']
+LOCATIONS = ['lagos', 'abuja', 'ibadan', 'kano', 'enugu', 'port harcourt', 'benin', 'jos']
+ACCOUNT_TYPES = ['savings'] * 7 + ['current'] * 3
+OPERATIONS = ['deposit'] * 3 + ['withdraw'] * 2 + ['transfer'] * 5
+PIN_POOL = 100  # Distinct PINs, so cached hashing in benchmarks stays cheap
+
+
+def account_numbers(count):
+    """The first ``count`` numbers the allocator would hand out."""
+    for value in range(1, count + 1):
+        digits = f'{AccountNumberAllocator.PREFIX}{value:07d}'
+        yield digits + AccountNumberAllocator.check_digit(digits)
+
+
+def zipf_sampler(rng, count, s):
+    """Return a function drawing k indexes in range(count), index i with weight 1 / rank(i) ** s."""
+    ranks = list(range(count))
+    rng.shuffle(ranks)  # Popular accounts are spread over the number range
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) ** s for rank in range(count)))
+    return lambda k: [ranks[i] for i in rng.choices(range(count), cum_weights=cum_weights, k=k)]
+
+
+def write_accounts(path, numbers, rng):
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['name', 'account_number', 'account_type', 'current_amount', 'status', 'pins'])
+        for account_number in numbers:
+            writer.writerow([f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}', account_number,
+                             rng.choice(ACCOUNT_TYPES), round(rng.lognormvariate(7, 1.5), 2),
+                             rng.choice(['single', 'married']), f'{rng.randrange(PIN_POOL):04d}'])
+
+
+def write_employees(path, count, rng):
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(EMPLOYEE_COLUMNS)
+        for employee_id in range(1, count + 1):
+            name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+            password = hashlib.sha256(f'password{employee_id}'.encode()).hexdigest()  # Legacy digest, cheap to make
+            writer.writerow([employee_id, name, POSITIONS[str(rng.randint(1, 5))], f'080{rng.randrange(10 ** 8):08d}',
+                             f"{name.replace(' ', '.')}@example.com", rng.choice(LOCATIONS), password])
+
+
+def write_workload(path, numbers, count, rng, s):
+    """One JSON operation per line: deposit/withdraw with an account, transfer with a sender and recipient."""
+    sample = zipf_sampler(rng, len(numbers), s)
+    accounts = iter(sample(count * 2))
+    with open(path, 'w') as file:
+        for _ in range(count):
+            op = rng.choice(OPERATIONS)
+            amount = round(rng.lognormvariate(3.5, 1.0), 2)
+            first = next(accounts)
+            if op == 'transfer':
+                second = next(accounts)
+                if second == first:
+                    second = (first + 1) % len(numbers)
+                record = {'op': op, 'sender': numbers[first], 'recipient': numbers[second], 'amount': amount}
+            else:
+                record = {'op': op, 'account': numbers[first], 'amount': amount}
+            file.write(json.dumps(record) + '\n')
+
+
+def generate(directory, accounts=1000, transactions=10000, employees=None, seed=0, zipf=1.1):
+    """Write the three data files to ``directory``; returns their paths by name."""
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    numbers = list(account_numbers(accounts))
+    paths = {name: os.path.join(directory, file_name) for name, file_name in
+             (('accounts', 'accounts.csv'), ('employees', 'employee_info.csv'), ('workload', 'workload.jsonl'))}
+    write_accounts(paths['accounts'], numbers, rng)
+    write_employees(paths['employees'], accounts // 20 if employees is None else employees, rng)
+    write_workload(paths['workload'], numbers, transactions, rng, zipf)
+    return paths
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory')
+    parser.add_argument('--accounts', type=int, default=1000)
+    parser.add_argument('--transactions', type=int, default=10000)
+    parser.add_argument('--employees', type=int, default=None, help="default: one per 20 accounts")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--zipf', type=float, default=1.1, help="Zipf exponent of account popularity")
+    args = parser.parse_args()
+    for name, path in generate(args.directory, args.accounts, args.transactions, args.employees,
+                               args.seed, args.zipf).items():
+        print(f"{name:<10} {path}")
@@ -0,0 +1,142 @@
+"""Streaming bulk import of accounts and opening balances from a CSV file.
+
+Usage: python bulk_import.py accounts.csv [--data-dir DIR] [--chunk-size N] [--workers N]
+
+The input needs the columns account_name, account_type, initial_balance,
+personal_info and pin (the older names name, current_amount, status and
+pins are accepted too). An optional account_number column keeps existing
+numbers; rows without one get a number from the shared allocator. The file is
+read and written one chunk at a time, so memory use does not depend on
+the size of the input. Rejected rows are written to
+``<input>.rejected.csv`` together with the reason.
+"""
+import argparse
+import csv
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from account_store import AccountStore
+from allocator import AccountNumberAllocator
+from auth import hash_pin
+from ledger import Ledger
+from postings import PostingEngine, UnbalancedPosting, opening_legs
+
+
+COLUMNS = {
+    'account_name': ('account_name', 'name'),
+    'account_type': ('account_type',),
+    'initial_balance': ('initial_balance', 'current_amount'),
+    'personal_info': ('personal_info', 'status'),
+    'pin': ('pin', 'pins'),
+}
+
+
+def read_chunks(path, chunk_size):
+    """Yield lists of at most ``chunk_size`` rows from a CSV file."""
+    with open(path, newline='') as file:
+        reader = csv.DictReader(file)
+        while True:
+            chunk = list(islice(reader, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def validate_row(row):
+    """Return (fields, None) for a usable row or (None, reason) otherwise."""
+    fields = {}
+    for field, names in COLUMNS.items():
+        value = next((row[name] for name in names if row.get(name) is not None), None)
+        if value is None:
+            return None, f"missing {field}"
+        fields[field] = value.strip()
+    if not fields['account_name']:
+        return None, "empty account_name"
+    try:
+        fields['initial_balance'] = float(fields['initial_balance'])
+    except ValueError:
+        return None, "initial_balance is not a number"
+    if not math.isfinite(fields['initial_balance']):
+        return None, "initial_balance is not finite"
+    if fields['initial_balance'] < 0:
+        return None, "negative initial_balance"
+    if not (fields['pin'].isdigit() and len(fields['pin']) == 4):
+        return None, "pin must be a 4-digit number"
+    fields['account_number'] = (row.get('account_number') or '').strip()
+    return fields, None
+
+
+def import_accounts(path, store, postings, allocator, chunk_size=10000, workers=None, rejected_path=None):
+    """Import every valid row of ``path`` into ``store``.
+
+    Each chunk's records are stored first, then their opening balances
+    are posted through ``postings``, a PostingEngine, as deposits from the
+    bank's CASH account. A row whose posting is refused is closed again
+    and written to the rejected file. Returns (imported, rejected) counts.
+    """
+    rejected_path = rejected_path or f'{path}.rejected.csv'
+    imported = rejected = 0
+    with ProcessPoolExecutor(workers) as pool, open(rejected_path, 'w', newline='') as rejected_file:
+        rejects = csv.writer(rejected_file)
+        rejects.writerow(['line', 'reason'])
+        line = 1
+        for chunk in read_chunks(path, chunk_size):
+            valid = []
+            seen = set()
+            for row in chunk:
+                line += 1
+                fields, reason = validate_row(row)
+                account_number = fields and fields['account_number']
+                if account_number and not allocator.is_valid(account_number):
+                    reason = f"account_number {account_number} fails the check digit"
+                if account_number and (account_number in seen or store.lookup(account_number) is not None):
+                    reason = f"account_number {account_number} already exists"
+                if reason:
+                    rejects.writerow([line, reason])
+                    rejected += 1
+                    continue
+                seen.add(account_number)
+                valid.append((line, fields))
+
+            numbers = iter(allocator.reserve(sum(1 for _, fields in valid if not fields['account_number']), seen))
+            pin_hashes = pool.map(hash_pin, [fields['pin'] for _, fields in valid],
+                                  chunksize=max(1, len(valid) // 64))
+            records = []
+            for (_, fields), pin_hash in zip(valid, pin_hashes):
+                account_number = fields['account_number'] or next(numbers)
+                records.append((account_number, fields['account_name'], fields['account_type'],
+                                fields['initial_balance'], fields['personal_info'], pin_hash))
+            # Accounts exist before their postings, so the ledger never names an account the store lacks
+            store.append_many(records)
+            for (line, _), (account_number, _, _, balance, _, _) in zip(valid, records):
+                if balance:
+                    try:
+                        postings.post(opening_legs(account_number, balance))
+                    except UnbalancedPosting as error:
+                        store.deactivate(account_number)
+                        rejects.writerow([line, f"opening balance refused: {error}"])
+                        rejected += 1
+                        continue
+                imported += 1
+            postings.ledger.flush()
+    store.flush()
+    return imported, rejected
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Bulk import accounts from a CSV file.")
+    parser.add_argument('path')
+    parser.add_argument('--data-dir', default='.')
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    store = AccountStore(os.path.join(args.data_dir, 'accounts.dat'))
+    ledger = Ledger(os.path.join(args.data_dir, 'ledger'))
+    allocator = AccountNumberAllocator(store, os.path.join(args.data_dir, 'account_seq'))
+    imported, rejected = import_accounts(args.path, store, PostingEngine(ledger), allocator, args.chunk_size, args.workers)
+    ledger.close()
+    store.close()
+    print(f"Imported {imported} accounts, rejected {rejected}.")
@@ -0,0 +1,335 @@
+"""Interactive menus for the bank. Run ``python BankAccount.py`` to start them."""
+import getpass
+import time
+from typing import Dict
+
+from accounts import BankAccount
+from bank import BankManagementSystem
+
+bank = None  # Set by main()
+
+
+# Define a class for the menu
+class Menu:
+    MENU = (
+        ('Exit', 'exit'),
+        ('Create a new account', 'create_account'),
+        ('Log into an account', 'log_in'),
+        ('Close an account', 'close_account'),
+        ('Administrative Tasks', 'admin_tasks'),
+    )
+
+    def screen(self):
+        prompt = '\n'.join(f'{i}. {name}' for i, (name, _) in enumerate(self.MENU)) + '\n'
+        while True:
+            choice = input(prompt)
+            try:
+                name, method = self.MENU[int(choice)]
+                getattr(self, method)()
+            except (ValueError, IndexError):
+                print('Invalid choice')
+
+    def exit(self):
+        print('Goodbye!')
+        exit()
+
+
+    def close_account(self):
+        account_number = input("Enter the account number to close: ")
+        bank.close_account(account_number)
+        
+    def log_in(self):
+        account_number = input("Enter your account number: ")
+        pin = getpass.getpass("Enter your PIN: ")
+        if bank.log_in(account_number, pin):
+            print("You have successfully logged in!\n ")
+            self.account_menu(account_number)
+        else:
+            print("Login failed. Please check your account number and PIN.\n ")
+
+
+class BankingSystem(Menu):
+    def __init__(self):
+        self.accounts: Dict[str, BankAccount] = {}
+        super().__init__()  # Call the constructor of the parent class
+        
+
+    def create_account(self):
+        account_name = input("Enter your full name: ")
+        account_type = input("Enter account type (e.g., savings or current): ")
+        initial_balance = float(input("Enter initial balance: "))
+        personal_info = input("Enter personal info (e.g., married or single): ")
+        pin = self._get_valid_pin()
+        account_number = bank.allocator.allocate()
+        account = BankAccount(account_name, account_number, account_type, initial_balance, personal_info, pin)
+        self.accounts[account_number] = account
+        print('Account created successfully!\n ')
+
+    def log_in(self):
+            account_number = input("Enter your account number: ")
+            pin = getpass.getpass("Enter your PIN: ")
+            account = self.accounts.get(account_number)
+            if account and account.pin == pin:
+                    print("You have successfully logged in!\n ")
+                    if account.account_type=="employee" :
+                        employee_name = self.get_employee_name(account_number)
+                        print(f"Welcome, {employee_name}!\n")
+                    self.account_menu(account_number)  # Go to account menu based on user's position
+            else:
+                print("Login failed. Please check your account number and PIN.\n")
+
+    def admin_tasks(self):
+            print("\nAdministrative Tasks:")
+            print("1. Managing employee accounts")
+            print("2. Monitoring and auditing transactions")
+            print("3. Generating reports")
+            print("4. Configuring system parameters")
+            print("5. Back to main menu\n ")
+
+            admin_choice = input("Enter your choice: ")
+            if admin_choice == "1":
+                self.manage_employee_accounts()
+            elif admin_choice == "2":
+                bank.monitor_transactions()
+            elif admin_choice == "3":
+                bank.generate_reports()
+            elif admin_choice == "4":
+                bank.configure_system()
+            elif admin_choice == "5":
+                print("Returning to the main menu...\n ")
+            else:
+                print("Invalid choice. Please enter a valid option.\n ")
+                
+    def manage_employee_accounts(self):
+        print("\nManaging Employee Accounts:")
+        print("1. Create a new employee account")
+        print("2. View all employee accounts")
+        print("3. Update employee account information")
+        print("4. Delete an employee account")
+        print("5. Back to administrative tasks\n ")
+
+        choice = input("Enter your choice: ")
+        if choice == "1":
+            self.create_employee_account()
+        elif choice == "2":
+            self.view_all_employees()
+        elif choice == "3":
+            employee_id = input("Enter employee ID: ")
+            self.update_employee_info(employee_id)
+        elif choice == "4":
+            employee_id = input("Enter employee ID: ")
+            self.delete_employee_account(employee_id)
+        elif choice == "5":
+            print("Returning to administrative tasks...\n ")
+        else:
+            print("Invalid choice. Please enter a valid option.\n ")
+
+    def exit(self) -> bool:
+        print('Bye!')
+        return True
+
+    MENU = (
+        ('Exit', 'exit'),
+        ('Create an account', 'create_account'),
+        ('Log into an account', 'log_in'),
+    )
+
+# Function to print menu options
+def print_options():
+    print("What would you like to do?\n")
+    print("1. Create a new account")
+    print("2. Deposit money")
+    print("3. Withdraw money")
+    print("4. Transfer money")
+    print("5. Log in")
+    print("6. Check Balance")
+    print("7. Get account information")
+    print("8. View all accounts")
+    print("9. Update account information")
+    print("10. Contact Customer Care")
+    print("11.Create an employee account")
+    print("12.Login as an employee")
+    print("13.Quit\n ")
+
+
+# main program
+def main_menu(bank):
+    print("*********Welcome to CoBank***********")
+    print("We're here to serve you. ")
+    print()
+
+
+def main():
+    global bank
+    # Create an instance of the Bank Management System
+    bank = BankManagementSystem()
+    main_menu(bank)
+    # bank.employee_login()
+
+    while True:
+        bank.run_scheduled_transfers()  # Including any that fell due while the bank was closed
+        # Display menu options
+        print_options()
+        choice = input("Enter your choice: ")
+
+        if choice == "1":
+            # Create a new account
+            bank.create_account()
+
+        elif choice == "2":
+            # Deposit money into an account
+            account_number = input("Enter account number: ")
+            amount = float(input("Enter amount to deposit: "))
+            if bank.deposit(account_number, amount):
+                print(f"You have successfully deposited #{amount} into your account!\n ")
+            else:
+                print("Account not found!!\n ")
+
+        elif choice == "3":
+            # Withdraw money from an account
+            account_number = input("Enter account number: ")
+            amount = float(input("Enter amount to withdraw: "))
+            if bank.withdraw(account_number, amount):
+                print("Withdrawal successful!!\n ")
+            else:
+                print("Sorry, you do not have sufficient funds in your account!!!\n ")
+
+        elif choice == "4":
+            # Transfer money between accounts
+            sender_account_number = input("Enter sender's account number: ")
+            recipient_account_number = input("Enter recipient's account number: ")
+            amount = float(input("Enter amount to transfer: "))
+            sender_pin = getpass.getpass("Enter sender's PIN: ")  # Prompt for sender's PIN
+            if bank.transfer(sender_account_number, recipient_account_number, amount, sender_pin):
+                print("Transfer successful!\n ")
+            else:
+                print("Transfer failed! Check account numbers or balances.\n ")
+
+        elif choice == "5":
+             # Log_in()
+            account_number = input("Enter your account number: ")
+            pin = getpass.getpass("Enter your PIN: ")
+            token = bank.log_in(account_number, pin)
+            if token:
+                print("You have successfully logged in!\n ")
+                # Proceed with account actions...
+            while token:
+                print("1. Deposit money")
+                print("2. Withdraw money")
+                print("3. Transfer money")
+                print("4. Check balance")
+                print("5. View transaction history")
+                print("6. Schedule a transfer")
+                print("7. View a statement")
+                print("8. Logout")
+                account_action = input("Enter your choice: ")
+                if account_action == "1":
+                    amount = float(input("Enter the amount to deposit: "))
+                    if bank.deposit(account_number, amount, token=token):
+                        print(f"You have successfully deposited #{amount} into your account.\n ")
+                    else:
+                        print("Deposit failed! Please try again.\n ")
+                elif account_action == "2":
+                    amount = float(input("Enter the amount to withdraw: "))
+                    if bank.withdraw(account_number, amount, token=token):
+                        print(f"You have successfully withdrawn #{amount} from your account.\n ")
+                    else:
+                        print("Withdrawal failed! Please check your balance and try again.\n ")
+                elif account_action == "3":
+                    recipient_account_number = input("Enter the recipient's account number: ")
+                    amount = float(input("Enter the amount to transfer: "))
+                    if bank.transfer(account_number, recipient_account_number, amount, token=token):
+                        print(f"Transfer of #{amount} to account {recipient_account_number} successful.\n ")
+                    else:
+                        print("Transfer failed! Please check recipient's account number and your balance.\n ")
+                elif account_action == "4":
+                    print(bank.get_account_info(account_number))
+                elif account_action == "5":
+                    print("Transaction history:")
+                    history = bank.get_transaction_history(account_number)
+                    while history:
+                        for transaction in history:
+                            print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(transaction.timestamp))}  {transaction}")
+                        if input("Press Enter for older transactions, or q to stop: ").lower() == "q":
+                            break
+                        history = bank.get_transaction_history(account_number, before=history[0].txn_id)
+                    else:
+                        print("No more transactions.\n ")
+                elif account_action == "6":
+                    recipient_account_number = input("Enter the recipient's account number: ")
+                    amount = float(input("Enter the amount to transfer: "))
+                    first_due = input("Enter the first date (YYYY-MM-DD): ")
+                    every = input("Repeat daily, weekly or monthly (or press Enter for once): ").strip().lower() or None
+                    times = input("How many times (or press Enter until cancelled): ").strip() if every else ''
+                    try:
+                        first_due = time.mktime(time.strptime(first_due, '%Y-%m-%d'))
+                        schedule_id = bank.schedule_transfer(account_number, recipient_account_number, amount, first_due,
+                                                             every, int(times) if times else None, token=token)
+                    except ValueError:
+                        schedule_id = None
+                    if schedule_id:
+                        print(f"Transfer scheduled with id {schedule_id}.\n ")
+                    else:
+                        print("Scheduling failed! Please check the recipient, date and repeat options.\n ")
+                elif account_action == "7":
+                    start_date = input("Enter the first date (YYYY-MM-DD): ")
+                    end_date = input("Enter the last date (YYYY-MM-DD): ")
+                    try:
+                        bank.statement(account_number, start_date, end_date)
+                    except ValueError:
+                        print("Invalid date! Please use YYYY-MM-DD.\n ")
+                elif account_action == "8":
+                    print("Logging out...\n ")
+                    bank.log_out(token)
+                    break
+                else:
+                    print("Invalid choice! Please enter a number from 1 to 8.\n ")
+            else:
+                print("Login failed. Please check your account number and PIN.\n ")
+
+
+        elif choice == "6":
+            # Check balance
+            account_number = input("Enter your account number: ")
+            pin = getpass.getpass("Enter your PIN: ")
+            if bank.log_in(account_number, pin):
+                account_info = bank.get_account_info(account_number)
+                print("Your current balance is:", account_info['balance'])
+            else:
+                print("Please check your account number and PIN.\n ")
+
+        elif choice == "7":
+            # Get account information
+            account_number = input("Enter account number: ")
+            print(bank.get_account_info(account_number))
+
+        elif choice == "8":
+            # View all accounts
+            bank.view_all_accounts()
+
+        elif choice == "9":
+            # Update account information
+            account_number = input("Enter account number: ")
+            bank.update_account_info(account_number)
+
+        elif choice == "10":
+            # Contact Customer Care
+            bank.customer_service()
+
+        elif choice == "11":
+            # Create an employee account
+            bank.create_employee_account()
+
+        elif choice == "12":
+            # Log in as an employee
+            bank.employee_login()  
+
+        elif choice == "13":
+            # Quit the program
+            print("Thank you for banking with us Goodbye!")
+            bank.close()
+            break
+
+        else:
+            print("Invalid choice! Kindly enter a number from 1 to 9.\n ")
+
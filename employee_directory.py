@@ -0,0 +1,218 @@
+"""Employee records with lookups by ID, position and location.
+
+``employee_info.csv`` has a single schema, the columns in ``COLUMNS``.
+Files written by earlier versions mixed 5-column rows (ID, name,
+position, contact info and a plain-text PIN) with 7-column ones and used
+numeric position codes; ``EmployeeDirectory`` reads them, hashes the
+plain-text PINs and rewrites the file in the current schema.
+"""
+import csv
+import os
+import re
+from itertools import chain, islice
+
+from auth import ALGORITHM, hash_pin
+
+
+COLUMNS = ('employee_id', 'name', 'position', 'contact_info', 'email', 'location', 'password')
+LEGACY_COLUMNS = ('employee_id', 'name', 'position', 'contact_info', 'password')
+
+# Position codes offered by the old create-employee prompt
+POSITIONS = {'1': 'loan officer', '2': 'credit analyst', '3': 'bank teller', '4': 'accountant', '5': 'bank manager'}
+
+SHA256_HEX = re.compile(r'[0-9a-f]{64}')
+
+
+def normalise_position(position):
+    """Lower-case position name, with the old numeric codes expanded."""
+    position = ' '.join(position.split()).lower()
+    return POSITIONS.get(position, position)
+
+
+def _is_hash(password):
+    # hash_pin output, or a SHA-256 hex digest from before PBKDF2
+    return password.startswith(ALGORITHM + '$') or SHA256_HEX.fullmatch(password) is not None
+
+
+class Employee:
+    """One member of staff; ``password`` is always a hash from auth.hash_pin."""
+
+    __slots__ = COLUMNS
+
+    def __init__(self, employee_id, name, position, contact_info='', email='', location='', password=''):
+        self.employee_id = employee_id
+        self.name = name
+        self.position = normalise_position(position)
+        self.contact_info = contact_info
+        self.email = email
+        self.location = location
+        self.password = password
+
+    def row(self):
+        return [getattr(self, column) for column in COLUMNS]
+
+    def __repr__(self):
+        return f'Employee({self.employee_id!r}, {self.name!r}, {self.position!r})'
+
+
+class EmployeeDirectory:
+    """Employees by ID, with secondary indexes by position and location.
+
+    Every index is a dict, so looking an employee up by ID or listing the
+    staff in one position or location never scans the directory. Changes
+    are written straight back to the CSV file: new employees are
+    appended, updates and deletions rewrite it.
+    """
+
+    def __init__(self, path='employee_info.csv'):
+        self.path = path
+        self._by_id = {}
+        self._by_position = {}  # position -> {employee_id: Employee}
+        self._by_location = {}
+        if os.path.exists(path):
+            self.bulk_load(path, save=False)
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __contains__(self, employee_id):
+        return employee_id in self._by_id
+
+    def __iter__(self):
+        return iter(self._by_id.values())
+
+    def get(self, employee_id, default=None):
+        return self._by_id.get(employee_id, default)
+
+    def by_position(self, position):
+        return list(self._by_position.get(normalise_position(position), {}).values())
+
+    def by_location(self, location):
+        return list(self._by_location.get(location.strip().lower(), {}).values())
+
+    def positions(self):
+        """Head count per position."""
+        return {position: len(staff) for position, staff in self._by_position.items()}
+
+    def _index(self, employee):
+        self._by_id[employee.employee_id] = employee
+        self._by_position.setdefault(employee.position, {})[employee.employee_id] = employee
+        self._by_location.setdefault(employee.location.strip().lower(), {})[employee.employee_id] = employee
+
+    def _unindex(self, employee):
+        del self._by_id[employee.employee_id]
+        for index, key in ((self._by_position, employee.position), (self._by_location, employee.location.strip().lower())):
+            del index[key][employee.employee_id]
+            if not index[key]:
+                del index[key]
+
+    def add(self, employee):
+        """Add a new employee, or replace the one with the same ID."""
+        existing = self._by_id.get(employee.employee_id)
+        if existing is not None:
+            self._unindex(existing)
+        self._index(employee)
+        if existing is None and os.path.exists(self.path):
+            with open(self.path, 'a', newline='') as file:
+                csv.writer(file).writerow(employee.row())
+        else:
+            self.save()
+        return employee
+
+    def update(self, employee_id, **fields):
+        """Change some of an employee's fields; returns the employee, or None if there is none with that ID."""
+        employee = self._by_id.get(employee_id)
+        if employee is None:
+            return None
+        self._unindex(employee)
+        for name, value in fields.items():
+            setattr(employee, name, normalise_position(value) if name == 'position' else value)
+        self._index(employee)
+        self.save()
+        return employee
+
+    def remove(self, employee_id):
+        employee = self._by_id.get(employee_id)
+        if employee is None:
+            return None
+        self._unindex(employee)
+        self.save()
+        return employee
+
+    def save(self):
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(COLUMNS)
+            writer.writerows(employee.row() for employee in self._by_id.values())
+        os.replace(temporary, self.path)
+
+    def bulk_load(self, path, chunk_size=10000, workers=None, save=True):
+        """Add every employee in a CSV export, streaming it a chunk at a time.
+
+        The export needs a header row naming the ``COLUMNS`` it has
+        (``pin`` is accepted for ``password``); files from earlier versions
+        are read by column position. Plain-text passwords are hashed in a
+        process pool. Returns the number of employees read.
+        """
+        loaded = 0
+        legacy = False
+        with open(path, newline='') as file:
+            reader = csv.reader(file)
+            first = next(reader, [])
+            header = ['password' if name == 'pin' else name for name in (name.strip().lower() for name in first)]
+            if tuple(header) != COLUMNS:
+                legacy = True
+                if 'employee_id' not in header:  # No header: the first row is an employee
+                    header, reader = LEGACY_COLUMNS, chain([first], reader)
+            # Where each column is in the file's rows; None when they are in schema order
+            picks = None if tuple(header) == COLUMNS else [header.index(c) if c in header else None for c in COLUMNS]
+            pool = None
+            try:
+                while True:
+                    chunk = list(islice(reader, chunk_size))
+                    if not chunk:
+                        break
+                    employees = [self._from_row(row, picks) for row in chunk if row]
+                    employees = [employee for employee in employees if employee.employee_id]
+                    plain = [employee for employee in employees if employee.password and not _is_hash(employee.password)]
+                    if plain:
+                        legacy = True
+                        if pool is None:
+                            from concurrent.futures import ProcessPoolExecutor  # Only legacy files need it
+                            pool = ProcessPoolExecutor(workers)
+                        hashes = pool.map(hash_pin, [employee.password for employee in plain],
+                                          chunksize=max(1, len(plain) // 64))
+                        for employee, password in zip(plain, hashes):
+                            employee.password = password
+                    for employee in employees:
+                        existing = self._by_id.get(employee.employee_id)
+                        if existing is not None:
+                            self._unindex(existing)
+                            if existing.email and not employee.email:
+                                employee = self._merge(existing, employee)
+                        self._index(employee)
+                    loaded += len(employees)
+            finally:
+                if pool is not None:
+                    pool.shutdown()
+        if save or (legacy and path == self.path):
+            self.save()
+        return loaded
+
+    @staticmethod
+    def _from_row(row, picks):
+        row = list(map(str.strip, row))
+        if picks is None or len(row) == len(COLUMNS) > len(picks) - picks.count(None):
+            return Employee(*row)  # Includes current-schema rows appended to an old file
+        return Employee(*(row[i] if i is not None and i < len(row) else '' for i in picks))
+
+    @staticmethod
+    def _merge(existing, employee):
+        # Old versions wrote each new employee twice, the second time as a
+        # 5-column row holding a PIN rather than the password; keep the first
+        for column in COLUMNS:
+            if not getattr(employee, column):
+                setattr(employee, column, getattr(existing, column))
+        employee.password = existing.password
+        return employee
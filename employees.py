@@ -0,0 +1,247 @@
+import getpass
+import os
+
+from auth import hash_pin, verify_pin
+from employee_directory import Employee, EmployeeDirectory, normalise_position
+from metrics import registry as metrics
+
+
+class EmployeeManagement:
+    """Employee accounts and the staff role menus; mixed into BankManagementSystem."""
+
+    # Menu method for each position, looked up once per login
+    ROLE_MENUS = {
+        'loan officer': 'loan_manager_menu',
+        'loan manager': 'loan_manager_menu',
+        'credit analyst': 'credit_analyst_menu',
+        'bank teller': 'bank_teller_menu',
+        'accountant': 'accountant_menu',
+        'bank manager': 'admin_tasks',
+        'branch manager': 'admin_tasks',
+    }
+
+    def create_employee_account(self):
+        employee_id = input("Enter employee ID: ")
+        if employee_id in self.employees:
+            print("An employee with that ID already exists.\n")
+            return
+        name = input("Enter employee name: ")
+        position = input("Enter employee position:\n 1.Loan officers\n 2.Credit analyst\n 3.Bank teller\n 4.Accountant\n 5.bank manager\n 6.If not found in the option, add your position.\n")
+        contact_info = input("Enter employee contact information: ")
+        email = input("Enter employee email address: ")
+        location = input("Enter employee location: ")
+        password = getpass.getpass("Enter password: ")
+
+        employee = self.employees.add(Employee(employee_id, name, position, contact_info, email, location,
+                                               hash_pin(password)))
+        print("Employee account created successfully!\n ")
+
+        # After creating an employee account, allow the branch manager to perform administrative tasks
+        if employee.position == "bank manager":
+            self.admin_tasks(employee.position)
+            
+    def employee_login(self):
+        employee_id = input("Enter your employee ID: ")
+        password = getpass.getpass("Enter your password: ")
+        employee = self.employees.get(employee_id)
+
+        if employee and verify_pin(password, employee.password):
+            print("You have successfully logged in!\n ")
+
+            # Based on the employee's role, provide access to specific functionalities
+            menu = self.ROLE_MENUS.get(employee.position)
+            if menu == 'admin_tasks':
+                self.admin_tasks(employee.position)  # Checked again by the tasks that need a manager
+            elif menu:
+                getattr(self, menu)()
+            else:
+               print("You don't have any functionality task yet")# Call custom position tasks for unknown positions
+        else:
+            print("Login failed. Please check your employee ID and PIN.\n ")
+            
+    def _print_employee(self, employee):
+        print(f"Employee ID: {employee.employee_id}")
+        print(f"Name: {employee.name}")
+        print(f"Position: {employee.position}")
+        print(f"Contact Info: {employee.contact_info}")
+        print(f"Location: {employee.location}")
+        print()
+
+    def view_all_employees(self):
+        print("All Employees:")
+        for employee in self.employees:
+            self._print_employee(employee)
+
+    def view_employees_by_role(self):
+        position = input("Enter a position (or press Enter to search by location): ")
+        if position:
+            staff = self.employees.by_position(position)
+        else:
+            staff = self.employees.by_location(input("Enter a location: "))
+        print(f"{len(staff)} employees found:")
+        for employee in staff:
+            self._print_employee(employee)
+
+    def update_employee_info(self, employee_id):
+        employee = self.employees.get(employee_id)
+        if employee:
+            print("Current Employee Info:")
+            self._print_employee(employee)
+            choice = input("What information would you like to update? (name, position, contact info or location): ").lower()
+            if choice == "name":
+                self.employees.update(employee_id, name=input("Enter the new name: "))
+                print("Name updated successfully!")
+            elif choice == "position":
+                self.employees.update(employee_id, position=input("Enter the new position: "))
+                print("Position updated successfully!")
+            elif choice == "contact info":
+                self.employees.update(employee_id, contact_info=input("Enter the new contact info: "))
+                print("Contact info updated successfully!")
+            elif choice == "location":
+                self.employees.update(employee_id, location=input("Enter the new location: "))
+                print("Location updated successfully!")
+            else:
+                print("Invalid choice!")
+        else:
+            print("Employee not found!")
+
+    def delete_employee_account(self, employee_id):
+        if self.employees.remove(employee_id):
+            print("Employee account deleted successfully.")
+        else:
+            print("Employee account not found.")
+
+    @metrics.instrument('load_employees_from_csv')
+    def load_employees_from_csv(self):
+        """Open employee_info.csv as an EmployeeDirectory, converting files from older versions."""
+        return EmployeeDirectory(os.path.join(self.data_dir, 'employee_info.csv'))
+
+    @metrics.instrument('bulk_load_employees')
+    def bulk_load_employees(self, path, chunk_size=10000, workers=None):
+        """Add every employee in an HR export to the directory; see EmployeeDirectory.bulk_load."""
+        return self.employees.bulk_load(path, chunk_size, workers)
+            
+
+    # Implement access control for managing employee accounts
+    def manage_employee_accounts(self, current_user_position):
+        # Check if the current user is the branch manager
+        if self.ROLE_MENUS.get(normalise_position(current_user_position)) != 'admin_tasks':
+            print("Access denied! Only the branch manager can manage employee accounts.")
+            return
+
+        print("\nManaging Employee Accounts:")
+        print("1. Create a new employee account")
+        print("2. View all employee accounts")
+        print("3. Update employee account information")
+        print("4. Delete an employee account")
+        print("5. Find employees by position or location")
+        print("6. Back to administrative tasks\n ")
+
+        choice = input("Enter your choice: ")
+        if choice == "1":
+            self.create_employee_account()
+        elif choice == "2":
+            self.view_all_employees()
+        elif choice == "3":
+            employee_id = input("Enter employee ID: ")
+            self.update_employee_info(employee_id)
+        elif choice == "4":
+            employee_id = input("Enter employee ID: ")
+            self.delete_employee_account(employee_id)
+        elif choice == "5":
+            self.view_employees_by_role()
+        elif choice == "6":
+            print("Returning to administrative tasks...\n ")
+        else:
+            print("Invalid choice. Please enter a valid option.\n ")
+
+    def update_or_delete_employee(self, employee_id):
+        action = input("Choose action: 'update' or 'delete': ").lower()
+        if action == "update":
+            self.update_employee_info(employee_id)
+        elif action == "delete":
+            self.delete_employee_account(employee_id)
+        else:
+            print("Invalid action!\n ")
+
+    def loan_manager_menu(self):
+        print("Loan Manager Menu:")
+        print("1. Approve loan applications")
+        print("2. Reject loan applications")
+        print("3. View pending loan applications")
+        print("4. Back to main menu\n ")
+
+        choice = input("Enter your choice: ")
+        if choice == "1":
+            self.approve_loan_applications()
+        elif choice == "2":
+            self.reject_loan_applications()
+        elif choice == "3":
+            self.view_pending_loan_applications()
+        elif choice == "4":
+            print("Returning to the main menu...\n ")
+        else:
+            print("Invalid choice. Please enter a valid option.\n ")
+
+    # Implement tasks for managing credit analyst accounts
+    def credit_analyst_menu(self):
+        print("Credit Analyst Menu:")
+        print("1. Analyze credit scores")
+        print("2. Review credit reports")
+        print("3. Generate credit analysis reports")
+        print("4. Back to main menu\n ")
+
+        choice = input("Enter your choice: ")
+        if choice == "1":
+            self.analyze_credit_scores()
+        elif choice == "2":
+            self.review_credit_reports()
+        elif choice == "3":
+            self.generate_credit_analysis_reports()
+        elif choice == "4":
+            print("Returning to the main menu...\n ")
+        else:
+            print("Invalid choice. Please enter a valid option.\n ")
+
+    # Implement tasks for managing bank teller accounts
+    def bank_teller_menu(self):
+        print("Bank Teller Menu:")
+        print("1. Deposit money")
+        print("2. Withdraw money")
+        print("3. Transfer money")
+        print("4. Check account balance")
+        print("5. Back to main menu\n ")
+
+        choice = input("Enter your choice: ")
+        if choice == "1":
+            self.deposit_money()
+        elif choice == "2":
+            self.withdraw_money()
+        elif choice == "3":
+            self.transfer_money()
+        elif choice == "4":
+            self.check_account_balance()
+        elif choice == "5":
+            print("Returning to the main menu...\n ")
+        else:
+            print("Invalid choice. Please enter a valid option.\n ")
+
+    # Implement tasks for managing accountant accounts
+    def accountant_menu(self):
+        print("Accountant Menu:")
+        print("1. Generate financial statements")
+        print("2. Audit transactions")
+        print("3. Calculate taxes")
+        print("4. Back to main menu\n ")
+
+        choice = input("Enter your choice: ")
+        if choice == "1":
+            self.generate_financial_statements()
+        elif choice == "2":
+            self.audit_transactions()
+        elif choice == "3":
+            self.calculate_taxes()
+        elif choice == "4":
+            print("Returning to the main menu...\n ")
+        else:
+            print("Invalid choice. Please enter a valid option.\n ")
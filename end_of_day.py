@@ -0,0 +1,174 @@
+"""End-of-day batch: daily interest and fees for every account.
+
+Rates come from a table per account type (see ``DEFAULT_RATES``), kept
+in rates.json and edited from the admin menu's system configuration.
+For one business date, ``EndOfDay.run`` reads the account store in
+chunks of ``chunk_size`` raw records. It works out each chunk's interest
+and fees with vectorised NumPy operations, so Python code only runs for
+accounts that actually get a posting. Before any posting is made, every
+account has been priced from its closing balance.
+
+All the postings then go to the ledger as one balanced group, in a
+single append. Interest is balanced against INTEREST_EXPENSE and fees
+against FEE_INCOME. After that, the new balances are written into the
+store in one pass.
+
+Runs are idempotent per business date. eod.json records the ledger
+position when a date's run starts and marks the date done once balances
+are stored. Running a date again does nothing. If a run was
+interrupted, the ledger shows whether its group was committed (group
+commits are all or nothing): if it was, the date is marked done, and
+if not, the run starts afresh.
+
+NumPy is optional for the rest of the bank and only needed here.
+"""
+import json
+import math
+import os
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from account_store import AccountStore
+from postings import FEE_INCOME, INTEREST_EXPENSE
+from transactions import FEE, INTEREST, Transaction
+
+RATE_FIELDS = ('annual_rate', 'interest_minimum', 'daily_fee', 'fee_waiver_balance')
+DEFAULT_RATES = {
+    # Interest is paid daily at annual_rate / 365 on balances above interest_minimum; daily_fee is charged on
+    # balances below fee_waiver_balance, never taking a balance below zero
+    'savings': {'annual_rate': 0.03, 'interest_minimum': 0.0, 'daily_fee': 0.0, 'fee_waiver_balance': 0.0},
+    'current': {'annual_rate': 0.0, 'interest_minimum': 0.0, 'daily_fee': 0.05, 'fee_waiver_balance': 1000.0},
+}
+DAYS_PER_YEAR = 365
+
+if np is not None:
+    # AccountStore.RECORD as a packed NumPy record
+    RECORD = np.dtype([('account_number', 'S20'), ('account_name', 'S40'), ('account_type', 'S12'),
+                       ('balance', '<f8'), ('personal_info', 'S24'), ('pin_hash', 'S128'), ('active', 'u1')])
+    assert RECORD.itemsize == AccountStore.RECORD.size
+
+
+def load_rates(path):
+    """Rate tables by account type from ``path``, or the defaults if it does not exist."""
+    if not os.path.exists(path):
+        return {account_type: dict(rates) for account_type, rates in DEFAULT_RATES.items()}
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_rates(path, rates):
+    temporary = path + '.tmp'
+    with open(temporary, 'w') as file:
+        json.dump(rates, file, indent=2)
+    os.replace(temporary, path)
+
+
+def price(block, rates):
+    """Interest and fee for every record in ``block`` (an array of RECORD); both rounded to cents."""
+    rate = np.zeros(len(block))
+    minimum = np.full(len(block), np.inf)
+    fee = np.zeros(len(block))
+    waiver = np.zeros(len(block))
+    active = block['active'] == 1
+    for account_type in np.unique(block['account_type'][active]):
+        table = rates.get(account_type.decode(errors='ignore').strip().lower())
+        if table is None:
+            continue  # No rates for this type: no interest and no fees
+        selected = active & (block['account_type'] == account_type)
+        rate[selected] = table['annual_rate'] / DAYS_PER_YEAR
+        minimum[selected] = table['interest_minimum']
+        fee[selected] = table['daily_fee']
+        waiver[selected] = table['fee_waiver_balance']
+    balance = block['balance']
+    interest = np.where(balance > minimum, np.round(balance * rate, 2), 0.0)
+    fees = np.where(balance < waiver, np.round(np.minimum(fee, np.maximum(balance + interest, 0.0)), 2), 0.0)
+    return interest, fees
+
+
+class EndOfDay:
+    """Interest and fee run over an account store; see the module docstring."""
+
+    def __init__(self, store, postings, path='eod.json', chunk_size=100_000):
+        if np is None:
+            raise ImportError("End-of-day processing needs NumPy: pip install numpy")
+        self.store = store
+        self.postings = postings
+        self.ledger = postings.ledger
+        self.path = path
+        self.chunk_size = chunk_size
+        self.runs = {}  # business date -> {'after', 'done', and totals once done}
+        if os.path.exists(path):
+            with open(path) as file:
+                self.runs = json.load(file)
+
+    def _save(self):
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(self.runs, file, indent=2, sort_keys=True)
+        os.replace(temporary, self.path)
+
+    def _committed(self, after):
+        # Only end-of-day runs post to these accounts, and runs never overlap
+        return any(self.ledger.read(account_number, since=after, limit=1)
+                   for account_number in (INTEREST_EXPENSE, FEE_INCOME))
+
+    def run(self, business_date, rates):
+        """Post ``business_date``'s interest and fees; returns the run's totals.
+
+        The caller holds every account lock, so no balance changes while
+        the run prices, posts and stores. The totals include 'skipped',
+        which is true if the date had already been run.
+        """
+        run = self.runs.get(business_date)
+        if run and not run['done'] and self._committed(run['after']):
+            run['done'] = True
+            self._save()
+        if run and run['done']:
+            return dict(run, skipped=True)
+
+        start = time.perf_counter()
+        self.ledger.flush()
+        self.runs[business_date] = {'after': self.ledger.last_txn_id, 'done': False}
+        self._save()
+        legs, slots, balances = [], [], []
+        accounts = 0
+        for first in range(0, self.store.count, self.chunk_size):
+            block = np.frombuffer(self.store.read_block(first, first + self.chunk_size), RECORD)
+            accounts += int(np.count_nonzero(block['active']))
+            interest, fees = price(block, rates)
+            selected = np.flatnonzero((interest > 0) | (fees > 0))
+            # Plain Python values from here on; indexing NumPy arrays one element at a time is slow
+            for account_number, balance, paid, charged in zip(block['account_number'][selected].tolist(),
+                                                             block['balance'][selected].tolist(),
+                                                             interest[selected].tolist(), fees[selected].tolist()):
+                account_number = account_number.decode()  # NumPy already dropped the NUL padding
+                if paid:
+                    balance += paid
+                    legs.append(Transaction(account_number, INTEREST, paid, balance_after=balance))
+                if charged:
+                    balance -= charged
+                    legs.append(Transaction(account_number, FEE, -charged, balance_after=balance))
+                balances.append(balance)
+            slots.extend((selected + first).tolist())
+
+        interest_paid = math.fsum(leg.amount for leg in legs if leg.kind == INTEREST)
+        fees_charged = -math.fsum(leg.amount for leg in legs if leg.kind == FEE)
+        if interest_paid:
+            legs.append(Transaction(INTEREST_EXPENSE, INTEREST, -interest_paid))
+        if fees_charged:
+            legs.append(Transaction(FEE_INCOME, FEE, fees_charged))
+        if legs:
+            self.postings.post(legs)
+            self.ledger.flush()
+        self.store.update_balances(slots, balances)
+        self.store.flush()
+
+        run = self.runs[business_date]
+        run.update(done=True, accounts=accounts, postings=len(legs), interest=interest_paid, fees=fees_charged,
+                   seconds=time.perf_counter() - start)
+        self._save()
+        return dict(run, skipped=False)
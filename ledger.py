@@ -0,0 +1,446 @@
+import bisect
+import csv
+import os
+import re
+import struct
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Tuple
+
+from transactions import Transaction
+from wal import WriteAheadLog
+
+
+def segment_path(directory, segment, extension='dat'):
+    return os.path.join(directory, f'segment-{segment:06d}.{extension}')
+
+
+def iter_positions(directory, positions):
+    """Yield the postings at ``positions`` ((segment, offset) pairs in txn_id order) one at a time.
+
+    Reads the segment files directly, for readers in other processes
+    that have no Ledger of their own; see ``Ledger.positions``.
+    """
+    file, current = None, None
+    try:
+        for segment, offset in positions:
+            if segment != current:
+                if file is not None:
+                    file.close()
+                file, current = open(segment_path(directory, segment), 'rb'), segment
+            file.seek(offset)
+            yield Transaction.unpack(file.read(Ledger.RECORD_SIZE))
+    finally:
+        if file is not None:
+            file.close()
+
+
+class Ledger:
+    """Append-only transaction ledger shared by every account.
+
+    Postings are ``Transaction`` records packed into fixed-width binary
+    rows in rolling segment files (segment-000001.dat,
+    segment-000002.dat, ...) that are capped at ``segment_size`` bytes.
+    A small index file maps each account number to the (segment, offset)
+    of its records, so one account's history is read by seeking straight
+    to its rows instead of scanning the whole ledger.
+
+    Every posting gets the next ``txn_id`` when it is appended, so ids
+    follow commit order and mark a position in the ledger.
+
+    Appends are buffered and group-committed: rows are held in memory
+    until ``batch_size`` of them are pending or ``flush`` is called. A
+    flush first makes the batch durable in a write-ahead log (wal.log),
+    then writes it to the segments with a single write per segment.
+    Batches flushed from several threads at once share one fsync. On
+    open, postings that reached the log but not the segments are written
+    out, and every posting still in the log is kept in ``recovered`` so
+    the bank can restore the balances it records. ``checkpoint`` makes the
+    segments durable and empties the log. A ledger may be shared between
+    threads.
+
+    ``follow`` registers a listener that is called after every group
+    commit with the committed records, so derived state can be kept up
+    to date without re-reading the ledger.
+    """
+
+    INDEX_FILE = 'index.csv'
+    WAL_FILE = 'wal.log'
+    RECORD_SIZE = Transaction.RECORD.size
+    TXN_ID = struct.Struct('<Q')  # Leading field of every record
+
+    def __init__(self, directory='ledger', segment_size=4 * 1024 * 1024, batch_size=256, page_cache_size=1024,
+                 sync=True):
+        self.directory = directory
+        self.segment_size = segment_size - segment_size % self.RECORD_SIZE
+        self.batch_size = batch_size
+        self.index: Dict[str, List[Tuple[int, int]]] = {}
+        self.listeners = []
+        self.last_txn_id = 0
+        self.page_cache_size = page_cache_size
+        self._pages = OrderedDict()  # (account_number, since, before, limit) -> postings
+        self.recovered = []  # Postings still in the write-ahead log when the ledger was opened
+        self._pending = []
+        self._unwritten = deque()  # (log ticket, postings) flushed to the log but not yet to the segments
+        self._segment = 1
+        self._segment_file = None
+        self._index_file = None
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        self.wal = WriteAheadLog(os.path.join(directory, self.WAL_FILE), sync)
+        if self._segments('csv'):
+            self._convert_text_segments()
+        self._load_index()
+        self._recover()
+
+    def _segment_path(self, segment, extension='dat'):
+        return segment_path(self.directory, segment, extension)
+
+    def _segments(self, extension='dat'):
+        segments = []
+        for name in os.listdir(self.directory):
+            match = re.fullmatch(rf'segment-(\d+)\.{extension}', name)
+            if match:
+                segments.append(int(match.group(1)))
+        return sorted(segments)
+
+    def _convert_text_segments(self):
+        # Ledgers written before postings were binary hold "timestamp,account,text"
+        # CSV rows. They are rewritten once; an interrupted conversion starts
+        # again from the CSV files, which are only removed at the end.
+        for segment in self._segments():
+            os.remove(self._segment_path(segment))
+        index_path = os.path.join(self.directory, self.INDEX_FILE)
+        if os.path.exists(index_path):
+            os.remove(index_path)
+        self.wal.truncate()
+        text_segments = self._segments('csv')
+        for segment in text_segments:
+            with open(self._segment_path(segment, 'csv'), newline='') as file:
+                for timestamp, account_number, text in csv.reader(file):
+                    self.append(Transaction.parse(text, account_number, float(timestamp)))
+        self.checkpoint()
+        self._close_files()
+        self.index = {}
+        self.last_txn_id = 0
+        self._segment = 1
+        for segment in text_segments:
+            os.remove(self._segment_path(segment, 'csv'))
+
+    def _load_index(self):
+        last_indexed = {}
+        index_path = os.path.join(self.directory, self.INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, newline='') as file:
+                for account_number, segment, offset in csv.reader(file):
+                    segment, offset = int(segment), int(offset)
+                    self.index.setdefault(account_number, []).append((segment, offset))
+                    if offset >= last_indexed.get(segment, -1):
+                        last_indexed[segment] = offset
+
+        segments = self._segments()
+        if not segments:
+            return
+        self._segment = segments[-1]
+        last_path = self._segment_path(self._segment)
+        size = os.path.getsize(last_path)
+        if size % self.RECORD_SIZE:
+            os.truncate(last_path, size - size % self.RECORD_SIZE)  # Drop a row torn by a crash mid-write
+
+        # Rows written to a segment but not yet indexed (e.g. the process
+        # stopped between the two writes) are re-indexed from the tail.
+        missing = []
+        for segment in segments:
+            if segment in last_indexed:
+                start = last_indexed[segment] + self.RECORD_SIZE
+            elif any(seg > segment for seg in last_indexed):
+                continue
+            else:
+                start = 0
+            for offset, record in self._read_segment(segment, start):
+                self.index.setdefault(record.account_number, []).append((segment, offset))
+                missing.append((record.account_number, segment, offset))
+        if missing:
+            self._write_index(missing)
+
+        tail = self._read_segment(self._segment, max(0, os.path.getsize(last_path) - self.RECORD_SIZE))
+        if tail:
+            self.last_txn_id = tail[-1][1].txn_id
+
+    def _recover(self):
+        for payload in self.wal.replay():
+            self.recovered.extend(Transaction.unpack_all(payload))
+        missing = [record for record in self.recovered if record.txn_id > self.last_txn_id]
+        if missing:
+            self._write_segments(missing)
+            self.last_txn_id = missing[-1].txn_id
+
+    def _read_segment(self, segment, start=0):
+        with open(self._segment_path(segment), 'rb') as file:
+            file.seek(start)
+            data = file.read()
+        data = data[:len(data) - len(data) % self.RECORD_SIZE]
+        return [(start + i * self.RECORD_SIZE, record) for i, record in enumerate(Transaction.unpack_all(data))]
+
+    def _write_index(self, entries):
+        if self._index_file is None:
+            self._index_file = open(os.path.join(self.directory, self.INDEX_FILE), 'a', newline='')
+        csv.writer(self._index_file).writerows(entries)
+        self._index_file.flush()
+
+    def _open_segment(self):
+        if self._segment_file is None:
+            self._segment_file = open(self._segment_path(self._segment), 'ab')
+        return self._segment_file
+
+    def append(self, transaction):
+        """Queue a posting; it is written at the next group commit.
+
+        The posting is given the next txn_id, and the current time if it
+        has no timestamp. Returns the posting.
+        """
+        self.append_many([transaction])
+        return transaction
+
+    def append_many(self, transactions):
+        """Queue postings that must be committed together, such as both legs of a transfer.
+
+        They always land in the same write-ahead log frame, so recovery
+        sees all of them or none.
+        """
+        now = time.time()
+        with self._lock:
+            for transaction in transactions:
+                if transaction.timestamp is None:
+                    transaction.timestamp = now
+                if not transaction.txn_id:
+                    transaction.txn_id = self.last_txn_id + 1
+                self.last_txn_id = max(self.last_txn_id, transaction.txn_id)
+                self._pending.append(transaction)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Make every pending posting durable in the write-ahead log, then write it to the segments."""
+        with self._lock:
+            if self._pending:
+                pending, self._pending = self._pending, []
+                self._unwritten.append((self.wal.write(b''.join(record.pack() for record in pending)), pending))
+            if not self._unwritten:
+                return
+            ticket = self._unwritten[-1][0]
+        self.wal.sync(ticket)  # Outside the lock, so postings from other threads can join this fsync
+        with self._lock:
+            while self._unwritten and self._unwritten[0][0] <= ticket:
+                postings = self._unwritten.popleft()[1]
+                self._write_segments(postings)
+                for listener in self.listeners:
+                    listener(postings)
+
+    def _write_segments(self, pending):
+        file = self._open_segment()
+        offset = file.tell()
+        chunk = []
+        entries = []
+        for transaction in pending:
+            if offset + self.RECORD_SIZE > self.segment_size:
+                file.write(b''.join(chunk))
+                file.flush()
+                if self.wal.sync_to_disk:
+                    os.fsync(file.fileno())  # Checkpoints only sync the current segment
+                file.close()
+                self._segment += 1
+                self._segment_file = None
+                file = self._open_segment()
+                offset = 0
+                chunk = []
+            chunk.append(transaction.pack())
+            entries.append((transaction.account_number, self._segment, offset))
+            offset += self.RECORD_SIZE
+        file.write(b''.join(chunk))
+        file.flush()
+
+        for account_number, segment, offset in entries:
+            self.index.setdefault(account_number, []).append((segment, offset))
+        self._write_index(entries)
+
+    def checkpoint(self):
+        """Flush, fsync the segments and index, and empty the write-ahead log.
+
+        Whatever else depends on the log, such as the balances the bank
+        restores from ``recovered``, must already be durable.
+        """
+        with self._lock:
+            self.flush()
+            for file in (self._segment_file, self._index_file):
+                if file is not None and self.wal.sync_to_disk:
+                    os.fsync(file.fileno())
+            self.wal.truncate()
+            self.recovered = []
+
+    def read(self, account_number, since=None, before=None, limit=None):
+        """Return an account's postings, oldest first, as Transaction records.
+
+        ``since`` and ``before`` are txn_id cursors: only postings with ids
+        above ``since`` and below ``before`` are returned. With ``limit``
+        at most that many come back: the first ones after ``since`` if it
+        is given, otherwise the latest ones. The account's positions are
+        bisected by txn_id, so a page costs a few seeks however long the
+        history is. Pages that can no longer change are kept in an LRU
+        cache of ``page_cache_size`` entries.
+        """
+        account_number = str(account_number)
+        key = (account_number, since, before, limit)
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None:
+                self._pages.move_to_end(key)
+                return list(page)
+            positions = list(self.index.get(account_number, []))
+            pending = [transaction for _, postings in self._unwritten for transaction in postings
+                       if transaction.account_number == account_number]
+            pending += [transaction for transaction in self._pending if transaction.account_number == account_number]
+
+        if since is not None:
+            positions = positions[bisect.bisect_right(positions, since, key=self._txn_id_at):]
+            pending = [transaction for transaction in pending if transaction.txn_id > since]
+        if before is not None:
+            positions = positions[:bisect.bisect_left(positions, before, key=self._txn_id_at)]
+            pending = [transaction for transaction in pending if transaction.txn_id < before]
+        if limit is not None:
+            if since is not None:
+                positions = positions[:limit]
+                pending = pending[:limit - len(positions)]
+            else:
+                pending = pending[max(0, len(pending) - limit):]
+                remaining = limit - len(pending)
+                positions = positions[max(0, len(positions) - remaining):] if remaining else []
+        history = self._read_positions(positions) + pending
+
+        # Ids only grow, so a page bounded by ``before``, or a full page after
+        # ``since``, holds the same postings for good.
+        if limit is not None and (before is not None or since is not None and len(history) == limit):
+            with self._lock:
+                self._pages[key] = history
+                if len(self._pages) > self.page_cache_size:
+                    self._pages.popitem(last=False)
+            history = list(history)
+        return history
+
+    def positions(self, account_number, since=None, before=None):
+        """(segment, offset) of an account's committed postings with ids above ``since`` and below ``before``.
+
+        Flushes first, so every posting so far is committed. Pair with
+        ``iter_positions`` to stream the postings from another process.
+        """
+        self.flush()
+        with self._lock:
+            positions = list(self.index.get(str(account_number), []))
+        if since is not None:
+            positions = positions[bisect.bisect_right(positions, since, key=self._txn_id_at):]
+        if before is not None:
+            positions = positions[:bisect.bisect_left(positions, before, key=self._txn_id_at)]
+        return positions
+
+    def _txn_id_at(self, position):
+        segment, offset = position
+        with open(self._segment_path(segment), 'rb') as file:
+            file.seek(offset)
+            return self.TXN_ID.unpack(file.read(self.TXN_ID.size))[0]
+
+    def _read_positions(self, positions):
+        history = []
+        by_segment = {}
+        for segment, offset in positions:
+            by_segment.setdefault(segment, []).append(offset)
+        for segment in sorted(by_segment):
+            with open(self._segment_path(segment), 'rb') as file:
+                for offset in by_segment[segment]:
+                    file.seek(offset)
+                    history.append(Transaction.unpack(file.read(self.RECORD_SIZE)))
+        return history
+
+    def segment_paths(self):
+        """Paths of the segment files, oldest first."""
+        return [self._segment_path(segment) for segment in self._segments()]
+
+    def scan_blocks(self, after=0):
+        """Yield committed postings with a txn_id above ``after`` as packed bytes, one segment at a time."""
+        for segment in self._segments():
+            with open(self._segment_path(segment), 'rb') as file:
+                data = file.read()
+            data = data[:len(data) - len(data) % self.RECORD_SIZE]
+            if not data or Transaction.unpack(data, len(data) - self.RECORD_SIZE).txn_id <= after:
+                continue
+            first_id = Transaction.unpack(data).txn_id
+            if first_id <= after:
+                data = data[(after - first_id + 1) * self.RECORD_SIZE:]  # Ids are consecutive in commit order
+            yield data
+
+    def scan(self, after=0):
+        """Yield committed postings with a txn_id above ``after``, in commit order."""
+        for data in self.scan_blocks(after):
+            yield from Transaction.unpack_all(data)
+
+    def follow(self, listener, after=0, chunk_size=10000):
+        """Replay postings with a txn_id above ``after`` into ``listener``, then keep it updated.
+
+        ``listener`` receives lists of Transaction records. The replay and
+        the registration happen under the ledger lock, so no commit is
+        missed or seen twice.
+        """
+        with self._lock:
+            self.flush()
+            records = []
+            for record in self.scan(after):
+                records.append(record)
+                if len(records) >= chunk_size:
+                    listener(records)
+                    records = []
+            if records:
+                listener(records)
+            self.listeners.append(listener)
+
+    def import_legacy_files(self, directory='.'):
+        """Load the old per-account ``{account_number}transactions.csv`` files.
+
+        Both spellings found in the wild (``2000281transactions.csv`` and
+        ``2000610_transactions.csv``) are accepted. Returns the number of
+        postings imported.
+        """
+        imported = 0
+        for name in sorted(os.listdir(directory)):
+            match = re.fullmatch(r'(\d+)_?transactions\.csv', name)
+            if not match:
+                continue
+            path = os.path.join(directory, name)
+            timestamp = os.path.getmtime(path)
+            with open(path, newline='') as file:
+                for row in csv.reader(file):
+                    if row:
+                        self.append(Transaction.parse(row[0], match.group(1), timestamp))
+                        imported += 1
+        self.flush()
+        return imported
+
+    def close(self):
+        self.flush()
+        self._close_files()
+        self.wal.close()
+
+    def _close_files(self):
+        if self._segment_file is not None:
+            self._segment_file.close()
+            self._segment_file = None
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
+
+
+if __name__ == '__main__':
+    ledger = Ledger()
+    count = ledger.import_legacy_files()
+    ledger.close()
+    print(f"Imported {count} transactions into {ledger.directory}/")
@@ -0,0 +1,213 @@
+"""Operation counters, latency histograms and on-demand profiling.
+
+Bank methods are wrapped with ``registry.instrument(name)``, which counts
+each call, times it into a fixed-bucket histogram and counts calls that
+raised. Expected failures (a wrong PIN, too little money, an unknown
+account) are counted with ``registry.error``. Recording one call costs
+two clock reads, one bisect and a short critical section.
+
+``registry.prometheus()`` renders everything in the Prometheus text
+format, and ``registry.dump(path)`` writes that to a file.
+``start_profiling`` switches on cProfile or tracemalloc around the
+chosen operations until ``stop_profiling`` returns the report. The
+profilers are imported only then, so they add nothing to startup.
+"""
+import functools
+import io
+import os
+import threading
+import time
+from bisect import bisect_left
+
+
+class Histogram:
+    """Latency counts in fixed buckets, in seconds (Prometheus ``le`` bounds)."""
+
+    BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+               1.0, 2.5, 5.0, 10.0)
+
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)  # The last bucket is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the ``q`` quantile; inf if it is past the last bound."""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.BUCKETS + (float('inf'),), self.counts):
+            seen += count
+            if seen >= rank and seen:
+                return bound
+        return 0.0
+
+
+class Metrics:
+    """Counters and histograms keyed by operation name."""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.calls = {}  # operation -> count
+        self.errors = {}  # (operation, reason) -> count
+        self.latency = {}  # operation -> Histogram
+        self.allocated = {}  # operation -> bytes, while tracemalloc profiling is on
+        self._lock = threading.Lock()
+        self._profiler = None  # cProfile.Profile, or 'tracemalloc'
+        self._profiled = None  # Operation names to profile, None for all
+        self._profile_lock = threading.Lock()  # cProfile follows one call at a time
+
+    def instrument(self, operation):
+        """Decorator that counts and times calls as ``operation``."""
+        def decorate(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if self._profiler is not None and (self._profiled is None or operation in self._profiled):
+                    return self._profile(operation, function, args, kwargs)
+                start = self.clock()
+                try:
+                    return function(*args, **kwargs)
+                except Exception:
+                    self.error(operation, 'exception')
+                    raise
+                finally:
+                    self.observe(operation, self.clock() - start)
+            return wrapper
+        return decorate
+
+    def observe(self, operation, seconds):
+        with self._lock:
+            histogram = self.latency.get(operation)
+            if histogram is None:
+                histogram = self.latency[operation] = Histogram()
+            histogram.observe(seconds)
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+
+    def error(self, operation, reason):
+        """Count a failed ``operation``; reason is e.g. 'failed_auth', 'insufficient_funds' or 'unknown_account'."""
+        with self._lock:
+            self.errors[operation, reason] = self.errors.get((operation, reason), 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+            self.errors.clear()
+            self.latency.clear()
+            self.allocated.clear()
+
+    def _profile(self, operation, function, args, kwargs):
+        profiler = self._profiler
+        start = self.clock()
+        try:
+            if profiler == 'tracemalloc':
+                import tracemalloc  # Already loaded by start_profiling
+                before = tracemalloc.get_traced_memory()[0]
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    grown = tracemalloc.get_traced_memory()[0] - before
+                    with self._lock:
+                        self.allocated[operation] = self.allocated.get(operation, 0) + grown
+            if profiler is not None and self._profile_lock.acquire(blocking=False):
+                try:
+                    return profiler.runcall(function, *args, **kwargs)
+                finally:
+                    self._profile_lock.release()
+            return function(*args, **kwargs)  # Another thread holds the profiler
+        except Exception:
+            self.error(operation, 'exception')
+            raise
+        finally:
+            self.observe(operation, self.clock() - start)
+
+    def start_profiling(self, mode='cprofile', operations=None):
+        """Profile calls to ``operations`` (all instrumented ones by default) with 'cprofile' or 'tracemalloc'."""
+        self.stop_profiling()
+        self._profiled = set(operations) if operations else None
+        if mode == 'tracemalloc':
+            import tracemalloc
+            tracemalloc.start()
+            self._profiler = 'tracemalloc'
+        elif mode == 'cprofile':
+            import cProfile
+            self._profiler = cProfile.Profile()
+        else:
+            raise ValueError(f"Unknown profiling mode {mode!r}")
+
+    def stop_profiling(self, limit=20):
+        """Switch profiling off and return its report as text, or None if it was not on."""
+        profiler, self._profiler = self._profiler, None
+        if profiler is None:
+            return None
+        output = io.StringIO()
+        if profiler == 'tracemalloc':
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            with self._lock:
+                allocated = sorted(self.allocated.items(), key=lambda item: -item[1])
+                self.allocated.clear()
+            for operation, size in allocated:
+                print(f"{operation:<28} {size / 1024:10.1f} KiB retained", file=output)
+            for stat in snapshot.statistics('lineno')[:limit]:
+                print(stat, file=output)
+        else:
+            import pstats
+            with self._profile_lock:  # Wait for a call still being profiled
+                pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(limit)
+        return output.getvalue()
+
+    @property
+    def profiling(self):
+        return self._profiler is not None
+
+    def summary(self):
+        """Per-operation dicts with calls, errors by reason, mean, p50 and p99 in milliseconds."""
+        with self._lock:
+            operations = {}
+            for operation, histogram in self.latency.items():
+                operations[operation] = {'calls': self.calls[operation], 'errors': {},
+                                         'mean_ms': histogram.total / histogram.count * 1000,
+                                         'p50_ms': histogram.quantile(0.5) * 1000,
+                                         'p99_ms': histogram.quantile(0.99) * 1000}
+            for (operation, reason), count in self.errors.items():
+                operations.setdefault(operation, {'calls': 0, 'errors': {}})['errors'][reason] = count
+        return operations
+
+    def prometheus(self):
+        """Every metric in the Prometheus text exposition format."""
+        lines = ['# HELP bank_operations_total Calls to each bank operation.',
+                 '# TYPE bank_operations_total counter']
+        with self._lock:
+            for operation, count in sorted(self.calls.items()):
+                lines.append(f'bank_operations_total{{operation="{operation}"}} {count}')
+            lines += ['# HELP bank_operation_errors_total Failed bank operations by reason.',
+                      '# TYPE bank_operation_errors_total counter']
+            for (operation, reason), count in sorted(self.errors.items()):
+                lines.append(f'bank_operation_errors_total{{operation="{operation}",reason="{reason}"}} {count}')
+            lines += ['# HELP bank_operation_seconds Latency of each bank operation.',
+                      '# TYPE bank_operation_seconds histogram']
+            for operation, histogram in sorted(self.latency.items()):
+                cumulative = 0
+                for bound, count in zip(Histogram.BUCKETS + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    lines.append(f'bank_operation_seconds_bucket{{operation="{operation}",le="{bound}"}} {cumulative}')
+                lines.append(f'bank_operation_seconds_sum{{operation="{operation}"}} {histogram.total}')
+                lines.append(f'bank_operation_seconds_count{{operation="{operation}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path):
+        """Write ``prometheus()`` to ``path`` atomically, e.g. for node_exporter's textfile collector."""
+        temporary = path + '.tmp'
+        with open(temporary, 'w') as file:
+            file.write(self.prometheus())
+        os.replace(temporary, path)
+
+
+registry = Metrics()  # Shared by every bank in the process
@@ -0,0 +1,158 @@
+import math
+import threading
+
+from transactions import OPENING_BALANCE, Transaction
+
+
+# The bank's own accounts. Their numbers are outside the customer range
+# (12 digits starting 2000) so they can never be allocated to a customer.
+CASH = '9000000000001'  # Money paid in and out over the counter
+SUSPENSE = '9000000000002'  # Contra side of manual balance adjustments
+CLEARING = '9000000000003'  # Money in transit between shards; see sharding.py
+INTEREST_EXPENSE = '9000000000004'  # Interest paid to customers; see end_of_day.py
+FEE_INCOME = '9000000000005'  # Fees charged to customers
+INTERNAL_ACCOUNTS = {CASH: 'cash', SUSPENSE: 'suspense', CLEARING: 'clearing', INTEREST_EXPENSE: 'interest expense',
+                     FEE_INCOME: 'fee income'}
+
+
+class UnbalancedPosting(ValueError):
+    pass
+
+
+def opening_legs(account_number, amount):
+    """Legs that open ``account_number`` with ``amount`` paid in from CASH."""
+    return [Transaction(account_number, OPENING_BALANCE, amount, balance_after=amount),
+            Transaction(CASH, OPENING_BALANCE, -amount, account_number)]
+
+
+def _sum_segment(path):
+    # Runs in a worker process: net amount, posting count and latest
+    # (txn_id, balance_after) for every account in one ledger segment
+    totals = {}
+    with open(path, 'rb') as file:
+        data = file.read()
+    data = data[:len(data) - len(data) % Transaction.RECORD.size]
+    for txn_id, _, account_number, _, amount, _, balance_after in Transaction.RECORD.iter_unpack(data):
+        total = totals.get(account_number)
+        if total is None:
+            total = totals[account_number] = [0.0, 0, 0, math.nan]
+        total[0] += amount
+        total[1] += 1
+        if txn_id > total[2]:
+            total[2], total[3] = txn_id, balance_after
+    return totals
+
+
+class PostingEngine:
+    """Double-entry front door to the ledger.
+
+    Every change is posted as a group of legs whose amounts sum to zero:
+    a deposit credits the customer and debits CASH, a withdrawal the
+    reverse, a transfer debits one customer and credits another, and a
+    manual adjustment is balanced against SUSPENSE. ``post`` refuses an
+    unbalanced group, fills in the internal accounts' running balances
+    and appends the group to the ledger atomically.
+
+    A trial balance of everything posted since the ledger was opened is
+    kept as running totals, so ``check`` is O(1); ``post`` makes the
+    same check before it accepts a group. ``reconcile`` is the full audit: it re-adds the whole ledger,
+    a segment per worker process, and compares it with stored balances.
+    """
+
+    TOLERANCE = 1e-6
+
+    def __init__(self, ledger):
+        self.ledger = ledger
+        self.debits = 0.0
+        self.credits = 0.0
+        self.groups = 0
+        self.internal_balances = {}
+        for account_number in INTERNAL_ACCOUNTS:
+            latest = ledger.read(account_number, limit=1)  # Balances are carried on the latest leg
+            self.internal_balances[account_number] = latest[0].balance_after if latest else 0.0
+        self._lock = threading.Lock()
+
+    def post(self, legs):
+        """Check that ``legs`` balance, then queue them in the ledger as one group.
+
+        Customer legs must already carry their balance_after; internal
+        legs get theirs here. Raises UnbalancedPosting, before anything is
+        queued or counted, if an amount is not finite or the amounts do
+        not sum to zero.
+        """
+        if not all(math.isfinite(leg.amount) for leg in legs):
+            raise UnbalancedPosting(f"Legs {[str(leg) for leg in legs]} include an amount that is not finite")
+        imbalance = math.fsum(leg.amount for leg in legs)
+        if abs(imbalance) > self.TOLERANCE:
+            raise UnbalancedPosting(f"Legs {[str(leg) for leg in legs]} are out of balance by {imbalance}")
+        debits = -math.fsum(leg.amount for leg in legs if leg.amount < 0)
+        credits = math.fsum(leg.amount for leg in legs if leg.amount >= 0)
+        with self._lock:
+            # Nothing is changed until the group is known to keep the trial balance square
+            if not self._close(self.debits + debits, self.credits + credits):
+                raise UnbalancedPosting(f"Trial balance would be off by {self.credits + credits - self.debits - debits}")
+            for leg in legs:
+                if leg.account_number in self.internal_balances:
+                    self.internal_balances[leg.account_number] += leg.amount
+                    leg.balance_after = self.internal_balances[leg.account_number]
+            self.debits += debits
+            self.credits += credits
+            self.groups += 1
+            self.ledger.append_many(legs)
+        return legs
+
+    def _close(self, a, b):
+        # Sums of many float amounts drift, so the tolerance grows with their size
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=self.TOLERANCE)
+
+    def trial_balance(self):
+        with self._lock:
+            return {'groups': self.groups, 'debits': self.debits, 'credits': self.credits,
+                    'imbalance': self.credits - self.debits,
+                    'internal_balances': dict(self.internal_balances)}
+
+    def check(self):
+        """O(1) invariant: debits and credits posted so far are equal."""
+        with self._lock:
+            debits, credits = self.debits, self.credits
+        if not self._close(debits, credits):
+            raise UnbalancedPosting(f"Trial balance is off by {credits - debits}")
+        return True
+
+    def reconcile(self, balances, workers=None):
+        """Re-add the whole ledger and compare it with ``balances`` (account number -> stored balance).
+
+        Internal accounts are compared with the engine's own balances.
+        Returns a dict with the number of postings and accounts checked,
+        the ledger's total imbalance, and per-account problems: stored
+        balances that differ from the sum of their postings or from the
+        balance_after of their latest posting, and ledger accounts that
+        are neither stored nor internal.
+        """
+        from concurrent.futures import ProcessPoolExecutor  # Pulls in multiprocessing; only needed here
+        self.ledger.flush()
+        totals = {}
+        with ProcessPoolExecutor(workers) as pool:
+            for segment_totals in pool.map(_sum_segment, self.ledger.segment_paths()):
+                for account_number, (amount, count, txn_id, balance_after) in segment_totals.items():
+                    total = totals.setdefault(str(account_number), [0.0, 0, 0, math.nan])
+                    total[0] += amount
+                    total[1] += count
+                    if txn_id > total[2]:
+                        total[2], total[3] = txn_id, balance_after
+
+        expected = dict(balances)
+        with self._lock:
+            expected.update(self.internal_balances)
+        mismatched = []
+        for account_number, balance in expected.items():
+            amount, _, _, balance_after = totals.get(account_number, (0.0, 0, 0, math.nan))
+            if not self._close(amount, balance):
+                mismatched.append((account_number, balance, amount))
+            elif not math.isnan(balance_after) and not self._close(balance_after, balance):
+                mismatched.append((account_number, balance, balance_after))
+        unknown = sorted(account_number for account_number in totals if account_number not in expected)
+        return {'postings': sum(total[1] for total in totals.values()), 'accounts': len(expected),
+                'imbalance': math.fsum(total[0] for total in totals.values()),
+                'mismatched': mismatched, 'unknown_accounts': unknown}
+
@@ -0,0 +1,165 @@
+import csv
+import json
+import os
+import threading
+from collections import deque
+
+from postings import INTERNAL_ACCOUNTS
+from transactions import KIND_NAMES
+
+
+class ReportingEngine:
+    """Running totals behind the bank's reports.
+
+    The engine follows the ledger: every group commit is folded into
+    per-account activity (postings, credits, debits), per-kind totals
+    (deposits, withdrawals, transfers, ...) and totals per account type,
+    so a report is a handful of dict lookups rather than a pass over every
+    account's history.
+
+    The totals and the last txn_id they cover are saved to ``path``
+    by ``save``; the next run loads them and only folds in postings
+    committed since. Without a saved file the engine seeds itself with
+    one scan of the ledger.
+    """
+
+    RECENT = 50  # Postings kept for monitor_transactions
+
+    def __init__(self, ledger, account_type_of, path='reports.json'):
+        self.ledger = ledger
+        self.account_type_of = account_type_of  # account number -> account type
+        self.path = path
+        self.position = 0  # txn_id of the last posting folded in
+        self.accounts = {}  # account number -> [account type, postings, credits, debits, last timestamp]
+        self.kinds = {}  # kind -> [postings, amount]
+        self.types = {}  # account type -> [accounts, postings, credits, debits]
+        self.recent = deque(maxlen=self.RECENT)
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self._load()
+        ledger.follow(self.apply, self.position)
+
+    def _load(self):
+        with open(self.path) as file:
+            state = json.load(file)
+        if not isinstance(state['position'], int):
+            return  # Saved against the old text ledger; rebuilt from a full scan
+        self.position = state['position']
+        self.accounts = state['accounts']
+        self.kinds = state['kinds']
+        self.recent.extend(tuple(posting) for posting in state['recent'])
+        for account_type, postings, credits, debits, _ in self.accounts.values():
+            totals = self.types.setdefault(account_type, [0, 0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += postings
+            totals[2] += credits
+            totals[3] += debits
+
+    def apply(self, records):
+        """Fold committed postings into the totals; registered with ``Ledger.follow``."""
+        with self._lock:
+            for record in records:
+                account_number, amount = record.account_number, record.amount
+                if account_number in INTERNAL_ACCOUNTS:
+                    continue  # The bank's side of each posting would count every amount twice
+                activity = self.accounts.get(account_number)
+                if activity is None:
+                    activity = self.accounts[account_number] = [self.account_type_of(account_number), 0, 0.0, 0.0, 0.0]
+                    self.types.setdefault(activity[0], [0, 0, 0.0, 0.0])[0] += 1
+                totals = self.types[activity[0]]
+                activity[1] += 1
+                totals[1] += 1
+                if amount >= 0:
+                    activity[2] += amount
+                    totals[2] += amount
+                else:
+                    activity[3] -= amount
+                    totals[3] -= amount
+                activity[4] = max(activity[4], record.timestamp)
+                by_kind = self.kinds.setdefault(KIND_NAMES.get(record.kind, 'Other').lower(), [0, 0.0])
+                by_kind[0] += 1
+                by_kind[1] += abs(amount)
+                self.recent.append((record.timestamp, account_number, str(record)))
+            if records:
+                self.position = records[-1].txn_id
+
+    def account_activity(self, account_number):
+        """Postings, credits, debits and net flow for one account, or None if it has no postings."""
+        with self._lock:
+            activity = self.accounts.get(str(account_number))
+            if activity is None:
+                return None
+            account_type, postings, credits, debits, last_posting = activity
+        return {'account_number': str(account_number), 'account_type': account_type, 'postings': postings,
+                'credits': credits, 'debits': debits, 'net_flow': credits - debits, 'last_posting': last_posting}
+
+    def by_account_type(self):
+        with self._lock:
+            return {account_type: {'accounts': accounts, 'postings': postings, 'credits': credits,
+                                   'debits': debits, 'net_flow': credits - debits}
+                    for account_type, (accounts, postings, credits, debits) in self.types.items()}
+
+    def totals(self):
+        """Bank-wide postings, credits and debits, plus count and amount per kind of posting."""
+        with self._lock:
+            postings = sum(totals[1] for totals in self.types.values())
+            credits = sum(totals[2] for totals in self.types.values())
+            debits = sum(totals[3] for totals in self.types.values())
+            by_kind = {kind: {'postings': count, 'amount': amount} for kind, (count, amount) in self.kinds.items()}
+        return {'accounts': len(self.accounts), 'postings': postings, 'credits': credits, 'debits': debits,
+                'net_flow': credits - debits, 'by_kind': by_kind}
+
+    def financial_performance(self):
+        """Money that entered and left the bank, and how it moved between account types.
+
+        Transfers move money between customers, so they count towards
+        volume but not towards the bank's net inflow.
+        """
+        totals = self.totals()
+        amounts = {kind: report['amount'] for kind, report in totals['by_kind'].items()}
+        deposits = amounts.get('deposit', 0.0) + amounts.get('opening balance', 0.0)
+        withdrawals = amounts.get('withdrawal', 0.0)
+        return {'deposits': deposits, 'withdrawals': withdrawals, 'net_inflow': deposits - withdrawals,
+                # Each transfer is posted once per side
+                'transfer_volume': (amounts.get('transfer', 0.0) + amounts.get('scheduled transfer', 0.0)) / 2,
+                'postings': totals['postings'], 'active_accounts': totals['accounts'],
+                'net_flow_by_account_type': {account_type: report['net_flow']
+                                             for account_type, report in self.by_account_type().items()}}
+
+    def recent_postings(self, limit=RECENT):
+        """The most recently committed postings, newest last, as (timestamp, account_number, transaction)."""
+        with self._lock:
+            return list(self.recent)[-limit:]
+
+    def export_csv(self, path):
+        """Write one row of activity per account; returns the number of rows."""
+        with self._lock:
+            rows = [(account_number, account_type, postings, credits, debits, credits - debits)
+                    for account_number, (account_type, postings, credits, debits, _) in self.accounts.items()]
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['account_number', 'account_type', 'postings', 'credits', 'debits', 'net_flow'])
+            writer.writerows(rows)
+        return len(rows)
+
+    def export_json(self, path):
+        report = {'totals': self.totals(), 'by_account_type': self.by_account_type(),
+                  'financial_performance': self.financial_performance()}
+        with open(path, 'w') as file:
+            json.dump(report, file, indent=2)
+        return report
+
+    def save(self):
+        """Write the totals and the ledger position they cover, replacing the previous file atomically."""
+        with self._lock:
+            state = json.dumps({'position': self.position, 'accounts': self.accounts, 'kinds': self.kinds,
+                                'recent': list(self.recent)})
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as file:
+            file.write(state)
+        os.replace(temporary, self.path)
+
+    def close(self):
+        if self.apply in self.ledger.listeners:
+            self.ledger.listeners.remove(self.apply)
+        self.save()
@@ -0,0 +1,281 @@
+"""Future-dated and recurring transfers: standing orders, salaries, loan repayments.
+
+``Scheduler`` keeps every schedule in memory with a heap of
+(due time, schedule id, occurrence) entries, so finding what is due
+costs O(log n) per due occurrence however many schedules there are.
+After downtime, ``run_due`` pops only what fell due meanwhile and fires
+every missed occurrence, oldest first.
+
+Due occurrences are posted in batches through
+``BankManagementSystem.transfer_batch``. Each batch is screened like any
+other transfer and written to the ledger in one flush. The sender's
+authority is checked when the schedule is made, not when it fires.
+
+Schedules persist in an append-only JSON-lines journal. Before a batch
+is posted, the journal records which occurrences it holds and the
+ledger's last txn_id. Afterwards it records their results. A batch
+logged without results was cut off by a crash. Its postings were
+committed to the ledger together or not at all, so on opening
+the ledger after that txn_id shows which it was. Scheduled transfers
+are posted with their own kind, SCHEDULED_TRANSFER, so a customer's
+own transfer of the same amount is never mistaken for one. A batch
+that never reached the ledger fires again; one that did is not paid
+twice. The journal is rewritten once most of it describes finished
+work.
+"""
+import calendar
+import heapq
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from transactions import SCHEDULED_TRANSFER
+
+INTERVALS = {'daily': 86400, 'weekly': 7 * 86400}  # Seconds; 'monthly' follows the calendar
+
+
+def occurrence(start, every, n):
+    """Due time of occurrence ``n`` (from 0) of a schedule starting at ``start``.
+
+    ``every`` is None for a one-off transfer, 'daily', 'weekly',
+    'monthly' or a number of seconds. Monthly occurrences keep the day
+    of the month of ``start`` in local time, or the month's last day
+    when it is shorter.
+    """
+    if not n or every is None:
+        return start
+    if every == 'monthly':
+        first = datetime.fromtimestamp(start)
+        month = first.month - 1 + n
+        year, month = first.year + month // 12, month % 12 + 1
+        day = min(first.day, calendar.monthrange(year, month)[1])
+        return first.replace(year=year, month=month, day=day).timestamp()
+    return start + n * INTERVALS.get(every, every)
+
+
+def _valid_times(times):
+    return times is None or (isinstance(times, int) and not isinstance(times, bool) and times >= 1)
+
+
+class Schedule:
+    """A transfer repeated ``times`` times (None: until cancelled), ``fired`` of them so far."""
+
+    __slots__ = ('schedule_id', 'sender', 'recipient', 'amount', 'start', 'every', 'times', 'fired')
+
+    def __init__(self, schedule_id, sender, recipient, amount, start, every=None, times=None, fired=0):
+        self.schedule_id = schedule_id
+        self.sender = sender
+        self.recipient = recipient
+        self.amount = amount
+        self.start = start
+        self.every = every
+        self.times = 1 if every is None else times
+        self.fired = fired
+
+    @property
+    def finished(self):
+        return self.times is not None and self.fired >= self.times
+
+    @property
+    def due(self):
+        """When the next occurrence is due; None once the schedule is finished."""
+        return None if self.finished else occurrence(self.start, self.every, self.fired)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Scheduler:
+    """Persisted priority queue of scheduled transfers for one bank; see the module docstring.
+
+    ``clock`` returns the current time in seconds since the epoch and
+    can be swapped for a fake one in tests and benchmarks.
+    """
+
+    def __init__(self, bank, path='schedules.log', clock=time.time, batch_size=1000, sync=True, log_size=1000):
+        self.bank = bank
+        self.path = path
+        self.clock = clock
+        self.batch_size = batch_size
+        self.sync = sync
+        self.schedules = {}  # schedule_id -> Schedule, unfinished ones only
+        self.failures = deque(maxlen=log_size)  # (due, schedule_id, error) of occurrences that were rejected
+        self._heap = []  # (due, schedule_id, occurrence); entries left by cancelled schedules are skipped
+        self._next_id = 1
+        self._entries = 0  # Lines in the journal, to decide when to rewrite it
+        self._lock = threading.Lock()
+        self._load()
+        self._file = open(self.path, 'a')
+
+    def _load(self):
+        interrupted = None
+        if os.path.exists(self.path):
+            with open(self.path) as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # A line torn by a crash ends the journal
+                    self._entries += 1
+                    op = entry['op']
+                    if op == 'add':
+                        schedule = Schedule(**entry['schedule'])
+                        self._next_id = max(self._next_id, schedule.schedule_id + 1)
+                        if _valid_times(schedule.times):  # Older versions logged whatever they were given
+                            self.schedules[schedule.schedule_id] = schedule
+                    elif op == 'cancel':
+                        self.schedules.pop(entry['schedule_id'], None)
+                    elif op == 'batch':
+                        interrupted = entry
+                        self._advance(entry['items'])
+                    elif op == 'fired':
+                        interrupted = None
+                        self.failures.extend(tuple(failure) for failure in entry['failures'])
+        if interrupted and not self._reached_ledger(interrupted):
+            for schedule_id, n in interrupted['items']:  # Fire the whole batch again
+                schedule = self.schedules.get(schedule_id)
+                if schedule is not None:
+                    schedule.fired = min(schedule.fired, n)
+        for schedule_id, schedule in list(self.schedules.items()):
+            if schedule.finished:
+                del self.schedules[schedule_id]
+            else:
+                self._heap.append((schedule.due, schedule_id, schedule.fired))
+        heapq.heapify(self._heap)
+        if interrupted is not None or self._entries > 2 * len(self.schedules) + 1000:
+            self._rewrite()
+
+    def _advance(self, items):
+        for schedule_id, n in items:
+            schedule = self.schedules.get(schedule_id)
+            if schedule is not None:
+                schedule.fired = max(schedule.fired, n + 1)
+
+    def _reached_ledger(self, batch):
+        # A batch's postings were appended together, so finding any one of them is enough. Only the
+        # scheduler posts SCHEDULED_TRANSFER and its batches never overlap, so a match is this batch.
+        wanted = set()
+        for schedule_id, _ in batch['items']:
+            schedule = self.schedules.get(schedule_id)
+            if schedule is not None:
+                wanted.add((schedule.sender, schedule.recipient, -schedule.amount))
+        for record in self.bank.ledger.scan(after=batch['after']):
+            if record.kind == SCHEDULED_TRANSFER and (record.account_number, record.counterparty, record.amount) in wanted:
+                return True
+        return False
+
+    def _write(self, *entries):
+        self._file.write(''.join(json.dumps(entry) + '\n' for entry in entries))
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+        self._entries += len(entries)
+
+    def _rewrite(self):
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as file:
+            for schedule in self.schedules.values():
+                file.write(json.dumps({'op': 'add', 'schedule': schedule.to_dict()}) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.path)
+        self._entries = len(self.schedules)
+        if getattr(self, '_file', None) is not None:
+            self._file.close()
+            self._file = open(self.path, 'a')
+
+    def add(self, sender, recipient, amount, start, every=None, times=None):
+        """Schedule ``amount`` from ``sender`` to ``recipient``, first due at ``start``; returns the schedule id.
+
+        Raises ValueError, before anything is written, for an unknown
+        interval or a ``times`` that is not None or a whole number from 1.
+        """
+        if every is not None and every not in INTERVALS and every != 'monthly' \
+                and not (isinstance(every, (int, float)) and every > 0):
+            raise ValueError(f"Unknown interval {every!r}")
+        if not _valid_times(times):
+            raise ValueError(f"Invalid repeat count {times!r}")
+        with self._lock:
+            schedule = Schedule(self._next_id, sender, recipient, float(amount), float(start), every, times)
+            self._next_id += 1
+            self._write({'op': 'add', 'schedule': schedule.to_dict()})
+            self.schedules[schedule.schedule_id] = schedule
+            heapq.heappush(self._heap, (schedule.due, schedule.schedule_id, 0))
+        return schedule.schedule_id
+
+    def cancel(self, schedule_id):
+        """Stop a schedule; its heap entry is dropped when it comes up. False if there is no such schedule."""
+        with self._lock:
+            if self.schedules.pop(schedule_id, None) is None:
+                return False
+            self._write({'op': 'cancel', 'schedule_id': schedule_id})
+        return True
+
+    def for_account(self, account_number):
+        """Unfinished schedules paying from ``account_number``, soonest first."""
+        with self._lock:
+            return sorted((schedule for schedule in self.schedules.values() if schedule.sender == account_number),
+                          key=lambda schedule: schedule.due)
+
+    def next_due(self):
+        """When the earliest occurrence is due, or None."""
+        with self._lock:
+            while self._heap and self._stale(self._heap[0]):
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def _stale(self, entry):
+        schedule = self.schedules.get(entry[1])
+        return schedule is None or schedule.fired != entry[2]
+
+    def run_due(self, now=None):
+        """Post every occurrence due by ``now`` (default: the clock), in batches of ``batch_size``.
+
+        Returns the transfer_batch result dicts, each with its
+        'schedule_id' and 'due' added.
+        """
+        now = self.clock() if now is None else now
+        results = []
+        with self._lock:
+            while True:
+                batch = []
+                while self._heap and self._heap[0][0] <= now and len(batch) < self.batch_size:
+                    entry = heapq.heappop(self._heap)
+                    if self._stale(entry):
+                        continue
+                    due, schedule_id, n = entry
+                    schedule = self.schedules[schedule_id]
+                    schedule.fired = n + 1
+                    batch.append((due, schedule, n))
+                    if schedule.finished:
+                        del self.schedules[schedule_id]
+                    else:  # Catch-up: a next occurrence already due is popped later in this run
+                        heapq.heappush(self._heap, (schedule.due, schedule_id, n + 1))
+                if not batch:
+                    break
+                results.extend(self._fire(batch))
+            if self._entries > 2 * len(self.schedules) + 1000:
+                self._rewrite()
+        return results
+
+    def _fire(self, batch):
+        self._write({'op': 'batch', 'after': self.bank.ledger.last_txn_id,
+                     'items': [(schedule.schedule_id, n) for _, schedule, n in batch]})
+        results = self.bank.transfer_batch([(schedule.sender, schedule.recipient, schedule.amount, None)
+                                            for _, schedule, _ in batch], preauthorised=True,
+                                           kind=SCHEDULED_TRANSFER)
+        failures = []
+        for (due, schedule, _), result in zip(batch, results):
+            result['schedule_id'], result['due'] = schedule.schedule_id, due
+            if result['status'] != 'posted':
+                failures.append((due, schedule.schedule_id, result['error']))
+        self._write({'op': 'fired', 'failures': failures})
+        self.failures.extend(failures)
+        return results
+
+    def close(self):
+        with self._lock:
+            self._file.close()
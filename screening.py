@@ -0,0 +1,201 @@
+"""Real-time fraud and velocity screening of postings.
+
+``Screener`` keeps a sliding window of every account's recent payments
+(postings that take money out): their count, their total, a count per
+counterparty, and Welford running statistics of payment amounts. Rules
+read that state and never the ledger, so screening a posting costs the
+same however long the account's history is. Expiring old payments from
+the window is amortised O(1).
+
+A rule is an (action, check) pair built by the factory functions
+below, where check(window, amount, counterparty) returns a reason
+string or None. The strongest action among the rules that fire
+decides the outcome:
+
+* 'flag' lets the posting through and records it in ``flagged``;
+* 'hold' refuses it, as a rejection, and records it in ``held`` for
+  review. Nothing releases a held posting later: once a reviewer has
+  cleared it, the customer makes it again.
+
+Accounts screen concurrently, each under its own lock, so the state
+they share (the window table and the decision logs) has a lock of its
+own. Windows of accounts with no posting for ``idle`` seconds are
+dropped, together with their amount statistics, so memory follows the
+accounts that are active rather than every account ever seen.
+"""
+import math
+import threading
+import time
+from collections import deque, namedtuple
+
+
+ALLOW, FLAG, HOLD = 'allow', 'flag', 'hold'
+_SEVERITY = {ALLOW: 0, FLAG: 1, HOLD: 2}
+
+Decision = namedtuple('Decision', 'action reasons')
+ALLOWED = Decision(ALLOW, ())
+
+
+class Window:
+    """One account's payments over the last ``Screener.window`` seconds, plus lifetime amount statistics."""
+
+    __slots__ = ('events', 'count', 'outflow', 'counterparties', 'n', 'mean', 'm2', 'last')
+
+    def __init__(self):
+        self.last = 0.0  # When the account was last screened or observed
+        self.events = deque()  # (timestamp, amount paid, counterparty)
+        self.count = 0
+        self.outflow = 0.0
+        self.counterparties = {}  # counterparty -> payments in the window
+        self.n = 0  # Welford: payments seen, mean and sum of squared deviations of their amounts
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def expire(self, cutoff):
+        events = self.events
+        while events and events[0][0] < cutoff:
+            _, amount, counterparty = events.popleft()
+            self.count -= 1
+            self.outflow -= amount
+            if counterparty is not None:
+                remaining = self.counterparties[counterparty] - 1
+                if remaining:
+                    self.counterparties[counterparty] = remaining
+                else:
+                    del self.counterparties[counterparty]
+
+    def add(self, timestamp, amount, counterparty):
+        self.events.append((timestamp, amount, counterparty))
+        self.count += 1
+        self.outflow += amount
+        if counterparty is not None:
+            self.counterparties[counterparty] = self.counterparties.get(counterparty, 0) + 1
+        self.n += 1
+        delta = amount - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (amount - self.mean)
+
+    def zscore(self, amount):
+        """How many standard deviations a payment of ``amount`` is from the usual; 0 with too little history."""
+        if self.n < 2 or not self.m2:
+            return 0.0
+        return (amount - self.mean) / math.sqrt(self.m2 / (self.n - 1))
+
+
+def max_amount(limit, action=FLAG):
+    """Fire on any posting, in or out, larger than ``limit``."""
+    def check(window, amount, counterparty):
+        if abs(amount) > limit:
+            return f"amount {abs(amount):.2f} is over {limit:.2f}"
+    return action, check
+
+
+def max_payments(limit, action=FLAG):
+    """Fire when a payment would make more than ``limit`` in the window."""
+    def check(window, amount, counterparty):
+        if amount < 0 and window.count >= limit:
+            return f"more than {limit} payments in the window"
+    return action, check
+
+
+def max_outflow(limit, action=HOLD):
+    """Fire when a payment would take the money paid out in the window over ``limit``."""
+    def check(window, amount, counterparty):
+        if amount < 0 and window.outflow - amount > limit:
+            return f"more than {limit:.2f} paid out in the window"
+    return action, check
+
+
+def max_counterparties(limit, action=FLAG):
+    """Fire on a payment to a new counterparty once the window already has ``limit`` distinct ones."""
+    def check(window, amount, counterparty):
+        if amount < 0 and counterparty is not None and counterparty not in window.counterparties \
+                and len(window.counterparties) >= limit:
+            return f"more than {limit} counterparties in the window"
+    return action, check
+
+
+def amount_zscore(threshold, min_history=5, action=FLAG):
+    """Fire when a payment is more than ``threshold`` standard deviations above the account's mean payment."""
+    def check(window, amount, counterparty):
+        if amount < 0 and window.n >= min_history and window.zscore(-amount) > threshold:
+            return f"payment {-amount:.2f} is {window.zscore(-amount):.1f} standard deviations above usual"
+    return action, check
+
+
+DEFAULT_RULES = (
+    max_amount(10000.0),
+    max_payments(20),
+    max_payments(60, HOLD),
+    max_outflow(50000.0),
+    max_counterparties(10),
+    amount_zscore(4.0),
+    amount_zscore(10.0, action=HOLD),
+)
+
+
+class Screener:
+    """Per-account sliding-window screening; see the module docstring."""
+
+    def __init__(self, window=600.0, rules=DEFAULT_RULES, clock=time.time, log_size=1000, idle=86400.0):
+        self.window = window
+        self.rules = list(rules)
+        self.clock = clock
+        self.idle = idle
+        self.accounts = {}  # account number -> Window, for accounts active in the last ``idle`` seconds
+        self.flagged = deque(maxlen=log_size)  # (timestamp, account_number, amount, counterparty, reasons)
+        self.held = deque(maxlen=log_size)
+        self.counts = {FLAG: 0, HOLD: 0}  # Every decision, including ones dropped from the logs
+        self._lock = threading.Lock()  # Guards the state above that accounts share
+        self._swept = -math.inf  # When idle windows were last dropped
+
+    def _window(self, account_number, timestamp):
+        # The caller holds the account's lock, so only the table itself needs ours
+        window = self.accounts.get(account_number)
+        if window is not None and timestamp - window.last < self.idle / 2 and timestamp - self._swept < self.window:
+            # Active too recently for any sweep to drop it, and none is due: the common case takes no lock
+            if timestamp > window.last:
+                window.last = timestamp
+            return window
+        with self._lock:
+            if timestamp - self._swept >= self.window:
+                cutoff, self._swept = timestamp - self.idle, timestamp
+                for idle in [number for number, window in self.accounts.items() if window.last < cutoff]:
+                    del self.accounts[idle]
+            window = self.accounts.get(account_number)
+            if window is None:
+                window = self.accounts[account_number] = Window()
+            window.last = max(window.last, timestamp)  # Set under the lock, so the sweep cannot drop it now
+        return window
+
+    def screen(self, account_number, amount, counterparty=None, timestamp=None):
+        """Decide on a posting of signed ``amount`` to ``account_number``; returns a Decision.
+
+        Only ``observe`` adds a posting to the window, so a held posting
+        does not count against the account.
+        """
+        timestamp = self.clock() if timestamp is None else timestamp
+        window = self._window(account_number, timestamp)
+        window.expire(timestamp - self.window)
+        action, reasons = ALLOW, []
+        for rule_action, check in self.rules:
+            reason = check(window, amount, counterparty)
+            if reason:
+                reasons.append(reason)
+                if _SEVERITY[rule_action] > _SEVERITY[action]:
+                    action = rule_action
+        if action == ALLOW:
+            return ALLOWED
+        with self._lock:
+            self.counts[action] += 1
+            (self.held if action == HOLD else self.flagged).append((timestamp, account_number, amount, counterparty,
+                                                                    reasons))
+        return Decision(action, tuple(reasons))
+
+    def observe(self, account_number, amount, counterparty=None, timestamp=None):
+        """Add a posting that went through to its account's window; only payments (negative amounts) count."""
+        if amount >= 0:
+            return
+        amount = -amount
+        timestamp = self.clock() if timestamp is None else timestamp
+        self._window(account_number, timestamp).add(timestamp, amount, counterparty)
@@ -0,0 +1,241 @@
+"""asyncio front-end serving the bank to many clients at once.
+
+Usage: python server.py [--host 127.0.0.1] [--port 8765] [--unix PATH] [--data-dir .] [--workers 32]
+                        [--checkpoint-interval 30] [--schedule-interval 1] [--snapshot-interval 3600]
+
+The protocol is JSON lines: every request is one JSON object on its own
+line, e.g.
+
+    {"id": 1, "op": "deposit", "account_number": "200000000014", "amount": 50}
+
+and every response is one line carrying the same id:
+
+    {"id": 1, "ok": true, "result": true}
+    {"id": 2, "ok": false, "error": "Account not found!"}
+
+Operations: create_account, log_in, log_out, deposit, withdraw, transfer,
+schedule_transfer, cancel_scheduled_transfer, get_account_info,
+get_transaction_history, balance_as_of and metrics, which returns the
+bank's counters and latency histograms in the Prometheus text format
+(see metrics.py). deposit, withdraw, get_account_info,
+get_transaction_history and balance_as_of need a token from log_in for
+the account; transfer needs a token or the sender's pin, and so does
+schedule_transfer, which takes "first_due" (seconds since the epoch) and
+optionally "every" ("daily", "weekly", "monthly" or seconds) and "times".
+get_transaction_history returns a page of postings; pass "since" or
+"before" (a txn_id from an earlier page) and "limit" to page through
+the rest. balance_as_of takes "account_number" and "timestamp" (seconds
+since the epoch). Requests on one
+connection are answered in order. All connections share one
+BankManagementSystem, and every operation runs in a thread pool so disk
+I/O and PIN hashing never block the event loop. A background thread
+checkpoints the bank every --checkpoint-interval seconds, which keeps
+the write-ahead log short. Others make the scheduled transfers that
+have come due every --schedule-interval seconds, and snapshot every
+balance every --snapshot-interval seconds for balance_as_of.
+"""
+import argparse
+import asyncio
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from bank import BankManagementSystem
+from wal import Checkpointer
+
+
+class RequestError(Exception):
+    pass
+
+
+def _amount(request):
+    """The request's amount as a finite, positive float."""
+    amount = float(request['amount'])
+    if not math.isfinite(amount) or amount <= 0:
+        raise RequestError("Invalid amount! It must be a positive number.")
+    return amount
+
+
+class BankServer:
+    def __init__(self, bank, workers=32, checkpoint_interval=30.0, schedule_interval=1.0, snapshot_interval=3600.0):
+        self.bank = bank
+        self.executor = ThreadPoolExecutor(workers)
+        self.checkpointer = Checkpointer(bank.checkpoint, checkpoint_interval)
+        self.scheduler = Checkpointer(bank.run_scheduled_transfers, schedule_interval, 'scheduler')
+        self.snapshotter = Checkpointer(bank.snapshot, snapshot_interval, 'snapshotter')
+        self.handlers = {
+            'create_account': self.create_account,
+            'log_in': self.log_in,
+            'log_out': self.log_out,
+            'deposit': self.deposit,
+            'withdraw': self.withdraw,
+            'transfer': self.transfer,
+            'schedule_transfer': self.schedule_transfer,
+            'cancel_scheduled_transfer': self.cancel_scheduled_transfer,
+            'get_account_info': self.get_account_info,
+            'get_transaction_history': self.get_transaction_history,
+            'balance_as_of': self.balance_as_of,
+            'metrics': self.metrics,
+        }
+
+    def create_account(self, request):
+        pin = str(request['pin'])
+        if not (pin.isdigit() and len(pin) == 4):
+            raise RequestError("Invalid PIN! Please enter a 4-digit number.")
+        initial_balance = float(request['initial_balance'])
+        if not math.isfinite(initial_balance) or initial_balance < 0:
+            raise RequestError("Invalid initial balance! It must be zero or a positive number.")
+        return self.bank.open_account(request['account_name'], request['account_type'],
+                                      initial_balance, request.get('personal_info', ''), pin)
+
+    def _authorise(self, request):
+        # Reads are limited to the account's own session, like deposits and withdrawals
+        token = request.get('token')
+        if token is None or not self.bank.sessions.validate(token, request['account_number']):
+            raise RequestError(f"Log in first: {request['op']} needs a token for the account.")
+
+    def log_in(self, request):
+        token = self.bank.log_in(request['account_number'], str(request['pin']))
+        if not token:
+            raise RequestError("Login failed. Please check your account number and PIN.")
+        return token
+
+    def log_out(self, request):
+        self.bank.log_out(request['token'])
+        return True
+
+    def deposit(self, request):
+        if 'token' not in request:
+            raise RequestError("Log in first: deposit needs a token.")
+        if not self.bank.deposit(request['account_number'], _amount(request), token=request['token']):
+            raise RequestError("Deposit failed!")
+        return True
+
+    def withdraw(self, request):
+        if 'token' not in request:
+            raise RequestError("Log in first: withdraw needs a token.")
+        if not self.bank.withdraw(request['account_number'], _amount(request), token=request['token']):
+            raise RequestError("Withdrawal failed!")
+        return True
+
+    def transfer(self, request):
+        if not self.bank.transfer(request['sender_account_number'], request['recipient_account_number'],
+                                  _amount(request), request.get('sender_pin'), token=request.get('token')):
+            raise RequestError("Transfer failed! Check account numbers or balances.")
+        return True
+
+    def schedule_transfer(self, request):
+        schedule_id = self.bank.schedule_transfer(request['sender_account_number'], request['recipient_account_number'],
+                                                  _amount(request), float(request['first_due']),
+                                                  request.get('every'), request.get('times'),
+                                                  request.get('sender_pin'), request.get('token'))
+        if schedule_id is None:
+            raise RequestError("Scheduling failed! Check account numbers, amount and authorisation.")
+        return schedule_id
+
+    def cancel_scheduled_transfer(self, request):
+        if not self.bank.cancel_scheduled_transfer(int(request['schedule_id'])):
+            raise RequestError("No such scheduled transfer!")
+        return True
+
+    def get_account_info(self, request):
+        self._authorise(request)
+        info = self.bank.get_account_info(request['account_number'])
+        if 'error' in info:
+            raise RequestError(info['error'])
+        return info
+
+    def get_transaction_history(self, request):
+        self._authorise(request)
+        history = self.bank.get_transaction_history(request['account_number'], request.get('since'),
+                                                    request.get('before'), int(request.get('limit', 20)))
+        if isinstance(history, str):
+            raise RequestError(history)
+        return [{'txn_id': transaction.txn_id, 'timestamp': transaction.timestamp, 'transaction': str(transaction)}
+                for transaction in history]
+
+    def balance_as_of(self, request):
+        self._authorise(request)
+        balance = self.bank.balance_as_of(request['account_number'], float(request['timestamp']))
+        if balance is None:
+            raise RequestError("Account not found!")
+        return balance
+
+    def metrics(self, request):
+        return self.bank.metrics.prometheus()
+
+    async def dispatch(self, line):
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {'id': None, 'ok': False, 'error': "Malformed JSON request"}
+        request_id = request.get('id') if isinstance(request, dict) else None
+        handler = self.handlers.get(request.get('op')) if isinstance(request, dict) else None
+        if handler is None:
+            return {'id': request_id, 'ok': False, 'error': "Unknown operation"}
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self.executor, handler, request)
+        except RequestError as error:
+            return {'id': request_id, 'ok': False, 'error': str(error)}
+        except (KeyError, TypeError, ValueError) as error:
+            return {'id': request_id, 'ok': False, 'error': f"Bad request: {error!r}"}
+        except Exception as error:  # Answer the request rather than drop the connection
+            return {'id': request_id, 'ok': False, 'error': f"Internal error: {error!r}"}
+        return {'id': request_id, 'ok': True, 'result': result}
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self.dispatch(line)
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765, unix_path=None):
+        self.checkpointer.start()
+        self.scheduler.start()
+        self.snapshotter.start()
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_client, unix_path, backlog=4096)
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port, backlog=4096)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.snapshotter.stop()
+        self.scheduler.stop()
+        self.checkpointer.stop()
+        self.executor.shutdown()
+        self.bank.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve the bank over a local socket.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="listen on a Unix socket at this path instead of TCP")
+    parser.add_argument('--data-dir', default='.')
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--checkpoint-interval', type=float, default=30.0)
+    parser.add_argument('--schedule-interval', type=float, default=1.0)
+    parser.add_argument('--snapshot-interval', type=float, default=3600.0)
+    args = parser.parse_args()
+
+    bank = BankManagementSystem(args.data_dir)
+    server = BankServer(bank, args.workers, args.checkpoint_interval, args.schedule_interval,
+                        args.snapshot_interval)
+    print(f"Serving on {args.unix or f'{args.host}:{args.port}'}")
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
@@ -0,0 +1,391 @@
+"""Sharded deployment: accounts partitioned across worker processes.
+
+``ShardedBank`` starts one worker process per shard. Each worker owns a
+complete BankManagementSystem in ``<data_dir>/shard-NN``, with its own
+account store, ledger and write-ahead log. Every account lives on
+shard ``crc32(account_number) % shards``. The router sends each call to
+the owning shard over a pipe. Calls from many threads are pipelined,
+so all shards work at once, each on its own core.
+
+A transfer between two shards is a two-phase commit run by the router:
+
+1. The recipient's shard votes that the account exists.
+2. The sender's shard prepares: it checks the PIN or token and the
+   balance, then durably moves the amount from the sender to its
+   CLEARING account.
+3. The recipient's shard commits: it moves the amount from its CLEARING
+   account to the recipient. If the recipient's shard refuses, the
+   sender's shard aborts and pays the amount back.
+
+A shard that fails to answer a prepare or commit may still have made it
+durable, so the router neither aborts nor retries: the transfer is left
+in doubt and ``transfer`` raises ShardError. Commits and aborts are
+idempotent on each shard, so settling a transfer twice pays it once.
+
+The CLEARING legs carry the transfer's id as their counterparty. Taken
+over every shard, CLEARING therefore nets to zero for each finished
+transfer. A transfer whose legs do not net to zero was prepared but not
+committed. ``recover`` finds those transfers and commits them. It runs
+when the router starts and can be called again at any time, e.g. after
+a shard has been restarted; transfers still in progress are left to
+their own callers.
+"""
+import itertools
+import math
+import multiprocessing
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+
+from allocator import AccountNumberAllocator
+from ledger import iter_positions, segment_path
+from postings import CLEARING
+from transactions import TRANSFER, Transaction
+
+
+class ShardError(Exception):
+    pass
+
+
+def shard_of(account_number, shards):
+    """Index of the shard that owns ``account_number``; stable across processes and runs."""
+    return zlib.crc32(str(account_number).encode()) % shards
+
+
+class ShardWorker:
+    """The bank operations one shard serves; runs inside the worker process."""
+
+    def __init__(self, data_dir, sync=True):
+        from bank import BankManagementSystem  # Imported in the worker, not by every router
+        os.makedirs(data_dir, exist_ok=True)
+        self.bank = BankManagementSystem(data_dir)
+        self.bank.ledger.wal.sync_to_disk = sync
+        self._released = None  # Ids of transfers paid out of CLEARING here, read from the ledger when first needed
+
+    def open_account(self, account_number, account_name, account_type, initial_balance, personal_info, pin):
+        return self.bank.open_account(account_name, account_type, initial_balance, personal_info, pin, account_number)
+
+    def lookup(self, account_number):
+        return self.bank.account_store.lookup(account_number)
+
+    def log_in(self, account_number, pin):
+        return self.bank.log_in(account_number, pin)
+
+    def log_out(self, token):
+        self.bank.log_out(token)
+
+    def deposit(self, account_number, amount, token=None):
+        return self.bank.deposit(account_number, amount, token)
+
+    def withdraw(self, account_number, amount, token=None):
+        return self.bank.withdraw(account_number, amount, token)
+
+    def transfer(self, sender_account_number, recipient_account_number, amount, sender_pin=None, token=None):
+        return self.bank.transfer(sender_account_number, recipient_account_number, amount, sender_pin, token)
+
+    def get_account_info(self, account_number):
+        return self.bank.get_account_info(account_number)
+
+    def get_transaction_history(self, account_number, since=None, before=None, limit=20):
+        return self.bank.get_transaction_history(account_number, since, before, limit)
+
+    def vote(self, account_number):
+        """Phase one on the recipient's shard: can ``account_number`` be credited?"""
+        return account_number in self.bank.accounts
+
+    def prepare(self, xid, sender_account_number, recipient_account_number, amount, sender_pin=None, token=None):
+        """Phase one on the sender's shard: move ``amount`` from the sender into CLEARING."""
+        bank = self.bank
+        if not (isinstance(amount, (int, float)) and math.isfinite(amount) and amount > 0):
+            bank.metrics.error('transfer', 'invalid_amount')
+            return False
+        sender_account = bank.accounts.get(sender_account_number)
+        if sender_account is None:
+            bank.metrics.error('transfer', 'unknown_account')
+            return False
+        if token is not None:
+            authorised = bank.sessions.validate(token, sender_account_number)
+        else:
+            authorised = sender_account.authenticate(sender_pin)
+        if not authorised:
+            bank.metrics.error('transfer', 'failed_auth')
+            return False
+        with bank.locks.hold(sender_account_number):
+            if not bank._screen('transfer', sender_account_number, -amount, recipient_account_number):
+                return False
+            debit = sender_account.withdraw(amount, recipient_account_number)
+            if not debit:
+                bank.metrics.error('transfer', 'insufficient_funds')
+                return False
+            self._post(sender_account_number, debit, Transaction(CLEARING, TRANSFER, amount, str(xid)))
+            bank.screening.observe(sender_account_number, -amount, recipient_account_number)
+        return True
+
+    def commit(self, xid, recipient_account_number, sender_account_number, amount):
+        """Phase two on the recipient's shard: pay ``amount`` out of CLEARING to the recipient."""
+        return self._release(xid, recipient_account_number, sender_account_number, amount)
+
+    def abort(self, xid, sender_account_number, recipient_account_number, amount):
+        """Undo a prepared transfer on the sender's shard."""
+        return self._release(xid, sender_account_number, recipient_account_number, amount)
+
+    def _release(self, xid, account_number, counterparty, amount):
+        # Requests are served one at a time, so checking and then posting cannot race another release
+        bank = self.bank
+        if self._released is None:
+            self._released = {leg_xid for leg_xid, leg_amount, _, _ in self.clearing() if leg_amount < 0}
+        if xid in self._released:  # Settled already, e.g. by an earlier recover
+            return True
+        account = bank.accounts.get(account_number)
+        if account is None:
+            return False
+        with bank.locks.hold(account_number):
+            credit = account.deposit(amount, counterparty)
+            self._post(account_number, credit, Transaction(CLEARING, TRANSFER, -amount, str(xid)))
+        self._released.add(xid)
+        return True
+
+    def _post(self, account_number, *legs):
+        bank = self.bank
+        bank._record_transaction(*legs)
+        bank.ledger.flush()  # Durable before the router hears back
+        bank.accounts.mark_dirty(account_number)
+        bank.save_balances(account_number)
+
+    def clearing(self):
+        """This shard's CLEARING legs as (xid, amount, account_number, counterparty) tuples.
+
+        The customer leg posted with each CLEARING leg is the record just
+        before it in the ledger, so it is read from the position before
+        the CLEARING leg's: one seek each, however long the ledger is.
+        """
+        ledger = self.bank.ledger
+        clearing = ledger.positions(CLEARING)
+        customers = []
+        for segment, offset in clearing:
+            if offset:
+                customers.append((segment, offset - ledger.RECORD_SIZE))
+            else:  # The pair was split across segments; the customer leg ends the previous one
+                previous = os.path.getsize(segment_path(ledger.directory, segment - 1))
+                customers.append((segment - 1, previous - previous % ledger.RECORD_SIZE - ledger.RECORD_SIZE))
+        return [(int(leg.counterparty), leg.amount, customer.account_number, customer.counterparty)
+                for leg, customer in zip(iter_positions(ledger.directory, clearing),
+                                         iter_positions(ledger.directory, customers))]
+
+    def total_balance(self):
+        self.bank.accounts.flush()
+        return sum(record.balance for record in self.bank.account_store)
+
+    def trial_balance(self):
+        return self.bank.postings.trial_balance()
+
+    def checkpoint(self):
+        self.bank.checkpoint()
+
+    def close(self):
+        self.bank.close()
+
+
+def _serve(connection, data_dir, sync):
+    # Worker process main loop: one request at a time, in arrival order
+    worker = ShardWorker(data_dir, sync)
+    try:
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            request_id, op, args = message
+            try:
+                connection.send((request_id, True, getattr(worker, op)(*args)))
+            except Exception as error:
+                connection.send((request_id, False, f"{type(error).__name__}: {error}"))
+    finally:
+        worker.close()
+        connection.close()
+
+
+class _ShardClient:
+    """Router end of one shard's pipe; calls from several threads are pipelined."""
+
+    def __init__(self, index, data_dir, sync, context):
+        self.index = index
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child, data_dir, sync), name=f'shard-{index}', daemon=True)
+        self.process.start()
+        child.close()
+        self._ids = itertools.count()
+        self._pending = {}
+        self._send_lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, name=f'shard-{index}-reader', daemon=True)
+        self._reader.start()
+
+    def call(self, op, *args):
+        future = Future()
+        with self._send_lock:
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            self.connection.send((request_id, op, args))
+        return future.result()
+
+    def _read(self):
+        while True:
+            try:
+                request_id, ok, result = self.connection.recv()
+            except (EOFError, OSError):
+                break
+            future = self._pending.pop(request_id)
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(ShardError(f"shard {self.index}: {result}"))
+        for future in list(self._pending.values()):
+            future.set_exception(ShardError(f"shard {self.index} exited"))
+        self._pending.clear()
+
+    def close(self):
+        with self._send_lock:
+            self.connection.send(None)
+        self.process.join()
+        self._reader.join()
+        self.connection.close()
+
+
+class _ShardedAccounts:
+    # The allocator only needs ``lookup`` to skip numbers already in use
+    def __init__(self, router):
+        self.router = router
+
+    def lookup(self, account_number):
+        return self.router._shard(account_number).call('lookup', account_number)
+
+
+class ShardedBank:
+    """Routes bank calls to ``shards`` worker processes; see the module docstring.
+
+    Offers the BankManagementSystem calls that a server or load
+    generator uses. Session tokens are issued by the account's own shard.
+    """
+
+    def __init__(self, data_dir='.', shards=4, sync=True):
+        self.data_dir = data_dir
+        context = multiprocessing.get_context('spawn')  # Workers start clean, without the router's threads
+        self.shards = [_ShardClient(i, os.path.join(data_dir, f'shard-{i:02d}'), sync, context)
+                       for i in range(shards)]
+        self.allocator = AccountNumberAllocator(_ShardedAccounts(self), os.path.join(data_dir, 'account_seq'))
+        self._xid_lock = threading.Lock()
+        self._last_xid = 0
+        self._in_progress = set()  # Ids of transfers whose caller is still settling them
+        self._recover_lock = threading.Lock()
+        self.recovered = self.recover()
+
+    def _shard(self, account_number):
+        return self.shards[shard_of(account_number, len(self.shards))]
+
+    def _next_xid(self):
+        # Time-based so ids stay unique across router restarts
+        with self._xid_lock:
+            self._last_xid = max(self._last_xid + 1, time.time_ns())
+            return self._last_xid
+
+    def open_account(self, account_name, account_type, initial_balance, personal_info, pin):
+        account_number = self.allocator.allocate()
+        return self._shard(account_number).call('open_account', account_number, account_name, account_type,
+                                                initial_balance, personal_info, pin)
+
+    def log_in(self, account_number, pin):
+        return self._shard(account_number).call('log_in', account_number, pin)
+
+    def log_out(self, token):
+        for shard in self.shards:  # Tokens do not say which shard issued them
+            shard.call('log_out', token)
+
+    def deposit(self, account_number, amount, token=None):
+        return self._shard(account_number).call('deposit', account_number, amount, token)
+
+    def withdraw(self, account_number, amount, token=None):
+        return self._shard(account_number).call('withdraw', account_number, amount, token)
+
+    def get_account_info(self, account_number):
+        return self._shard(account_number).call('get_account_info', account_number)
+
+    def get_transaction_history(self, account_number, since=None, before=None, limit=20):
+        return self._shard(account_number).call('get_transaction_history', account_number, since, before, limit)
+
+    def transfer(self, sender_account_number, recipient_account_number, amount, sender_pin=None, token=None):
+        """Move money between accounts; a two-phase commit when they are on different shards.
+
+        Raises ShardError if a shard fails before the outcome is known;
+        the transfer is then in doubt and ``recover`` settles it.
+        """
+        sender_shard = self._shard(sender_account_number)
+        recipient_shard = self._shard(recipient_account_number)
+        if sender_shard is recipient_shard:
+            return sender_shard.call('transfer', sender_account_number, recipient_account_number, amount,
+                                     sender_pin, token)
+        if not recipient_shard.call('vote', recipient_account_number):
+            return False
+        xid = self._next_xid()
+        with self._xid_lock:
+            self._in_progress.add(xid)
+        try:
+            # A ShardError from here on leaves the transfer in doubt: the call may have been made durable
+            if not sender_shard.call('prepare', xid, sender_account_number, recipient_account_number, amount,
+                                     sender_pin, token):
+                return False
+            if recipient_shard.call('commit', xid, recipient_account_number, sender_account_number, amount):
+                return True
+            sender_shard.call('abort', xid, sender_account_number, recipient_account_number, amount)
+            return False
+        finally:
+            with self._xid_lock:
+                self._in_progress.discard(xid)
+
+    def recover(self):
+        """Commit cross-shard transfers that were prepared but never committed; returns their ids.
+
+        Transfers that are still in progress in this router are skipped.
+        A transfer whose shard fails again stays in doubt for the next call.
+        """
+        with self._recover_lock:
+            with self._xid_lock:
+                # Transfers started from now on have larger ids and are settled by their callers
+                busy, horizon = set(self._in_progress), self._last_xid
+            prepared = {}  # xid -> [net CLEARING amount, sender, recipient]
+            for shard in self.shards:
+                for xid, amount, account_number, counterparty in shard.call('clearing'):
+                    entry = prepared.setdefault(xid, [0.0, None, None])
+                    entry[0] += amount
+                    if amount > 0:  # The prepare leg names the sender and recipient
+                        entry[1], entry[2] = account_number, counterparty
+            in_doubt = []
+            for xid, (amount, sender, recipient) in sorted(prepared.items()):
+                if amount > 1e-9 and sender is not None and xid not in busy and xid <= horizon:
+                    # The recipient voted before the sender prepared, so the transfer goes ahead
+                    try:
+                        if not self._shard(recipient).call('commit', xid, recipient, sender, amount):
+                            self._shard(sender).call('abort', xid, sender, recipient, amount)
+                    except ShardError:
+                        continue
+                    in_doubt.append(xid)
+            return in_doubt
+
+    def total_balance(self):
+        """Sum of every customer balance on every shard."""
+        return sum(shard.call('total_balance') for shard in self.shards)
+
+    def clearing_balance(self):
+        """Net CLEARING amount over all shards; zero when no transfer is in flight."""
+        return sum(amount for shard in self.shards for _, amount, _, _ in shard.call('clearing'))
+
+    def checkpoint(self):
+        for shard in self.shards:
+            shard.call('checkpoint')
+
+    def close(self):
+        for shard in self.shards:
+            shard.close()
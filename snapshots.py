@@ -0,0 +1,173 @@
+"""Periodic snapshots of every balance, for point-in-time balance queries.
+
+A snapshot file holds every account's balance at one ledger position:
+a header (magic, txn_id, timestamp, count), then (account number,
+balance) pairs packed as 16-byte rows and sorted by account number. One
+account's balance is a binary search over the memory-mapped file.
+
+``SnapshotStore.latest(timestamp)`` finds the newest snapshot taken at
+or before ``timestamp``, so a past balance is that snapshot's balance
+plus the account's postings between the two times. The postings are read
+through the ledger's per-account index, which makes the cost grow with
+the postings since the snapshot rather than with the account's history.
+
+Snapshots are thinned as new ones are taken: the newest ``keep`` are
+kept, and of older ones only the last of each day for ``days`` days.
+Dropping one only makes queries before it replay more postings. A file
+is memory-mapped by the first lookup that needs it, and at most
+``max_mapped`` stay mapped, least recently used first to go.
+"""
+import bisect
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+
+class Snapshot:
+    """One snapshot file, memory-mapped while it is being looked up in."""
+
+    MAGIC = b'CBSN'
+    HEADER = struct.Struct('<4sQdQ')  # magic, txn_id, timestamp, count
+    ROW = struct.Struct('<Qd')  # account number, balance
+
+    def __init__(self, path):
+        self.path = path
+        self._data = None
+        self._lock = threading.Lock()
+        with open(path, 'rb') as file:
+            magic, self.txn_id, self.timestamp, self.count = self.HEADER.unpack(file.read(self.HEADER.size))
+        if magic != self.MAGIC:
+            raise ValueError(f"{path} is not a balance snapshot")
+
+    @classmethod
+    def write(cls, path, txn_id, timestamp, balances):
+        """Write ``balances`` ((account number, balance) pairs) as the snapshot at ``path``."""
+        rows = sorted((int(account_number), balance) for account_number, balance in balances)
+        temporary = path + '.tmp'
+        with open(temporary, 'wb') as file:
+            file.write(cls.HEADER.pack(cls.MAGIC, txn_id, timestamp, len(rows)))
+            pack = cls.ROW.pack
+            file.write(b''.join(pack(account_number, balance) for account_number, balance in rows))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+        return cls(path)
+
+    def _account_at(self, row):
+        return self.ROW.unpack_from(self._data, self.HEADER.size + row * self.ROW.size)[0]
+
+    def balance(self, account_number):
+        """The account's balance in this snapshot, or None if it had no account then.
+
+        Raises FileNotFoundError once the snapshot has been removed.
+        """
+        key = int(account_number)
+        with self._lock:
+            if self._data is None:
+                with open(self.path, 'rb') as file:
+                    self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            row = bisect.bisect_left(range(self.count), key, key=self._account_at)
+            if row < self.count:
+                found, balance = self.ROW.unpack_from(self._data, self.HEADER.size + row * self.ROW.size)
+                if found == key:
+                    return balance
+        return None
+
+    def close(self):
+        """Unmap the file; the next lookup maps it again."""
+        with self._lock:
+            if self._data is not None:
+                self._data.close()
+                self._data = None
+
+    def remove(self):
+        with self._lock:
+            if self._data is not None:
+                self._data.close()
+                self._data = None
+            os.remove(self.path)
+
+
+class SnapshotStore:
+    """The snapshot files in ``directory``, ordered by time; see the module docstring for retention."""
+
+    def __init__(self, directory='snapshots', keep=24, days=90, max_mapped=8):
+        self.directory = directory
+        self.keep = keep
+        self.days = days
+        self.max_mapped = max_mapped
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._mapped = OrderedDict()  # Snapshots looked up in recently, least recent first
+        self.snapshots = sorted((Snapshot(os.path.join(directory, name))
+                                 for name in os.listdir(directory)
+                                 if name.startswith('snapshot-') and name.endswith('.dat')),
+                                key=lambda snapshot: snapshot.timestamp)
+        with self._lock:
+            self._prune()
+
+    def take(self, txn_id, timestamp, balances):
+        """Save ``balances`` as they stood at ledger position ``txn_id`` and ``timestamp``."""
+        path = os.path.join(self.directory, f'snapshot-{txn_id:012d}.dat')
+        with self._lock:
+            if self.snapshots and self.snapshots[-1].txn_id == txn_id:
+                return self.snapshots[-1]  # Nothing has been posted since the last one
+            snapshot = Snapshot.write(path, txn_id, timestamp, balances)
+            self.snapshots.append(snapshot)
+            self._prune()
+        return snapshot
+
+    def _prune(self):
+        # The newest ``keep`` snapshots, plus the last one of each of the ``days`` latest days
+        kept = set(self.snapshots[-self.keep:]) if self.keep else set()
+        daily = {}
+        for snapshot in self.snapshots:  # Oldest first, so each day ends up with its last snapshot
+            daily[time.strftime('%Y-%m-%d', time.localtime(snapshot.timestamp))] = snapshot
+        kept.update(list(daily.values())[-self.days:] if self.days else ())
+        for snapshot in self.snapshots:
+            if snapshot not in kept:
+                self._mapped.pop(snapshot, None)
+                snapshot.remove()  # A reader still holding it gets FileNotFoundError; see balance()
+        self.snapshots = [snapshot for snapshot in self.snapshots if snapshot in kept]
+
+    def balance(self, account_number, timestamp):
+        """(balance, txn_id) of ``account_number`` in the newest snapshot taken at or before ``timestamp``.
+
+        (0.0, None) if there is no such snapshot; an account the
+        snapshot does not hold has balance 0.0.
+        """
+        while True:
+            snapshot = self.latest(timestamp)
+            if snapshot is None:
+                return 0.0, None
+            try:
+                balance = snapshot.balance(account_number)
+            except FileNotFoundError:
+                continue  # Pruned since latest() returned it; the next older one is used instead
+            with self._lock:
+                self._mapped[snapshot] = None
+                self._mapped.move_to_end(snapshot)
+                while len(self._mapped) > self.max_mapped:
+                    self._mapped.popitem(last=False)[0].close()
+            return balance or 0.0, snapshot.txn_id
+
+    def latest(self, timestamp):
+        """The newest snapshot taken at or before ``timestamp``, or None."""
+        with self._lock:
+            position = bisect.bisect_right(self.snapshots, timestamp, key=lambda snapshot: snapshot.timestamp)
+            return self.snapshots[position - 1] if position else None
+
+    def following(self, timestamp):
+        """The oldest snapshot taken after ``timestamp``, or None; it bounds the postings made by then."""
+        with self._lock:
+            position = bisect.bisect_right(self.snapshots, timestamp, key=lambda snapshot: snapshot.timestamp)
+            return self.snapshots[position] if position < len(self.snapshots) else None
+
+    def close(self):
+        with self._lock:
+            for snapshot in self.snapshots:
+                snapshot.close()
+            self._mapped.clear()
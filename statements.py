@@ -0,0 +1,190 @@
+"""Account statements streamed from the ledger as CSV, plain text or HTML.
+
+A statement covers the postings from ``start`` (inclusive) to ``end``
+(exclusive), with a running balance after each line. The opening
+balance comes from the newest balance snapshot taken by ``start``,
+plus the postings between that snapshot and ``start``. Postings are
+read one at a time through the ledger's per-account index and written
+out straight away, so memory does not grow with the length of a
+statement.
+
+``generate_statements`` writes a statement file for every account
+given, spread over a process pool. The parent works out each account's
+opening snapshot and ledger positions, and hands out chunks of accounts.
+It keeps only a few chunks in flight, which bounds memory in the
+parent and in every worker. Workers read the segment files directly and
+never open a Ledger of their own.
+"""
+import csv
+import html
+import itertools
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date, timedelta
+
+from ledger import iter_positions
+from transactions import KIND_NAMES
+
+
+def period(start_date, end_date):
+    """Local-time (start, end) timestamps covering 'YYYY-MM-DD' dates ``start_date`` to ``end_date`` inclusive."""
+    first, last = date.fromisoformat(start_date), date.fromisoformat(end_date) + timedelta(days=1)
+    return time.mktime(first.timetuple()), time.mktime(last.timetuple())
+
+
+def _date(timestamp):
+    return time.strftime('%Y-%m-%d', time.localtime(timestamp))
+
+
+def _describe(posting):
+    text = KIND_NAMES.get(posting.kind, 'Other')
+    if posting.counterparty:
+        text += f" {'to' if posting.amount < 0 else 'from'} {posting.counterparty}"
+    return text
+
+
+class TextStatement:
+    extension = 'txt'
+
+    def __init__(self, file):
+        self.file = file
+
+    def begin(self, account_number, account_name, start, end, opening):
+        self.file.write(f"Statement for {account_name} ({account_number})\n"
+                        f"Period {_date(start)} to {_date(end - 1)}\n\n"
+                        f"{'Date':<17} {'Description':<36} {'Amount':>14} {'Balance':>14}\n"
+                        f"{'':<17} {'Opening balance':<36} {'':>14} {opening:>14.2f}\n")
+
+    def row(self, posting, balance):
+        self.file.write(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(posting.timestamp)):<17} "
+                        f"{_describe(posting):<36} {posting.amount:>+14.2f} {balance:>14.2f}\n")
+
+    def finish(self, closing, count):
+        self.file.write(f"{'':<17} {'Closing balance':<36} {'':>14} {closing:>14.2f}\n\n{count} transactions\n")
+
+
+class CsvStatement:
+    extension = 'csv'
+
+    def __init__(self, file):
+        self.writer = csv.writer(file)
+
+    def begin(self, account_number, account_name, start, end, opening):
+        self.writer.writerow(['account_number', 'date', 'description', 'amount', 'balance'])
+        self.account_number = account_number
+        self.writer.writerow([account_number, _date(start), 'Opening balance', '', f'{opening:.2f}'])
+
+    def row(self, posting, balance):
+        self.writer.writerow([self.account_number, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(posting.timestamp)),
+                              _describe(posting), f'{posting.amount:.2f}', f'{balance:.2f}'])
+
+    def finish(self, closing, count):
+        self.writer.writerow([self.account_number, '', 'Closing balance', '', f'{closing:.2f}'])
+
+
+class HtmlStatement:
+    extension = 'html'
+
+    def __init__(self, file):
+        self.file = file
+
+    def begin(self, account_number, account_name, start, end, opening):
+        title = html.escape(f"Statement for {account_name} ({account_number})")
+        self.file.write(f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{title}</title></head><body>\n"
+                        f"<h1>{title}</h1>\n<p>Period {_date(start)} to {_date(end - 1)}</p>\n<table>\n"
+                        "<tr><th>Date</th><th>Description</th><th>Amount</th><th>Balance</th></tr>\n"
+                        f"<tr><td></td><td>Opening balance</td><td></td><td>{opening:.2f}</td></tr>\n")
+
+    def row(self, posting, balance):
+        self.file.write(f"<tr><td>{time.strftime('%Y-%m-%d %H:%M', time.localtime(posting.timestamp))}</td>"
+                        f"<td>{html.escape(_describe(posting))}</td><td>{posting.amount:+.2f}</td>"
+                        f"<td>{balance:.2f}</td></tr>\n")
+
+    def finish(self, closing, count):
+        self.file.write(f"<tr><td></td><td>Closing balance</td><td></td><td>{closing:.2f}</td></tr>\n</table>\n"
+                        f"<p>{count} transactions</p>\n</body></html>\n")
+
+
+FORMATS = {'txt': TextStatement, 'csv': CsvStatement, 'html': HtmlStatement}
+
+
+def _advance(balance, posting):
+    return balance + posting.amount if math.isnan(posting.balance_after) else posting.balance_after
+
+
+def write_statement(writer, account_number, account_name, opening, postings, start, end):
+    """Stream ``postings`` (oldest first, from the opening snapshot on) into ``writer``; returns the line count."""
+    postings = iter(postings)
+    first = None
+    for posting in postings:  # Postings after the snapshot but before the period move the opening balance
+        if posting.timestamp >= start:
+            first = posting
+            break
+        opening = _advance(opening, posting)
+    writer.begin(account_number, account_name, start, end, opening)
+    balance, count = opening, 0
+    for posting in itertools.chain([first] if first else [], postings):
+        if posting.timestamp >= end:
+            break
+        balance = _advance(balance, posting)
+        writer.row(posting, balance)
+        count += 1
+    writer.finish(balance, count)
+    return count
+
+
+def plan(ledger, snapshots, account_number, start, end):
+    """Opening balance and ledger positions for one account's statement.
+
+    The positions run from the newest snapshot taken by ``start`` to the
+    first snapshot after ``end``, or to the latest posting.
+    """
+    balance, since = snapshots.balance(account_number, start)
+    closing = snapshots.following(end)
+    return balance, ledger.positions(account_number, since, closing.txn_id + 1 if closing else None)
+
+
+def statement_path(directory, account_number, start, end, fmt):
+    return os.path.join(directory, f"{account_number}-{_date(start).replace('-', '')}-"
+                                   f"{_date(end - 1).replace('-', '')}.{FORMATS[fmt].extension}")
+
+
+def _write_chunk(ledger_directory, accounts, start, end, fmt, directory):
+    # Runs in a worker process: one statement file per (account number, name, opening balance, positions)
+    for account_number, account_name, opening, positions in accounts:
+        with open(statement_path(directory, account_number, start, end, fmt), 'w', newline='') as file:
+            write_statement(FORMATS[fmt](file), account_number, account_name, opening,
+                            iter_positions(ledger_directory, positions), start, end)
+    return len(accounts)
+
+
+def generate_statements(ledger, snapshots, accounts, start, end, fmt='txt', directory='statements', workers=None,
+                        chunk_size=200):
+    """Write a statement file for each (account number, account name) in ``accounts`` into ``directory``.
+
+    Returns the number of statements, the seconds taken and statements
+    per second.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown statement format {fmt!r}; use one of {', '.join(FORMATS)}")
+    os.makedirs(directory, exist_ok=True)
+    started = time.perf_counter()
+    written = 0
+    with ProcessPoolExecutor(workers) as pool:
+        in_flight = set()
+        limit = 2 * (workers or os.cpu_count() or 1)
+        accounts = iter(accounts)
+        while True:
+            chunk = [(account_number, account_name, *plan(ledger, snapshots, account_number, start, end))
+                     for account_number, account_name in itertools.islice(accounts, chunk_size)]
+            if chunk:
+                in_flight.add(pool.submit(_write_chunk, ledger.directory, chunk, start, end, fmt, directory))
+            if in_flight and (len(in_flight) >= limit or not chunk):
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                written += sum(future.result() for future in done)
+            if not chunk and not in_flight:
+                break
+    seconds = time.perf_counter() - started
+    return {'statements': written, 'seconds': seconds, 'per_second': written / seconds if seconds else 0.0}
@@ -0,0 +1,85 @@
+"""Crash-recovery invariants of the ledger and its write-ahead log.
+
+The crash rounds drive benchmarks/fault_injection.py: a child process
+posts transfers from several threads until it is SIGKILLed, and the
+reopened bank must conserve funds, keep every balance equal to its
+postings and to the balance_after of the latest one, and number the
+postings consecutively.
+"""
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import fault_injection  # noqa: E402
+from bank import BankManagementSystem  # noqa: E402
+
+ACCOUNTS = 10
+
+
+def kill_mid_transfers(data_dir, seed, delay=0.3):
+    process = subprocess.Popen([sys.executable, fault_injection.__file__, '--child', data_dir, '--threads', '4',
+                                '--seed', str(seed)], stdout=subprocess.PIPE, text=True)
+    try:
+        assert process.stdout.readline().strip() == 'ready'
+        time.sleep(delay)
+    finally:
+        process.send_signal(signal.SIGKILL)
+        process.wait()
+        process.stdout.close()
+
+
+def wal_path(data_dir):
+    return os.path.join(data_dir, 'ledger', 'wal.log')
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    data_dir = str(tmp_path)
+    fault_injection.setup(data_dir, ACCOUNTS)
+    return data_dir
+
+
+def accounts(data_dir):
+    with open(os.path.join(data_dir, 'accounts.json')) as file:
+        return json.load(file)
+
+
+@pytest.mark.parametrize('torn', [False, True], ids=['clean kill', 'torn log'])
+def test_crash_keeps_invariants(data_dir, torn):
+    numbers = accounts(data_dir)
+    for seed in range(1, 3):
+        kill_mid_transfers(data_dir, seed)
+        if torn:
+            with open(wal_path(data_dir), 'ab') as file:
+                file.write(b'\x17' * 13)  # Half a frame header and payload, as a power cut mid-write leaves
+        problems, postings = fault_injection.check(data_dir, numbers)
+        assert problems == []
+        assert postings > 2 * ACCOUNTS  # The child got some transfers in before it was killed
+
+
+def test_torn_tail_is_cut_off(data_dir):
+    numbers = accounts(data_dir)
+    bank = BankManagementSystem(data_dir)
+    for sender, recipient in zip(numbers, numbers[1:]):
+        assert bank.transfer(sender, recipient, 10.0, fault_injection.PIN)
+    bank.ledger.flush()  # Durable in the log, but never checkpointed: the process "dies" here
+    intact = os.path.getsize(wal_path(data_dir))
+    last_txn_id = bank.ledger.last_txn_id
+    with open(wal_path(data_dir), 'ab') as file:
+        file.write(b'\x00\x01\x00\x00' + b'torn')  # A frame claiming 256 bytes of payload
+
+    reopened = BankManagementSystem(data_dir)
+    assert reopened.ledger.last_txn_id == last_txn_id
+    assert os.path.getsize(wal_path(data_dir)) == intact
+    reopened.close()
+    problems, _ = fault_injection.check(data_dir, numbers)
+    assert problems == []
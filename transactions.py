@@ -0,0 +1,97 @@
+import math
+import re
+import struct
+
+
+DEPOSIT = 1
+WITHDRAWAL = 2
+TRANSFER = 3
+OPENING_BALANCE = 4
+ADJUSTMENT = 5
+INTEREST = 6
+FEE = 7
+SCHEDULED_TRANSFER = 8  # A transfer made by the scheduler; see scheduler.py
+OTHER = 0
+
+KIND_NAMES = {DEPOSIT: 'Deposit', WITHDRAWAL: 'Withdrawal', TRANSFER: 'Transfer',
+              OPENING_BALANCE: 'Opening balance', ADJUSTMENT: 'Adjustment', INTEREST: 'Interest', FEE: 'Fee',
+              SCHEDULED_TRANSFER: 'Scheduled transfer', OTHER: 'Other'}
+KINDS = {name.lower(): kind for kind, name in KIND_NAMES.items()}
+
+TEXT = re.compile(r'\s*([A-Za-z][A-Za-z ]*?)\s*:\s*([+-]?)(\d+(?:\.\d+)?)(?:\s+(?:to|from)\s+(\d+))?')
+
+
+class Transaction:
+    """One posting to one account.
+
+    ``amount`` is signed: positive for credits, negative for debits.
+    ``counterparty`` is the other account of a transfer, and
+    ``balance_after`` the account's balance once the posting was applied
+    (NaN when it is not known, e.g. for imported history). The ledger
+    assigns ``txn_id`` and ``timestamp`` when the posting is appended.
+
+    ``str()`` gives the text the bank has always shown, such as
+    ``Transfer: -300.0 to 20007942``; ``pack`` gives the fixed-width
+    binary form stored in the ledger.
+    """
+
+    __slots__ = ('txn_id', 'timestamp', 'account_number', 'kind', 'amount', 'counterparty', 'balance_after')
+
+    # txn_id, timestamp, account number, kind, amount, counterparty (0 = none), balance after
+    RECORD = struct.Struct('<QdQBdQd')
+
+    def __init__(self, account_number, kind, amount, counterparty=None, balance_after=math.nan,
+                 timestamp=None, txn_id=0):
+        self.txn_id = txn_id
+        self.timestamp = timestamp
+        self.account_number = str(account_number)
+        self.kind = kind
+        self.amount = amount
+        self.counterparty = counterparty
+        self.balance_after = balance_after
+
+    @classmethod
+    def parse(cls, text, account_number, timestamp=None):
+        """Build a posting from its text form, e.g. a row of an old transactions.csv file.
+
+        Text that does not look like a posting becomes an OTHER posting
+        of zero.
+        """
+        match = TEXT.match(text)
+        if not match:
+            return cls(account_number, OTHER, 0.0, timestamp=timestamp)
+        label, sign, amount, counterparty = match.groups()
+        amount = float(amount)
+        return cls(account_number, KINDS.get(label.lower(), OTHER), -amount if sign == '-' else amount,
+                   counterparty, timestamp=timestamp)
+
+    def pack(self):
+        return self.RECORD.pack(self.txn_id, self.timestamp, int(self.account_number), self.kind, self.amount,
+                                int(self.counterparty or 0), self.balance_after)
+
+    @classmethod
+    def unpack(cls, data, offset=0):
+        return cls._from_fields(cls.RECORD.unpack_from(data, offset))
+
+    @classmethod
+    def unpack_all(cls, data):
+        """Decode a buffer of packed postings."""
+        return [cls._from_fields(fields) for fields in cls.RECORD.iter_unpack(data)]
+
+    @classmethod
+    def _from_fields(cls, fields):
+        txn_id, timestamp, account_number, kind, amount, counterparty, balance_after = fields
+        return cls(account_number, kind, amount, str(counterparty) if counterparty else None,
+                   balance_after, timestamp, txn_id)
+
+    def __str__(self):
+        sign = '-' if self.amount < 0 else '+'
+        text = f"{KIND_NAMES.get(self.kind, 'Other')}: {sign}{abs(self.amount)}"
+        if self.counterparty:
+            text += f" to {self.counterparty}" if self.amount < 0 else f" from {self.counterparty}"
+        return text
+
+    def __repr__(self):
+        return (f"Transaction(txn_id={self.txn_id}, account_number={self.account_number!r}, kind={self.kind}, "
+                f"amount={self.amount}, counterparty={self.counterparty!r}, balance_after={self.balance_after})")
+
@@ -0,0 +1,128 @@
+import os
+import struct
+import threading
+import zlib
+
+from metrics import registry as metrics
+
+
+class WriteAheadLog:
+    """Append-only log of checksummed frames, made durable with fsync.
+
+    ``write`` queues a frame and returns a ticket; ``sync`` returns once
+    that ticket is on disk. Syncs are group-committed: while one thread
+    writes and fsyncs everything queued so far, others queue their frames
+    and wait, and the next fsync covers all of them. Frames that were
+    never fully written (a crash mid-write) fail their checksum and are
+    cut off by ``replay``.
+    """
+
+    FRAME = struct.Struct('<II')  # payload length, crc32 of the payload
+
+    def __init__(self, path, sync=True):
+        self.path = path
+        self.sync_to_disk = sync  # Turn off only for throwaway data, e.g. benchmarks
+        self._file = open(path, 'ab')
+        self._buffer = []
+        self._written = 0  # Tickets handed out
+        self._durable = 0  # Tickets on disk
+        self._syncing = False
+        self._cond = threading.Condition()
+
+    def replay(self):
+        """Return the payloads of every intact frame, oldest first, and cut off a torn tail."""
+        with open(self.path, 'rb') as file:
+            data = file.read()
+        payloads = []
+        offset = 0
+        while offset + self.FRAME.size <= len(data):
+            length, checksum = self.FRAME.unpack_from(data, offset)
+            payload = data[offset + self.FRAME.size:offset + self.FRAME.size + length]
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                break
+            payloads.append(payload)
+            offset += self.FRAME.size + length
+        if offset < len(data):
+            os.truncate(self.path, offset)
+        return payloads
+
+    def write(self, payload):
+        """Queue a frame; returns the ticket to pass to ``sync``."""
+        with self._cond:
+            self._buffer.append(self.FRAME.pack(len(payload), zlib.crc32(payload)) + payload)
+            self._written += 1
+            return self._written
+
+    def sync(self, ticket=None):
+        """Block until the frame with ``ticket`` (by default every queued frame) is durable."""
+        with self._cond:
+            if ticket is None:
+                ticket = self._written
+            while self._durable < ticket:
+                if self._syncing:
+                    self._cond.wait()
+                    continue
+                self._syncing = True
+                data, self._buffer = b''.join(self._buffer), []
+                covered = self._written
+                self._cond.release()
+                try:
+                    self._file.write(data)
+                    self._file.flush()
+                    if self.sync_to_disk:
+                        os.fsync(self._file.fileno())
+                finally:
+                    self._cond.acquire()
+                    self._syncing = False
+                    self._cond.notify_all()
+                self._durable = covered
+
+    def commit(self, payload):
+        self.sync(self.write(payload))
+
+    def truncate(self):
+        """Empty the log once everything in it has been applied elsewhere."""
+        with self._cond:
+            self.sync()
+            self._file.truncate(0)
+            if self.sync_to_disk:
+                os.fsync(self._file.fileno())
+
+    def size(self):
+        return os.path.getsize(self.path)
+
+    def close(self):
+        self.sync()
+        self._file.close()
+
+
+class Checkpointer:
+    """Calls ``checkpoint`` every ``interval`` seconds on a background thread.
+
+    A call that raises is logged and counted in ``metrics`` under the
+    thread's name, and the next call is made on schedule.
+    """
+
+    def __init__(self, checkpoint, interval=30.0, name='checkpointer'):
+        self.checkpoint = checkpoint
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.checkpoint()
+            except Exception as error:  # One failure must not stop the thread for the life of the server
+                import logging  # Only needed once something has gone wrong
+                logging.getLogger(__name__).exception("%s failed", self._thread.name)
+                metrics.error(self._thread.name, type(error).__name__)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()